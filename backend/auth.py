@@ -1,3 +1,7 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,19 +11,36 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
-import json
 import numpy as np
 
-from database import get_db
+from database import get_db, DATABASE_URL
 from models import User
+from tools.cache import get_cache
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# bcrypt cost factor for new hashes (existing hashes keep the cost they were made with)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads reserved for password hashing; bcrypt releases the GIL while it runs
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated users are cached briefly so most requests skip the users lookup
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Largest euclidean distance between face encodings that counts as a match
+# (face_recognition's default tolerance)
+FACE_MATCH_TOLERANCE = float(os.getenv("FACE_MATCH_TOLERANCE", "0.6"))
+# How long the SQLite face encoding matrix is reused before reloading
+FACE_INDEX_REFRESH_SECONDS = float(os.getenv("FACE_INDEX_REFRESH_SECONDS", "300"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+# Kept separate from the default executor so a burst of logins queues here
+# instead of starving other run_in_executor work
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 
@@ -31,6 +52,48 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password hashing pool, off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password hashing pool, off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+
+class CachedUser:
+    """
+    Detached copy of the User columns request handlers read
+
+    Shared between requests, so it must not be modified or added to a session.
+    """
+
+    __slots__ = ("id", "username", "email", "is_guest", "character_id")
+
+    def __init__(self, id: int, username: Optional[str] = None, email: Optional[str] = None,
+                 is_guest: bool = False, character_id: Optional[int] = None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_guest = is_guest
+        self.character_id = character_id
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(user.id, user.username, user.email, bool(user.is_guest), user.character_id)
+
+
+user_cache = get_cache("users", max_entries=USER_CACHE_MAX_ENTRIES)
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop a user's cached copy after their row changes"""
+    user_cache.invalidate(user_id)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -50,41 +113,126 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+def get_password_login_user(db: Session, username: str) -> Optional[User]:
+    """
+    Find the user a username/password login refers to
+
+    The login name may be a username or an email. Users without a password
+    (guests and face-only accounts) are never returned.
+    """
     user = get_user_by_username(db, username)
     if not user:
         user = get_user_by_email(db, username)
-    if not user:
+    if not user or user.hashed_password is None:
         return None
-    if user.hashed_password is None:
+    return user
+
+
+def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+    user = get_password_login_user(db, username)
+    if not user or not verify_password(password, user.hashed_password):
         return None
-    if not verify_password(password, user.hashed_password):
+    return user
+
+
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[User]:
+    """
+    authenticate_user with the bcrypt check run on the password hashing pool
+
+    The session's connection goes back to the pool before hashing, so a burst
+    of logins waiting on bcrypt does not hold (and exhaust) the pool. The user
+    is returned detached, with its columns loaded.
+    """
+    user = get_password_login_user(db, username)
+    if not user:
+        return None
+    db.expunge(user)
+    db.rollback()
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
 
-def authenticate_face(db: Session, face_encoding_list: list) -> Optional[User]:
-    """Authenticate user by face encoding"""
-    import face_recognition
+class FaceEncodingIndex:
+    """
+    Enrolled face encodings held as one contiguous float32 matrix
+
+    Used when the database has no pgvector operators (SQLite dev mode); a
+    login is then a single vectorized distance computation over all users.
+    The matrix is rebuilt after invalidate() or every FACE_INDEX_REFRESH_SECONDS.
+    """
+
+    def __init__(self, refresh_seconds: float = FACE_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._user_ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, 128), dtype=np.float32)
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def _load(self, db: Session) -> None:
+        rows = db.query(User.id, User.face_encoding).filter(User.face_encoding.isnot(None)).all()
+        self._user_ids = np.fromiter((user_id for user_id, _ in rows), dtype=np.int64, count=len(rows))
+        if rows:
+            self._matrix = np.ascontiguousarray(np.stack([encoding for _, encoding in rows]), dtype=np.float32)
+        else:
+            self._matrix = np.empty((0, 128), dtype=np.float32)
+        self._loaded_at = time.monotonic()
 
-    users = db.query(User).filter(User.face_encoding.isnot(None)).all()
+    def nearest(self, db: Session, encoding: np.ndarray) -> Optional[tuple]:
+        """
+        Find the enrolled user closest to encoding
 
-    for user in users:
-        stored_encoding = json.loads(user.face_encoding)
-        stored_encoding_array = np.array(stored_encoding)
+        Returns:
+            (user_id, distance), or None if nobody is enrolled
+        """
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+                self._load(db)
+            user_ids, matrix = self._user_ids, self._matrix
 
-        # Compare faces
-        matches = face_recognition.compare_faces([stored_encoding_array], face_encoding_list)
-        if matches[0]:
-            return user
+        if not len(user_ids):
+            return None
+        distances = np.linalg.norm(matrix - encoding, axis=1)
+        best = int(np.argmin(distances))
+        return int(user_ids[best]), float(distances[best])
 
-    return None
+
+face_index = FaceEncodingIndex()
+
+
+def authenticate_face(db: Session, face_encoding_list: list) -> Optional[User]:
+    """
+    Authenticate user by face encoding
+
+    Finds the single nearest enrolled encoding (HNSW index on PostgreSQL,
+    the in-memory matrix on SQLite) and accepts it if it is within
+    FACE_MATCH_TOLERANCE.
+    """
+    encoding = np.asarray(face_encoding_list, dtype=np.float32)
+
+    if DATABASE_URL.startswith("sqlite"):
+        match = face_index.nearest(db, encoding)
+        if match is None or match[1] > FACE_MATCH_TOLERANCE:
+            return None
+        return db.query(User).filter(User.id == match[0]).first()
+
+    distance = User.face_encoding.l2_distance(encoding)
+    match = db.query(User, distance.label("distance")).filter(
+        User.face_encoding.isnot(None)
+    ).order_by(distance).first()
+    if match is None or match.distance > FACE_MATCH_TOLERANCE:
+        return None
+    return match.User
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CachedUser]:
     if token is None:
         return None
 
@@ -104,7 +252,14 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise credentials_exception
 
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
-    return user
+
+    cached = CachedUser.from_user(user)
+    user_cache.set(user_id, cached, USER_CACHE_TTL_SECONDS)
+    return cached
@@ -0,0 +1,152 @@
+"""
+Health dashboard benchmark
+
+Seeds a user with years of vitals, symptoms, doses and daily rollups (plus
+other users with the same history, so indexes have to do the filtering),
+then times GET /api/health/dashboard/{user_id} against an in-process app
+and counts the SQL statements each request runs.
+
+Run from the backend directory:
+    python benchmarks/health_dashboard.py --years 3 --users 20 --requests 200
+
+Set DATABASE_URL to benchmark against PostgreSQL instead of a temporary
+SQLite file; the seeded tables are dropped and recreated.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=3, help="Years of history per user")
+    parser.add_argument("--users", type=int, default=20, help="Users seeded with the same history")
+    parser.add_argument("--requests", type=int, default=200, help="Timed dashboard requests")
+    return parser.parse_args()
+
+
+args = parse_args()
+# Settings are read at import time, so they are set before the app modules load
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'health_dashboard.db')}")
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+import models  # noqa: F401 - registers the users table the health tables reference
+from database import Base, SessionLocal, async_engine, engine
+from health_api import router
+from health_models import CarePlan, HealthDailyRollup, HealthGoal, Medication, MedicationDose, SymptomLog, VitalSign
+from models import User
+
+app = FastAPI()
+app.include_router(router)
+
+
+def seed() -> int:
+    """Create the users and their history; returns the id of the user to time"""
+    tables = [table for table in Base.metadata.sorted_tables
+              if table.name in {"users"} or table.name in {model.__tablename__ for model in (
+                  CarePlan, HealthDailyRollup, HealthGoal, Medication, MedicationDose, SymptomLog, VitalSign)}]
+    Base.metadata.drop_all(bind=engine, tables=tables)
+    Base.metadata.create_all(bind=engine, tables=tables)
+
+    now = datetime.utcnow()
+    days = 365 * args.years
+    first_day = now - timedelta(days=days)
+    rng = random.Random(126)
+
+    with SessionLocal() as db:
+        users = [User(is_guest=True) for _ in range(args.users)]
+        db.add_all(users)
+        db.flush()
+
+        for user in users:
+            medications = [
+                Medication(user_id=user.id, name=name, reminder_times=times, start_date=first_day)
+                for name, times in (("metformin", ["08:00", "20:00"]), ("lisinopril", ["08:00"]))
+            ]
+            db.add_all(medications)
+            db.add_all([
+                CarePlan(user_id=user.id, title="Diabetes Management Plan", next_appointment=now + timedelta(days=14)),
+                CarePlan(user_id=user.id, title="Blood Pressure Plan", next_appointment=now + timedelta(days=30)),
+            ])
+            db.add_all([
+                HealthGoal(user_id=user.id, title=title, progress_percentage=rng.uniform(0, 100))
+                for title in ("Walk daily", "Lower A1C", "Take medications on time")
+            ])
+            db.flush()
+
+            vitals, symptoms, doses, rollups = [], [], [], []
+            for offset in range(days):
+                day = first_day + timedelta(days=offset)
+                for hour in (8, 20):
+                    vitals.append(dict(
+                        user_id=user.id, measurement_type="glucose", value=rng.uniform(80, 220), unit="mg/dL",
+                        measured_at=day.replace(hour=hour), is_abnormal=False, created_at=day
+                    ))
+                symptoms.append(dict(user_id=user.id, symptom="fatigue", severity=rng.randint(1, 10), logged_at=day))
+                for medication in medications:
+                    doses.append(dict(
+                        medication_id=medication.id, scheduled_time=day.replace(hour=8, minute=0, second=0, microsecond=0),
+                        taken_time=day, status="taken"
+                    ))
+                rollups.append(dict(
+                    user_id=user.id, day=day.date(), doses_taken=len(medications), doses_missed=0,
+                    symptom_count=1, vital_count=2, abnormal_vital_count=0
+                ))
+            db.execute(VitalSign.__table__.insert(), vitals)
+            db.execute(SymptomLog.__table__.insert(), symptoms)
+            db.execute(MedicationDose.__table__.insert(), doses)
+            db.execute(HealthDailyRollup.__table__.insert(), rollups)
+        db.commit()
+        return users[0].id
+
+
+async def main() -> None:
+    started = time.perf_counter()
+    user_id = seed()
+    print(f"Seeded {args.users} users x {args.years} years in {time.perf_counter() - started:.1f}s")
+
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        path = f"/api/health/dashboard/{user_id}"
+        for _ in range(10):  # Warm up connections and statement caches
+            (await client.get(path)).raise_for_status()
+
+        statements = 0
+        latencies = []
+        for _ in range(args.requests):
+            request_started = time.perf_counter()
+            (await client.get(path)).raise_for_status()
+            latencies.append((time.perf_counter() - request_started) * 1000)
+
+    latencies.sort()
+    print(
+        f"dashboard ({engine.dialect.name}): {statements / args.requests:.0f} statement(s) per request | "
+        f"latency ms: p50 {statistics.median(latencies):.2f}, "
+        f"p99 {latencies[max(0, math.ceil(0.99 * len(latencies)) - 1)]:.2f}, max {latencies[-1]:.2f}"
+    )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
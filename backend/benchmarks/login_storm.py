@@ -0,0 +1,202 @@
+"""
+Login storm benchmark
+
+Measures how long a chat-style request waits for the event loop while a
+burst of password logins or registrations is in flight, and how many
+database connections the burst holds. Each burst runs twice against an
+in-process app: once with bcrypt on the password hashing pool and the
+session's connection released first (as /token and /register do), and once
+the old way for comparison: logins through the blocking authenticate_user,
+registrations hashing while the lookup's connection is still checked out.
+
+Run from the backend directory:
+    python benchmarks/login_storm.py --logins 100 --rounds 12
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100, help="Concurrent logins in the storm")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor (BCRYPT_ROUNDS)")
+    parser.add_argument("--workers", type=int, default=4, help="Password hashing threads (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--probe-interval", type=float, default=0.02, help="Seconds between chat probes")
+    return parser.parse_args()
+
+
+args = parse_args()
+# Settings are read at import time, so they are set before the app modules load
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login_storm.db')}"
+os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+import httpx
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+
+from auth import (
+    authenticate_user,
+    authenticate_user_async,
+    get_password_hash,
+    get_password_hash_async,
+    get_user_by_username,
+)
+from database import SessionLocal, engine
+from models import User
+
+USERNAME = "intake"
+PASSWORD = "correct horse battery staple"
+
+new_usernames = (f"client{n}" for n in itertools.count())
+
+app = FastAPI()
+
+
+# Each handler uses its own session rather than get_db: with the blocking
+# check, get_db sessions from earlier requests are closed on the event loop
+# that the check is holding, so a storm larger than the pool would deadlock
+
+
+@app.post("/token")
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    with SessionLocal() as db:
+        if not await authenticate_user_async(db, form_data.username, form_data.password):
+            raise HTTPException(status_code=401)
+    return {"ok": True}
+
+
+@app.post("/token/blocking")
+async def login_blocking(form_data: OAuth2PasswordRequestForm = Depends()):
+    with SessionLocal() as db:
+        if not authenticate_user(db, form_data.username, form_data.password):
+            raise HTTPException(status_code=401)
+    return {"ok": True}
+
+
+@app.post("/register")
+async def register(form_data: OAuth2PasswordRequestForm = Depends()):
+    with SessionLocal() as db:
+        if get_user_by_username(db, form_data.username):
+            raise HTTPException(status_code=400)
+        db.rollback()
+        hashed_password = await get_password_hash_async(form_data.password)
+        db.add(User(username=form_data.username, hashed_password=hashed_password))
+        db.commit()
+    return {"ok": True}
+
+
+@app.post("/register/held")
+async def register_held(form_data: OAuth2PasswordRequestForm = Depends()):
+    with SessionLocal() as db:
+        if get_user_by_username(db, form_data.username):
+            raise HTTPException(status_code=400)
+        hashed_password = await get_password_hash_async(form_data.password)
+        db.add(User(username=form_data.username, hashed_password=hashed_password))
+        db.commit()
+    return {"ok": True}
+
+
+@app.get("/chat")
+async def chat():
+    return {"ok": True}
+
+
+def create_user() -> None:
+    User.__table__.create(bind=engine, checkfirst=True)
+    with SessionLocal() as db:
+        db.add(User(username=USERNAME, hashed_password=get_password_hash(PASSWORD)))
+        db.commit()
+
+
+async def probe_chat(client: httpx.AsyncClient, done: asyncio.Event, latencies: list, checked_out: list) -> None:
+    """
+    Send a chat request every probe interval
+
+    Latency runs from when the request was due, so time the event loop
+    spent blocked before it could send counts too. The pool's checked out
+    connection count is sampled alongside.
+    """
+    due = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        checked_out.append(engine.pool.checkedout())
+        await client.get("/chat")
+        latencies.append((time.perf_counter() - due) * 1000)
+        due += args.probe_interval
+
+
+def login_form() -> dict:
+    return {"username": USERNAME, "password": PASSWORD}
+
+
+def register_form() -> dict:
+    return {"username": next(new_usernames), "password": PASSWORD}
+
+
+async def run_storm(client: httpx.AsyncClient, path: str, form, count: int) -> dict:
+    done = asyncio.Event()
+    latencies = []
+    checked_out = []
+    prober = asyncio.create_task(probe_chat(client, done, latencies, checked_out))
+    await asyncio.sleep(0.2)  # Baseline probes before the storm
+    baseline = list(latencies)
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*[
+        client.post(path, data=form()) for _ in range(count)
+    ])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+
+    during = latencies[len(baseline):] or [float("nan")]
+    return {
+        "ok": sum(response.status_code == 200 for response in responses),
+        "elapsed": elapsed,
+        "baseline_p50": statistics.median(baseline),
+        "p50": statistics.median(during),
+        "p99": sorted(during)[max(0, math.ceil(0.99 * len(during)) - 1)],
+        "max": max(during),
+        "probes": len(during),
+        "max_checked_out": max(checked_out),
+    }
+
+
+async def main() -> None:
+    create_user()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        print(f"{args.logins} concurrent requests, bcrypt rounds={args.rounds}, {args.workers} hashing threads")
+        # Past the pool's size the old registrations wait for a connection
+        # inside a blocking checkout, stalling the event loop until the pool
+        # timeout, so that storm is kept to what the pool can hold
+        held_count = min(args.logins, engine.pool.size())
+        storms = (
+            ("offloaded (/token)", "/token", login_form, args.logins),
+            ("blocking login", "/token/blocking", login_form, args.logins),
+            ("offloaded (/register)", "/register", register_form, args.logins),
+            ("connection held (old)", "/register/held", register_form, held_count),
+        )
+        for label, path, form, count in storms:
+            result = await run_storm(client, path, form, count)
+            print(
+                f"{label:22} ok {result['ok']}/{count} in {result['elapsed']:.2f}s | "
+                f"chat latency ms: idle p50 {result['baseline_p50']:.1f}, storm p50 {result['p50']:.1f}, "
+                f"p99 {result['p99']:.1f}, max {result['max']:.1f} ({result['probes']} probes) | "
+                f"max connections held {result['max_checked_out']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,6 @@
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+import asyncio
 import os
 import json
 from google.cloud import aiplatform
@@ -7,7 +9,7 @@ from vertexai.generative_models import GenerativeModel, ChatSession, Content, Pa
 import vertexai
 from dotenv import load_dotenv
 
-from prompts import HOMELESS_ASSISTANT_PROMPT, REPORT_GENERATION_PROMPT
+from prompts import HOMELESS_ASSISTANT_PROMPT, REPORT_GENERATION_PROMPT, CONVERSATION_SUMMARY_PROMPT
 from tools import get_location_func, search_web_func, perform_web_search
 
 load_dotenv()
@@ -18,6 +20,11 @@ LOCATION = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
 PRIVATE_KEY_ID = os.getenv("VERTEX_AI_PRIVATE_KEY_ID")
 PRIVATE_KEY = os.getenv("VERTEX_AI_PRIVATE_KEY")
 CLIENT_EMAIL = os.getenv("VERTEX_AI_CLIENT_EMAIL")
+# Threads running tool calls; the tools make blocking HTTP requests (with
+# rate-limit waits and retry backoff) that must stay off the event loop
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+
+tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="chat-tool")
 
 # Initialize Vertex AI SDK
 try:
@@ -72,6 +79,22 @@ async def get_chatbot_response(messages: List[Dict[str, str]], conversation: Opt
     Returns:
         Assistant's response as a string or JSON for function calls
     """
+    response_text, _ = await get_chatbot_reply(messages, conversation)
+    return response_text
+
+
+async def get_chatbot_reply(messages: List[Dict[str, str]], conversation: Optional[object] = None) -> Tuple[str, List[Dict]]:
+    """
+    Get the chatbot response along with any resources its tools returned
+
+    Args:
+        messages: List of message dictionaries with 'role' and 'content' keys
+        conversation: Optional Conversation object containing user's location (latitude, longitude)
+
+    Returns:
+        Tuple of (assistant's response, structured resource records found by
+        search_web for maps and reports)
+    """
     try:
         # Combine all function declarations into a single tool
         # Vertex AI requires all functions in one Tool object
@@ -128,12 +151,13 @@ async def get_chatbot_response(messages: List[Dict[str, str]], conversation: Opt
                                 "type": "request_location",
                                 "reason": reason,
                                 "message": f"I'd like to help you find nearby resources. May I access your location {reason}?"
-                            })
+                            }), []
 
                         elif function_call.name == "search_web":
                             # Execute the web search
                             query = function_call.args.get("query", "")
                             max_results = function_call.args.get("max_results", 5)
+                            open_now = function_call.args.get("open_now", False)
                             print(f"Performing web search: {query}")
 
                             # Get location from conversation if available
@@ -144,18 +168,15 @@ async def get_chatbot_response(messages: List[Dict[str, str]], conversation: Opt
                                 longitude = conversation.longitude
                                 print(f"Using conversation location: {latitude}, {longitude}")
 
-                            search_results = perform_web_search(query, max_results, latitude, longitude)
+                            loop = asyncio.get_running_loop()
+                            search_results = await loop.run_in_executor(
+                                tool_executor, perform_web_search, query, max_results, latitude, longitude, open_now
+                            )
 
-                            # Extract resource data marker if present (before formatting for LLM)
-                            resource_data_marker = ""
+                            # Structured resource records are returned separately from the text
+                            resources = []
                             for result in search_results:
-                                if 'snippet' in result and '<!-- RESOURCE_DATA:' in result['snippet']:
-                                    import re
-                                    match = re.search(r'<!-- RESOURCE_DATA:.+? -->', result['snippet'], re.DOTALL)
-                                    if match:
-                                        resource_data_marker = match.group(0)
-                                        print(f"[Resource Data] Extracted marker from search results")
-                                        break
+                                resources.extend(result.get('resources') or [])
 
                             # Format search results for the LLM
                             results_text = f"Search results for '{query}':\n\n"
@@ -181,26 +202,39 @@ async def get_chatbot_response(messages: List[Dict[str, str]], conversation: Opt
                                 }
                             )
 
-                            # Append resource data marker to the response
-                            final_response = response.text
-                            if resource_data_marker:
-                                final_response += "\n\n" + resource_data_marker
-                                print(f"[Resource Data] Appended marker to LLM response")
+                            return response.text, resources
 
-                            return final_response
-
-            return response.text
+            return response.text, []
         else:
-            return "Hello! I'm here to help. How can I assist you today?"
+            return "Hello! I'm here to help. How can I assist you today?", []
 
     except Exception as e:
-        print(f"Error in get_chatbot_response: {str(e)}")
+        print(f"Error in get_chatbot_reply: {str(e)}")
         import traceback
         traceback.print_exc()
-        return f"I apologize, but I'm having trouble connecting right now. Error: {str(e)}"
+        return f"I apologize, but I'm having trouble connecting right now. Error: {str(e)}", []
+
 
+_report_model: Optional[GenerativeModel] = None
 
-async def generate_conversation_report(messages: List[Dict[str, str]], conversation_id: Optional[int] = None, db = None) -> str:
+
+def get_report_model() -> GenerativeModel:
+    """Shared model handle for report generation"""
+    global _report_model
+    if _report_model is None:
+        _report_model = GenerativeModel(
+            model_name="gemini-2.5-pro",
+            system_instruction="You are a professional social service assistant that generates well-structured, markdown-formatted reports focusing on user needs and available resources. Use proper markdown syntax with headers, lists, bold text, and clear organization."
+        )
+    return _report_model
+
+
+async def generate_conversation_report(
+    messages: List[Dict[str, str]],
+    conversation_id: Optional[int] = None,
+    db = None,
+    resources: Optional[List[Dict]] = None
+) -> str:
     """
     Generate a detailed report from the conversation using Vertex AI
     Includes health tracking data if available (medications, symptoms, vitals)
@@ -209,17 +243,48 @@ async def generate_conversation_report(messages: List[Dict[str, str]], conversat
         messages: List of all messages in the conversation
         conversation_id: Optional conversation ID to fetch health data
         db: Optional database session to query health data
+        resources: Resource records recommended during the conversation
 
     Returns:
         Formatted report as a string in Markdown format
     """
     try:
-        # Fetch health data if conversation_id and db provided
+        return await build_conversation_report(messages, conversation_id, db, resources=resources)
+    except Exception as e:
+        return f"# Error Generating Report\n\nAn error occurred while generating the report: {str(e)}"
+
+
+async def build_conversation_report(
+    messages: List[Dict[str, str]],
+    conversation_id: Optional[int] = None,
+    db = None,
+    summary: Optional[str] = None,
+    summarized_count: int = 0,
+    health_data_text: Optional[str] = None,
+    resources: Optional[List[Dict]] = None
+) -> str:
+    """
+    Generate a conversation report, raising on failure
+
+    Same as generate_conversation_report, but errors propagate so callers
+    such as background report jobs can tell a failed run from a report.
+    The model call is awaited, so the event loop stays free while it runs.
+
+    When a rolling summary is given, the prompt holds the summary plus only
+    the messages after the first summarized_count, so its size stays flat
+    however long the conversation gets. Batch callers pass health_data_text
+    preloaded instead of having it fetched per conversation.
+
+    Resources (from the message_resources table) are attached to the report
+    for the frontend map.
+    """
+    # Fetch health data if conversation_id and db provided
+    if health_data_text is None:
         health_data_text = ""
         if conversation_id and db:
             health_data_text = await get_health_summary(conversation_id, db)
 
-        report_prompt = """Based on the following conversation, generate a comprehensive assistance report in **Markdown format**.
+    report_prompt = """Based on the following conversation, generate a comprehensive assistance report in **Markdown format**.
 
 Focus primarily on:
 - **User Requirements**: What specific help the person asked for and their expressed needs
@@ -263,64 +328,78 @@ Please format the report professionally using proper Markdown syntax (headings,
 Conversation:
 """
 
-        # Add health tracking section if data exists
-        health_section = ""
-        if health_data_text:
-            health_section = """
+    # Add health tracking section if data exists
+    health_section = ""
+    if health_data_text:
+        health_section = """
 ## 🏥 Health Tracking Summary (Guest Mode)
 **Important**: The following health data was tracked during this conversation session. This information should be highlighted for healthcare providers.
 
 """ + health_data_text
 
-        # Format the prompt with health section
-        formatted_prompt = report_prompt.format(health_section=health_section)
+    # Format the prompt with health section
+    formatted_prompt = report_prompt.format(health_section=health_section)
 
-        # Add conversation to prompt
-        conversation_text = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
+    # Add conversation to prompt
+    conversation_text = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages[summarized_count if summary else 0:]])
+    if summary:
+        conversation_text = f"Summary of earlier messages:\n{summary}\n\nMost recent messages:\n{conversation_text}"
 
-        # Initialize the model for report generation
-        model = GenerativeModel(
+    response = await get_report_model().generate_content_async(
+        formatted_prompt + conversation_text,
+        generation_config={
+            'temperature': 0.5,
+            'max_output_tokens': 2000,
+        }
+    )
+
+    # Append resource data marker to the report if resources found
+    final_report = response.text
+    if resources:
+        # Remove duplicates based on resource type and ID
+        unique_resources = {(r.get('type'), r.get('id')): r for r in resources}.values()
+        resource_marker = f"\n\n<!-- RESOURCE_DATA:{json.dumps({'type': 'resource_list', 'resources': list(unique_resources)})} -->"
+        final_report += resource_marker
+        print(f"[Report] Appended {len(unique_resources)} unique resources to report")
+
+    return final_report
+
+
+_summary_model: Optional[GenerativeModel] = None
+
+
+def get_summary_model() -> GenerativeModel:
+    """Shared model handle for rolling conversation summaries"""
+    global _summary_model
+    if _summary_model is None:
+        _summary_model = GenerativeModel(
             model_name="gemini-2.5-pro",
-            system_instruction="You are a professional social service assistant that generates well-structured, markdown-formatted reports focusing on user needs and available resources. Use proper markdown syntax with headers, lists, bold text, and clear organization."
+            system_instruction=CONVERSATION_SUMMARY_PROMPT
         )
+    return _summary_model
 
-        response = model.generate_content(
-            formatted_prompt + conversation_text,
-            generation_config={
-                'temperature': 0.5,
-                'max_output_tokens': 2000,
-            }
-        )
 
-        # Extract all resource data from conversation messages
-        all_resources = []
-        import re
-        for msg in messages:
-            if msg['role'] == 'assistant' and 'content' in msg:
-                match = re.search(r'<!-- RESOURCE_DATA:(.+?) -->', msg['content'], re.DOTALL)
-                if match:
-                    try:
-                        import json
-                        resource_data = json.loads(match.group(1))
-                        if resource_data.get('type') == 'resource_list' and resource_data.get('resources'):
-                            all_resources.extend(resource_data['resources'])
-                            print(f"[Report] Found {len(resource_data['resources'])} resources in message")
-                    except Exception as e:
-                        print(f"[Report] Failed to parse resource data: {e}")
-
-        # Append resource data marker to the report if resources found
-        final_report = response.text
-        if all_resources:
-            # Remove duplicates based on resource ID
-            unique_resources = {r['id']: r for r in all_resources}.values()
-            resource_marker = f"\n\n<!-- RESOURCE_DATA:{json.dumps({'type': 'resource_list', 'resources': list(unique_resources)})} -->"
-            final_report += resource_marker
-            print(f"[Report] Appended {len(unique_resources)} unique resources to report")
-
-        return final_report
+async def summarize_conversation(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    """
+    Fold new messages into a conversation's rolling summary
 
-    except Exception as e:
-        return f"# Error Generating Report\n\nAn error occurred while generating the report: {str(e)}"
+    Args:
+        previous_summary: Current summary, or None for the first update
+        messages: Messages not yet covered by the summary, oldest first
+
+    Returns:
+        Updated summary as Markdown
+    """
+    conversation_text = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+
+    response = await get_summary_model().generate_content_async(
+        f"Existing summary:\n{previous_summary or '(none yet)'}\n\nNew messages:\n{conversation_text}",
+        generation_config={
+            'temperature': 0.3,
+            'max_output_tokens': 1000,
+        }
+    )
+    return response.text
 
 
 async def get_health_summary(conversation_id: int, db) -> str:
@@ -334,90 +413,184 @@ async def get_health_summary(conversation_id: int, db) -> str:
     Returns:
         Formatted markdown string with health data
     """
-    try:
-        from health_models import Medication, SymptomLog, VitalSign, CarePlan
-        from sqlalchemy import and_
+    # For guest mode, we use conversation_id as user_id
+    summaries = await get_health_summaries([conversation_id], db)
+    return summaries.get(conversation_id, "")
 
-        summary_parts = []
 
-        # Get user_id from conversation (for guest mode, we use conversation_id as user_id)
-        user_id = conversation_id
+async def get_health_summaries(user_ids: List[int], db) -> Dict[int, str]:
+    """
+    Get formatted health tracking summaries for many users at once
+
+    Runs one query per health table for the whole set of users, so the cost
+    does not grow with the number of users.
+
+    Args:
+        user_ids: User IDs (conversation IDs in guest mode)
+        db: Database session
+
+    Returns:
+        Dict mapping user ID to its markdown summary (users without health data are omitted)
+    """
+    try:
+        from health_models import Medication, SymptomLog, VitalSign, CarePlan, HealthDailyRollup
+        from medication_schedule import count_scheduled
+        from sqlalchemy import and_, func
+        from datetime import datetime, timedelta
+
+        if not user_ids:
+            return {}
 
-        # Get medications
         medications = db.query(Medication).filter(
-            and_(Medication.user_id == user_id, Medication.is_active == True)
+            and_(Medication.user_id.in_(user_ids), Medication.is_active == True)
+        ).order_by(Medication.user_id, Medication.id).all()
+
+        # Latest 10 symptoms and vitals per user
+        symptom_rank = db.query(
+            SymptomLog.id.label("id"),
+            func.row_number().over(
+                partition_by=SymptomLog.user_id,
+                order_by=SymptomLog.logged_at.desc()
+            ).label("rank")
+        ).filter(SymptomLog.user_id.in_(user_ids)).subquery()
+        symptoms = db.query(SymptomLog).join(
+            symptom_rank, SymptomLog.id == symptom_rank.c.id
+        ).filter(symptom_rank.c.rank <= 10).order_by(
+            SymptomLog.user_id, SymptomLog.logged_at.desc()
         ).all()
 
-        if medications:
-            summary_parts.append("### 💊 Medications Tracked")
-            for med in medications:
-                summary_parts.append(f"- **{med.name}** ({med.dosage})")
-                summary_parts.append(f"  - Frequency: {med.frequency}")
-                if med.purpose:
-                    summary_parts.append(f"  - Purpose: {med.purpose}")
-                if med.reminder_times:
-                    summary_parts.append(f"  - Reminder times: {', '.join(med.reminder_times)}")
-            summary_parts.append("")
-
-        # Get symptoms
-        symptoms = db.query(SymptomLog).filter(
-            SymptomLog.user_id == user_id
-        ).order_by(SymptomLog.logged_at.desc()).limit(10).all()
-
-        if symptoms:
-            summary_parts.append("### 📋 Symptoms Logged")
-            for symptom in symptoms:
-                severity_indicator = "🟢" if symptom.severity <= 3 else "🟡" if symptom.severity <= 6 else "🔴"
-                summary_parts.append(f"- {severity_indicator} **{symptom.symptom}** (Severity: {symptom.severity}/10)")
-                if symptom.duration:
-                    summary_parts.append(f"  - Duration: {symptom.duration}")
-                if symptom.description:
-                    summary_parts.append(f"  - Notes: {symptom.description}")
-                summary_parts.append(f"  - Logged: {symptom.logged_at.strftime('%Y-%m-%d %H:%M')}")
-            summary_parts.append("")
-
-        # Get vital signs
-        vitals = db.query(VitalSign).filter(
-            VitalSign.user_id == user_id
-        ).order_by(VitalSign.measured_at.desc()).limit(10).all()
-
-        if vitals:
-            summary_parts.append("### ❤️ Vital Signs Recorded")
-            for vital in vitals:
-                abnormal_flag = " ⚠️ **ABNORMAL**" if vital.is_abnormal else ""
-                if vital.measurement_type == 'blood_pressure':
-                    summary_parts.append(f"- **Blood Pressure**: {vital.systolic}/{vital.diastolic} mmHg{abnormal_flag}")
-                else:
-                    summary_parts.append(f"- **{vital.measurement_type.replace('_', ' ').title()}**: {vital.value} {vital.unit}{abnormal_flag}")
-                summary_parts.append(f"  - Measured: {vital.measured_at.strftime('%Y-%m-%d %H:%M')}")
-                if vital.notes:
-                    summary_parts.append(f"  - Notes: {vital.notes}")
-            summary_parts.append("")
-
-        # Get care plans
-        care_plans = db.query(CarePlan).filter(
-            and_(CarePlan.user_id == user_id, CarePlan.status == 'active')
+        vital_rank = db.query(
+            VitalSign.id.label("id"),
+            func.row_number().over(
+                partition_by=VitalSign.user_id,
+                order_by=VitalSign.measured_at.desc()
+            ).label("rank")
+        ).filter(VitalSign.user_id.in_(user_ids)).subquery()
+        vitals = db.query(VitalSign).join(
+            vital_rank, VitalSign.id == vital_rank.c.id
+        ).filter(vital_rank.c.rank <= 10).order_by(
+            VitalSign.user_id, VitalSign.measured_at.desc()
         ).all()
 
-        if care_plans:
-            summary_parts.append("### 📖 Active Care Plans")
-            for plan in care_plans:
-                summary_parts.append(f"- **{plan.title}**")
-                if plan.condition:
-                    summary_parts.append(f"  - Condition: {plan.condition}")
-                if plan.primary_provider:
-                    summary_parts.append(f"  - Provider: {plan.primary_provider}")
-                if plan.next_appointment:
-                    summary_parts.append(f"  - Next Appointment: {plan.next_appointment.strftime('%Y-%m-%d')}")
-            summary_parts.append("")
-
-        if summary_parts:
-            summary_parts.insert(0, "**Note**: This health information was self-reported during the conversation and should be verified by healthcare professionals.")
-            summary_parts.insert(1, "")
-            return "\n".join(summary_parts)
-        else:
-            return ""
+        care_plans = db.query(CarePlan).filter(
+            and_(CarePlan.user_id.in_(user_ids), CarePlan.status == 'active')
+        ).order_by(CarePlan.user_id, CarePlan.id).all()
+
+        # Last 30 days of totals from the daily rollups, one row per user
+        now = datetime.utcnow()
+        rollup_start = now.date() - timedelta(days=30)
+        rollups = {
+            row.user_id: row
+            for row in db.query(
+                HealthDailyRollup.user_id,
+                func.sum(HealthDailyRollup.doses_taken).label("doses_taken"),
+                func.sum(HealthDailyRollup.doses_missed).label("doses_missed"),
+                func.sum(HealthDailyRollup.symptom_count).label("symptom_count"),
+                func.max(HealthDailyRollup.symptom_max_severity).label("symptom_max_severity"),
+                func.sum(HealthDailyRollup.vital_count).label("vital_count"),
+                func.sum(HealthDailyRollup.abnormal_vital_count).label("abnormal_vital_count")
+            ).filter(
+                and_(
+                    HealthDailyRollup.user_id.in_(user_ids),
+                    HealthDailyRollup.day >= rollup_start,
+                    HealthDailyRollup.day <= now.date()
+                )
+            ).group_by(HealthDailyRollup.user_id).all()
+        }
+
+        by_user = {user_id: ([], [], [], []) for user_id in user_ids}
+        for index, rows in enumerate((medications, symptoms, vitals, care_plans)):
+            for row in rows:
+                by_user[row.user_id][index].append(row)
+
+        summaries = {}
+        for user_id, (user_medications, user_symptoms, user_vitals, user_care_plans) in by_user.items():
+            # Doses expected over the same 30 days, from the virtual schedule
+            doses_scheduled = sum(
+                count_scheduled(medication, datetime.combine(rollup_start, datetime.min.time()), now)
+                for medication in user_medications
+            )
+            summary = _format_health_summary(
+                user_medications, user_symptoms, user_vitals, user_care_plans,
+                rollups.get(user_id), doses_scheduled
+            )
+            if summary:
+                summaries[user_id] = summary
+        return summaries
 
     except Exception as e:
         print(f"Error fetching health summary: {e}")
-        return ""
+        return {}
+
+
+def _format_health_summary(medications, symptoms, vitals, care_plans, rollup=None, doses_scheduled: int = 0) -> str:
+    """Format one user's health records as the report's markdown health section"""
+    summary_parts = []
+
+    if rollup and (doses_scheduled or rollup.symptom_count or rollup.vital_count):
+        summary_parts.append("### 📊 Last 30 Days")
+        if doses_scheduled:
+            adherence = min(100.0, rollup.doses_taken / doses_scheduled * 100)
+            summary_parts.append(
+                f"- Medication doses: {rollup.doses_taken} taken, {rollup.doses_missed} missed "
+                f"of {doses_scheduled} scheduled ({adherence:.0f}% adherence)"
+            )
+        if rollup.symptom_count:
+            summary_parts.append(f"- Symptoms logged: {rollup.symptom_count} (highest severity: {rollup.symptom_max_severity}/10)")
+        if rollup.vital_count:
+            summary_parts.append(f"- Vital sign readings: {rollup.vital_count} ({rollup.abnormal_vital_count} abnormal)")
+        summary_parts.append("")
+
+    if medications:
+        summary_parts.append("### 💊 Medications Tracked")
+        for med in medications:
+            summary_parts.append(f"- **{med.name}** ({med.dosage})")
+            summary_parts.append(f"  - Frequency: {med.frequency}")
+            if med.purpose:
+                summary_parts.append(f"  - Purpose: {med.purpose}")
+            if med.reminder_times:
+                summary_parts.append(f"  - Reminder times: {', '.join(med.reminder_times)}")
+        summary_parts.append("")
+
+    if symptoms:
+        summary_parts.append("### 📋 Symptoms Logged")
+        for symptom in symptoms:
+            severity_indicator = "🟢" if symptom.severity <= 3 else "🟡" if symptom.severity <= 6 else "🔴"
+            summary_parts.append(f"- {severity_indicator} **{symptom.symptom}** (Severity: {symptom.severity}/10)")
+            if symptom.duration:
+                summary_parts.append(f"  - Duration: {symptom.duration}")
+            if symptom.description:
+                summary_parts.append(f"  - Notes: {symptom.description}")
+            summary_parts.append(f"  - Logged: {symptom.logged_at.strftime('%Y-%m-%d %H:%M')}")
+        summary_parts.append("")
+
+    if vitals:
+        summary_parts.append("### ❤️ Vital Signs Recorded")
+        for vital in vitals:
+            abnormal_flag = " ⚠️ **ABNORMAL**" if vital.is_abnormal else ""
+            if vital.measurement_type == 'blood_pressure':
+                summary_parts.append(f"- **Blood Pressure**: {vital.systolic}/{vital.diastolic} mmHg{abnormal_flag}")
+            else:
+                summary_parts.append(f"- **{vital.measurement_type.replace('_', ' ').title()}**: {vital.value} {vital.unit}{abnormal_flag}")
+            summary_parts.append(f"  - Measured: {vital.measured_at.strftime('%Y-%m-%d %H:%M')}")
+            if vital.notes:
+                summary_parts.append(f"  - Notes: {vital.notes}")
+        summary_parts.append("")
+
+    if care_plans:
+        summary_parts.append("### 📖 Active Care Plans")
+        for plan in care_plans:
+            summary_parts.append(f"- **{plan.title}**")
+            if plan.condition:
+                summary_parts.append(f"  - Condition: {plan.condition}")
+            if plan.primary_provider:
+                summary_parts.append(f"  - Provider: {plan.primary_provider}")
+            if plan.next_appointment:
+                summary_parts.append(f"  - Next Appointment: {plan.next_appointment.strftime('%Y-%m-%d')}")
+        summary_parts.append("")
+
+    if summary_parts:
+        summary_parts.insert(0, "**Note**: This health information was self-reported during the conversation and should be verified by healthcare professionals.")
+        summary_parts.insert(1, "")
+        return "\n".join(summary_parts)
+    return ""
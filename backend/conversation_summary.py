@@ -0,0 +1,110 @@
+"""
+Rolling conversation summaries
+
+Every CONVERSATION_SUMMARY_EVERY_TURNS turns, older messages are folded into
+Conversation.summary in the background. Reports then read the summary plus
+the un-summarized tail instead of the whole transcript.
+"""
+
+import asyncio
+import os
+from typing import List, Optional, Set, Tuple
+
+from database import SessionLocal
+from models import Conversation, Message
+from chatbot import summarize_conversation
+
+# Update the summary after this many user/assistant turns (0 disables summaries)
+SUMMARY_EVERY_TURNS = int(os.getenv("CONVERSATION_SUMMARY_EVERY_TURNS", "10"))
+# Most recent messages left out of the summary so reports see them verbatim
+SUMMARY_KEEP_RECENT_MESSAGES = int(os.getenv("CONVERSATION_SUMMARY_KEEP_RECENT_MESSAGES", "6"))
+
+_in_progress: Set[int] = set()
+_tasks: Set[asyncio.Task] = set()
+
+
+def should_update_summary(message_count: int) -> bool:
+    """Whether a conversation with message_count messages is due a summary update"""
+    interval = SUMMARY_EVERY_TURNS * 2
+    return interval > 0 and message_count >= interval and message_count % interval == 0
+
+
+def schedule_summary_update(conversation_id: int) -> None:
+    """Update a conversation's summary in the background, once at a time per conversation"""
+    if conversation_id in _in_progress:
+        return
+    _in_progress.add(conversation_id)
+    task = asyncio.create_task(update_conversation_summary(conversation_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def update_conversation_summary(conversation_id: int) -> None:
+    """
+    Fold all but the most recent messages into the conversation's summary
+
+    The summary and messages are read in one short session and the result is
+    written in another, so no connection is held during the model call. The
+    write only applies if summary_message_id has not moved in the meantime.
+    """
+    try:
+        db = SessionLocal()
+        try:
+            conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+            if not conversation:
+                return
+            previous_summary = conversation.summary
+            previous_message_id = conversation.summary_message_id
+
+            query = db.query(Message).filter(Message.conversation_id == conversation_id)
+            if previous_message_id is not None:
+                query = query.filter(Message.id > previous_message_id)
+            pending = query.order_by(Message.id).all()
+
+            to_fold = pending[:-SUMMARY_KEEP_RECENT_MESSAGES] if SUMMARY_KEEP_RECENT_MESSAGES else pending
+            to_fold = [{"id": msg.id, "role": msg.role, "content": msg.content} for msg in to_fold]
+        finally:
+            db.close()
+        if not to_fold:
+            return
+
+        summary = await summarize_conversation(
+            previous_summary,
+            [{"role": msg["role"], "content": msg["content"]} for msg in to_fold]
+        )
+
+        db = SessionLocal()
+        try:
+            if previous_message_id is None:
+                unchanged = Conversation.summary_message_id.is_(None)
+            else:
+                unchanged = Conversation.summary_message_id == previous_message_id
+            updated = db.query(Conversation).filter(Conversation.id == conversation_id, unchanged).update(
+                {Conversation.summary: summary, Conversation.summary_message_id: to_fold[-1]["id"]},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        if updated:
+            print(f"[Summary] Folded {len(to_fold)} messages into summary for conversation {conversation_id}")
+        else:
+            print(f"[Summary] Summary for conversation {conversation_id} changed while updating; discarded")
+    except Exception as e:
+        print(f"[Summary] Failed to update summary for conversation {conversation_id}: {str(e)}")
+    finally:
+        _in_progress.discard(conversation_id)
+
+
+def split_summarized(conversation: Conversation, messages: List[Message]) -> Tuple[Optional[str], int]:
+    """
+    Get the summary covering the start of messages
+
+    Returns:
+        Tuple of (summary or None, number of leading messages it covers)
+    """
+    if not conversation.summary or conversation.summary_message_id is None:
+        return None, 0
+    summarized_count = sum(1 for msg in messages if msg.id <= conversation.summary_message_id)
+    return conversation.summary, summarized_count
@@ -4,10 +4,35 @@ Convert CSV datasets to JSON format for the homeless assistance chatbot
 import csv
 import json
 import os
+import re
+import sys
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Allow importing backend modules when run from the datasets directory
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+from opening_hours import parse_weekly_hours
+
+# Program types that operate around the clock (crisis units, psychiatric emergency/screening)
+ALWAYS_OPEN_PROGRAM_PATTERN = re.compile(
+    r"24/7|crisis stabili[sz]ation|crisis residential|emerg(ency)? psych|psych(iatric)? (emergency|screening)|emergency screening",
+    re.IGNORECASE
+)
+
+
+def infer_service_hours(row: dict) -> str:
+    """
+    Infer opening hours for a behavioral health service row
+
+    The CSV has no hours column, so only programs whose description marks
+    them as round-the-clock facilities get hours; everything else is unknown.
+    """
+    text = " ".join([row.get('Program', ''), row.get('Description', ''), row.get('Services', '')])
+    if ALWAYS_OPEN_PROGRAM_PATTERN.search(text):
+        return "Open 24/7"
+    return "Call for hours"
+
 
 def convert_behavioral_health_to_healthcare():
     """
@@ -41,7 +66,7 @@ def convert_behavioral_health_to_healthcare():
                 "services": services_list if services_list else ["mental health", "behavioral health"],
                 "address": row['Address'],
                 "phone": row['Phone'] if row['Phone'] else "N/A",
-                "hours": "Call for hours",
+                "hours": infer_service_hours(row),
                 "requirements": row['Population'] if row['Population'] else "Varies by program",
                 "coordinates": {
                     "latitude": float(row['LAT']),
@@ -103,6 +128,37 @@ def convert_transit_stops():
     print(f"✓ Converted {len(stops)} transit stops to {json_file}")
 
 
+def build_resource_hours():
+    """
+    Build resource_hours.json with structured weekly hours for known resources
+
+    Keys are "health_services:<FID>"; healthcare_resources.json ids and the
+    health_services table fid column both use the CSV FID.
+    """
+    csv_file = os.path.join(SCRIPT_DIR, 'Behavioral_Health_Services_San_Diego_County_1657686067853346365.csv')
+    json_file = os.path.join(SCRIPT_DIR, 'resource_hours.json')
+
+    resource_hours = {}
+
+    with open(csv_file, 'r', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+
+        for row in reader:
+            weekly_hours = parse_weekly_hours(infer_service_hours(row))
+            if weekly_hours is None or not row['FID']:
+                continue
+
+            entry = weekly_hours.to_dict()
+            entry["name"] = row['Program'] if row['Program'] else "Behavioral Health Services"
+            entry["address"] = row['Address']
+            resource_hours[f"health_services:{row['FID']}"] = entry
+
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(resource_hours, f, indent=2, ensure_ascii=False)
+
+    print(f"✓ Wrote structured hours for {len(resource_hours)} resources to {json_file}")
+
+
 def note_missing_datasets():
     """
     Print note about missing datasets
@@ -124,6 +180,9 @@ if __name__ == "__main__":
     # Convert public transit stops
     convert_transit_stops()
 
+    # Build structured opening hours
+    build_resource_hours()
+
     # Print notes about missing data
     note_missing_datasets()
 
@@ -2,25 +2,47 @@
 Health and Chronic Care Management API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import JSON, Boolean, DateTime, Float, and_, bindparam, case, func, literal_column, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from typing import List, Optional
 from datetime import datetime, timedelta
+import json
+import math
 
-from database import get_db
+from database import get_async_db
 from health_models import (
     Medication, MedicationDose, SymptomLog, VitalSign,
-    CarePlan, HealthGoal, HealthNote
+    CarePlan, HealthGoal, HealthNote, HealthDailyRollup, SymptomDailyRollup
 )
+from health_rollups import (
+    record_symptom_rollup, record_vital_rollup,
+    record_dose_status_change, remove_doses_from_rollups, dialect_insert
+)
+from health_sync import HEALTH_SYNC_PAGE_SIZE, SYNC_TABLES, add_tombstone, decode_sync_cursor, sync_changes
+from health_ingest import HEALTH_BATCH_MAX_ITEMS, flag_abnormal_vitals, ingest_symptoms, ingest_vitals
+from health_pagination import (
+    HEALTH_PAGE_SIZE, HEALTH_PAGE_SIZE_MAX, NEXT_CURSOR_HEADER,
+    fetch_page, page_position, set_next_cursor
+)
+from health_timeline import (
+    TIMELINE_SOURCES, encode_timeline_cursor, stream_timeline, timeline_page, timeline_position
+)
+from medication_schedule import count_scheduled, expand_doses, is_scheduled_time, parse_reminder_times
+from reminder_scheduler import reminder_scheduler
 from health_schemas import (
     MedicationCreate, MedicationUpdate, MedicationResponse,
-    MedicationDoseCreate, MedicationDoseUpdate, MedicationDoseResponse,
+    MedicationDoseCreate, MedicationDoseUpdate, MedicationDoseRecord, MedicationDoseResponse,
     SymptomLogCreate, SymptomLogResponse,
     VitalSignCreate, VitalSignResponse,
     CarePlanCreate, CarePlanUpdate, CarePlanResponse,
     HealthGoalCreate, HealthGoalUpdate, HealthGoalResponse,
-    HealthDashboardSummary, MedicationAdherenceStats
+    HealthDashboardSummary, MedicationAdherenceStats,
+    HealthBatchRequest, BatchIngestResponse, HealthSyncResponse, TimelineEvent
 )
 
 router = APIRouter(prefix="/api/health", tags=["health"])
@@ -31,39 +53,40 @@ router = APIRouter(prefix="/api/health", tags=["health"])
 # ============================================================================
 
 @router.post("/medications", response_model=MedicationResponse)
-async def create_medication(medication: MedicationCreate, db: Session = Depends(get_db)):
-    """Create a new medication entry"""
-    db_medication = Medication(**medication.dict())
+async def create_medication(medication: MedicationCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new medication entry (doses are scheduled from reminder_times)"""
+    db_medication = Medication(**medication.dict(exclude_none=True))
     db.add(db_medication)
-    db.commit()
-    db.refresh(db_medication)
-
-    # Generate reminder schedule if enabled
-    if medication.reminder_enabled and medication.reminder_times:
-        generate_medication_reminders(db, db_medication)
-
+    await db.commit()
+    await db.refresh(db_medication)
+    reminder_scheduler.reschedule()
     return db_medication
 
 
 @router.get("/medications", response_model=List[MedicationResponse])
 async def get_medications(
     user_id: int,
+    response: Response,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all medications for a user"""
-    query = db.query(Medication).filter(Medication.user_id == user_id)
+    """Get a page of a user's medications, newest first"""
+    query = select(Medication).where(Medication.user_id == user_id)
 
     if active_only:
-        query = query.filter(Medication.is_active == True)
+        query = query.where(Medication.is_active == True)
 
-    return query.order_by(Medication.created_at.desc()).all()
+    return await fetch_page(
+        db, query, Medication.created_at, Medication.id, page_position(cursor), limit, response
+    )
 
 
 @router.get("/medications/{medication_id}", response_model=MedicationResponse)
-async def get_medication(medication_id: int, db: Session = Depends(get_db)):
+async def get_medication(medication_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific medication"""
-    medication = db.query(Medication).filter(Medication.id == medication_id).first()
+    medication = await db.get(Medication, medication_id)
     if not medication:
         raise HTTPException(status_code=404, detail="Medication not found")
     return medication
@@ -73,30 +96,36 @@ async def get_medication(medication_id: int, db: Session = Depends(get_db)):
 async def update_medication(
     medication_id: int,
     medication_update: MedicationUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a medication"""
-    medication = db.query(Medication).filter(Medication.id == medication_id).first()
+    medication = await db.get(Medication, medication_id)
     if not medication:
         raise HTTPException(status_code=404, detail="Medication not found")
 
-    for field, value in medication_update.dict(exclude_unset=True).items():
+    updates = medication_update.dict(exclude_unset=True)
+    for field, value in updates.items():
         setattr(medication, field, value)
 
-    db.commit()
-    db.refresh(medication)
+    await db.commit()
+    await db.refresh(medication)
+    if "reminder_times" in updates:
+        reminder_scheduler.reschedule()
     return medication
 
 
 @router.delete("/medications/{medication_id}")
-async def delete_medication(medication_id: int, db: Session = Depends(get_db)):
+async def delete_medication(medication_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a medication"""
-    medication = db.query(Medication).filter(Medication.id == medication_id).first()
+    # Load doses up front so the delete cascade needs no lazy load
+    medication = await db.get(Medication, medication_id, options=[selectinload(Medication.doses)])
     if not medication:
         raise HTTPException(status_code=404, detail="Medication not found")
 
-    db.delete(medication)
-    db.commit()
+    await remove_doses_from_rollups(db, medication.user_id, medication.doses)
+    add_tombstone(db, "medications", medication.user_id, medication.id)
+    await db.delete(medication)
+    await db.commit()
     return {"message": "Medication deleted successfully"}
 
 
@@ -104,65 +133,163 @@ async def delete_medication(medication_id: int, db: Session = Depends(get_db)):
 # MEDICATION DOSE TRACKING
 # ============================================================================
 
+async def _apply_dose_update(db: AsyncSession, dose: MedicationDose, user_id: int, dose_update: MedicationDoseUpdate):
+    """Set a dose's status and move it between rollup counters"""
+    old_status = dose.status
+    dose.taken_time = dose_update.taken_time or datetime.utcnow()
+    dose.status = dose_update.status
+    dose.notes = dose_update.notes
+
+    await record_dose_status_change(db, user_id, dose.scheduled_time, old_status, dose.status)
+    await db.commit()
+    await db.refresh(dose)
+    return dose
+
+
+@router.post("/medications/doses", response_model=MedicationDoseResponse)
+async def record_scheduled_dose(dose_record: MedicationDoseRecord, db: AsyncSession = Depends(get_async_db)):
+    """Record that a dose, identified by medication and scheduled time, was taken, missed or skipped"""
+    medication = await db.get(Medication, dose_record.medication_id)
+    if not medication:
+        raise HTTPException(status_code=404, detail="Medication not found")
+
+    # Only a time from the medication's schedule names a dose. A row recorded
+    # under an earlier schedule (before reminder_times changed) still counts.
+    if not is_scheduled_time(medication, dose_record.scheduled_time) and not await db.scalar(
+        select(MedicationDose.id).where(
+            and_(
+                MedicationDose.medication_id == dose_record.medication_id,
+                MedicationDose.scheduled_time == dose_record.scheduled_time
+            )
+        )
+    ):
+        raise HTTPException(status_code=400, detail="scheduled_time is not a scheduled dose of this medication")
+
+    # First action on a dose creates its row (it only existed in the virtual
+    # schedule until now). The insert is a no-op when the row exists, and the
+    # locked re-read makes concurrent records of one dose apply in turn, each
+    # seeing the status the previous one left for the rollup counters.
+    await db.execute(
+        dialect_insert(db, MedicationDose).values(
+            medication_id=dose_record.medication_id,
+            scheduled_time=dose_record.scheduled_time,
+            status="scheduled"
+        ).on_conflict_do_nothing(index_elements=["medication_id", "scheduled_time"])
+    )
+    dose = (await db.execute(select(MedicationDose).where(
+        and_(
+            MedicationDose.medication_id == dose_record.medication_id,
+            MedicationDose.scheduled_time == dose_record.scheduled_time
+        )
+    ).with_for_update().execution_options(populate_existing=True))).scalars().one()
+
+    return await _apply_dose_update(db, dose, medication.user_id, dose_record)
+
+
 @router.post("/medications/doses/record")
 async def record_medication_dose(
     dose_update: MedicationDoseUpdate,
     dose_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Record that a medication dose was taken"""
-    dose = db.query(MedicationDose).filter(MedicationDose.id == dose_id).first()
+    """Update a previously recorded medication dose"""
+    dose = await db.get(MedicationDose, dose_id)
     if not dose:
         raise HTTPException(status_code=404, detail="Dose not found")
 
-    dose.taken_time = dose_update.taken_time or datetime.utcnow()
-    dose.status = dose_update.status
-    dose.notes = dose_update.notes
-
-    db.commit()
-    db.refresh(dose)
-    return dose
+    user_id = await db.scalar(select(Medication.user_id).where(Medication.id == dose.medication_id))
+    return await _apply_dose_update(db, dose, user_id, dose_update)
 
 
 @router.get("/medications/{medication_id}/doses", response_model=List[MedicationDoseResponse])
 async def get_medication_doses(
     medication_id: int,
+    response: Response,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get dose history for a medication"""
-    query = db.query(MedicationDose).filter(MedicationDose.medication_id == medication_id)
+    """
+    Get a page of scheduled and recorded doses for a medication, newest first
+    (default: last 30 days and next 7)
+
+    The schedule is expanded backwards from the cursor a few days at a time,
+    only as far as the page needs.
+    """
+    medication = await db.get(Medication, medication_id)
+    if not medication:
+        raise HTTPException(status_code=404, detail="Medication not found")
 
-    if start_date:
-        query = query.filter(MedicationDose.scheduled_time >= start_date)
-    if end_date:
-        query = query.filter(MedicationDose.scheduled_time <= end_date)
+    now = datetime.utcnow()
+    start_date = start_date or now - timedelta(days=30)
+    end_date = end_date or now + timedelta(days=7)
+
+    # Virtual doses have no id; they sort as 0 after recorded doses at the same time
+    def dose_key(dose):
+        return dose["scheduled_time"], dose["id"] or 0
+
+    position = page_position(cursor)
+    if position is not None:
+        end_date = min(end_date, position[0] + timedelta(microseconds=1))
+
+    doses_per_day = max(1, len(parse_reminder_times(medication.reminder_times)))
+    chunk = timedelta(days=math.ceil((limit + 1) / doses_per_day))
+
+    page = []
+    chunk_end = end_date
+    while chunk_end > start_date and len(page) <= limit:
+        chunk_start = max(start_date, chunk_end - chunk)
+        recorded = (await db.execute(select(MedicationDose).where(
+            and_(
+                MedicationDose.medication_id == medication_id,
+                MedicationDose.scheduled_time >= chunk_start,
+                MedicationDose.scheduled_time < chunk_end
+            )
+        ))).scalars().all()
+
+        doses = sorted(expand_doses([medication], chunk_start, chunk_end, recorded), key=dose_key, reverse=True)
+        page.extend(dose for dose in doses if position is None or dose_key(dose) < position)
+        chunk_end = chunk_start
 
-    return query.order_by(MedicationDose.scheduled_time.desc()).all()
+    if len(page) > limit:
+        page = page[:limit]
+        set_next_cursor(response, *dose_key(page[-1]))
+    return page
 
 
 @router.get("/medications/doses/upcoming")
 async def get_upcoming_doses(
     user_id: int,
     hours: int = 24,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get upcoming medication doses for the next N hours"""
     now = datetime.utcnow()
     end_time = now + timedelta(hours=hours)
 
-    doses = db.query(MedicationDose).join(Medication).filter(
+    medications = (await db.execute(select(Medication).where(
+        and_(Medication.user_id == user_id, Medication.is_active == True)
+    ))).scalars().all()
+    if not medications:
+        return []
+
+    recorded = (await db.execute(select(MedicationDose).where(
         and_(
-            Medication.user_id == user_id,
-            Medication.is_active == True,
+            MedicationDose.medication_id.in_([medication.id for medication in medications]),
             MedicationDose.scheduled_time >= now,
-            MedicationDose.scheduled_time <= end_time,
-            MedicationDose.status == "scheduled"
+            MedicationDose.scheduled_time < end_time
         )
-    ).order_by(MedicationDose.scheduled_time).all()
+    ))).scalars().all()
 
-    return doses
+    names = {medication.id: medication.name for medication in medications}
+    upcoming = []
+    for dose in expand_doses(medications, now, end_time, recorded):
+        if dose["status"] == "scheduled":
+            dose["medication_name"] = names.get(dose["medication_id"])
+            upcoming.append(dose)
+    return upcoming
 
 
 # ============================================================================
@@ -170,12 +297,14 @@ async def get_upcoming_doses(
 # ============================================================================
 
 @router.post("/symptoms", response_model=SymptomLogResponse)
-async def log_symptom(symptom: SymptomLogCreate, db: Session = Depends(get_db)):
+async def log_symptom(symptom: SymptomLogCreate, db: AsyncSession = Depends(get_async_db)):
     """Log a new symptom"""
     db_symptom = SymptomLog(**symptom.dict())
+    db_symptom.logged_at = db_symptom.logged_at or datetime.utcnow()
     db.add(db_symptom)
-    db.commit()
-    db.refresh(db_symptom)
+    await record_symptom_rollup(db, db_symptom)
+    await db.commit()
+    await db.refresh(db_symptom)
 
     # Check if symptom is severe and requires alert
     if symptom.severity >= 8:
@@ -185,55 +314,77 @@ async def log_symptom(symptom: SymptomLogCreate, db: Session = Depends(get_db)):
     return db_symptom
 
 
+@router.post("/symptoms/batch", response_model=BatchIngestResponse)
+async def log_symptoms_batch(batch: HealthBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Log many symptoms in one transaction, e.g. a backlog synced from an offline device
+
+    Invalid items are reported in their result and skipped; the rest are
+    inserted together.
+    """
+    check_batch_size(batch)
+    response = await ingest_symptoms(db, batch.items)
+    await db.commit()
+    return response
+
+
 @router.get("/symptoms", response_model=List[SymptomLogResponse])
 async def get_symptoms(
     user_id: int,
+    response: Response,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     symptom_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get symptom logs for a user"""
-    query = db.query(SymptomLog).filter(SymptomLog.user_id == user_id)
+    """Get a page of a user's symptom logs, newest first"""
+    query = select(SymptomLog).where(SymptomLog.user_id == user_id)
 
     if start_date:
-        query = query.filter(SymptomLog.logged_at >= start_date)
+        query = query.where(SymptomLog.logged_at >= start_date)
     if end_date:
-        query = query.filter(SymptomLog.logged_at <= end_date)
+        query = query.where(SymptomLog.logged_at <= end_date)
     if symptom_type:
-        query = query.filter(SymptomLog.symptom.ilike(f"%{symptom_type}%"))
+        query = query.where(SymptomLog.symptom.ilike(f"%{symptom_type}%"))
 
-    return query.order_by(SymptomLog.logged_at.desc()).all()
+    return await fetch_page(
+        db, query, SymptomLog.logged_at, SymptomLog.id, page_position(cursor), limit, response
+    )
 
 
 @router.get("/symptoms/trends")
 async def get_symptom_trends(
     user_id: int,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get symptom trends over time"""
-    start_date = datetime.utcnow() - timedelta(days=days)
-
-    # Group symptoms by type and calculate average severity
-    trends = db.query(
-        SymptomLog.symptom,
-        func.count(SymptomLog.id).label('count'),
-        func.avg(SymptomLog.severity).label('avg_severity'),
-        func.max(SymptomLog.severity).label('max_severity')
-    ).filter(
-        and_(
-            SymptomLog.user_id == user_id,
-            SymptomLog.logged_at >= start_date
-        )
-    ).group_by(SymptomLog.symptom).all()
+    start_day = (datetime.utcnow() - timedelta(days=days)).date()
+
+    # Group the daily per-symptom rollups by symptom
+    result = await db.execute(
+        select(
+            SymptomDailyRollup.symptom,
+            func.sum(SymptomDailyRollup.count).label('count'),
+            func.sum(SymptomDailyRollup.severity_sum).label('severity_sum'),
+            func.max(SymptomDailyRollup.max_severity).label('max_severity')
+        ).where(
+            and_(
+                SymptomDailyRollup.user_id == user_id,
+                SymptomDailyRollup.day >= start_day
+            )
+        ).group_by(SymptomDailyRollup.symptom)
+    )
+    trends = result.all()
 
     return [{
-        "symptom": trend[0],
-        "count": trend[1],
-        "avg_severity": round(trend[2], 1),
-        "max_severity": trend[3]
-    } for trend in trends]
+        "symptom": trend.symptom,
+        "count": trend.count,
+        "avg_severity": round(trend.severity_sum / trend.count, 1),
+        "max_severity": trend.max_severity
+    } for trend in trends if trend.count]
 
 
 # ============================================================================
@@ -241,16 +392,18 @@ async def get_symptom_trends(
 # ============================================================================
 
 @router.post("/vitals", response_model=VitalSignResponse)
-async def record_vital_sign(vital: VitalSignCreate, db: Session = Depends(get_db)):
+async def record_vital_sign(vital: VitalSignCreate, db: AsyncSession = Depends(get_async_db)):
     """Record a new vital sign measurement"""
     db_vital = VitalSign(**vital.dict())
 
     # Check if measurement is abnormal
     db_vital.is_abnormal = check_vital_abnormality(vital)
+    db_vital.measured_at = db_vital.measured_at or datetime.utcnow()
 
     db.add(db_vital)
-    db.commit()
-    db.refresh(db_vital)
+    await record_vital_rollup(db, db_vital)
+    await db.commit()
+    await db.refresh(db_vital)
 
     # Alert if abnormal
     if db_vital.is_abnormal:
@@ -260,48 +413,63 @@ async def record_vital_sign(vital: VitalSignCreate, db: Session = Depends(get_db
     return db_vital
 
 
+@router.post("/vitals/batch", response_model=BatchIngestResponse)
+async def record_vital_signs_batch(batch: HealthBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Record many vital sign readings in one transaction, e.g. an outreach visit
+
+    Abnormal readings are flagged in their result. Invalid items are reported
+    and skipped; the rest are inserted together.
+    """
+    check_batch_size(batch)
+    response = await ingest_vitals(db, batch.items)
+    await db.commit()
+    return response
+
+
 @router.get("/vitals", response_model=List[VitalSignResponse])
 async def get_vital_signs(
     user_id: int,
+    response: Response,
     measurement_type: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get vital sign measurements"""
-    query = db.query(VitalSign).filter(VitalSign.user_id == user_id)
+    """Get a page of vital sign measurements, newest first"""
+    query = select(VitalSign).where(VitalSign.user_id == user_id)
 
     if measurement_type:
-        query = query.filter(VitalSign.measurement_type == measurement_type)
+        query = query.where(VitalSign.measurement_type == measurement_type)
     if start_date:
-        query = query.filter(VitalSign.measured_at >= start_date)
+        query = query.where(VitalSign.measured_at >= start_date)
     if end_date:
-        query = query.filter(VitalSign.measured_at <= end_date)
+        query = query.where(VitalSign.measured_at <= end_date)
 
-    return query.order_by(VitalSign.measured_at.desc()).limit(limit).all()
+    return await fetch_page(
+        db, query, VitalSign.measured_at, VitalSign.id, page_position(cursor), limit, response
+    )
 
 
 @router.get("/vitals/latest")
-async def get_latest_vitals(user_id: int, db: Session = Depends(get_db)):
-    """Get latest reading for each vital sign type"""
-    # Subquery to get the latest measurement for each type
-    latest_vitals = {}
-
-    vital_types = ["blood_pressure", "glucose", "temperature", "heart_rate", "weight", "oxygen_saturation"]
-
-    for vital_type in vital_types:
-        latest = db.query(VitalSign).filter(
-            and_(
-                VitalSign.user_id == user_id,
-                VitalSign.measurement_type == vital_type
-            )
-        ).order_by(VitalSign.measured_at.desc()).first()
-
-        if latest:
-            latest_vitals[vital_type] = latest
+async def get_latest_vitals(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get latest reading for each vital sign type the user has recorded"""
+    # Rank readings within each type, newest first, in a single query
+    ranked = select(
+        VitalSign.id.label("id"),
+        func.row_number().over(
+            partition_by=VitalSign.measurement_type,
+            order_by=(VitalSign.measured_at.desc(), VitalSign.id.desc())
+        ).label("rank")
+    ).where(VitalSign.user_id == user_id).subquery()
+
+    result = await db.execute(
+        select(VitalSign).join(ranked, VitalSign.id == ranked.c.id).where(ranked.c.rank == 1)
+    )
 
-    return latest_vitals
+    return {vital.measurement_type: vital for vital in result.scalars().all()}
 
 
 # ============================================================================
@@ -309,34 +477,39 @@ async def get_latest_vitals(user_id: int, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/care-plans", response_model=CarePlanResponse)
-async def create_care_plan(plan: CarePlanCreate, db: Session = Depends(get_db)):
+async def create_care_plan(plan: CarePlanCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new care plan"""
     db_plan = CarePlan(**plan.dict())
     db.add(db_plan)
-    db.commit()
-    db.refresh(db_plan)
+    await db.commit()
+    await db.refresh(db_plan)
     return db_plan
 
 
 @router.get("/care-plans", response_model=List[CarePlanResponse])
 async def get_care_plans(
     user_id: int,
+    response: Response,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get care plans for a user"""
-    query = db.query(CarePlan).filter(CarePlan.user_id == user_id)
+    """Get a page of a user's care plans, newest first"""
+    query = select(CarePlan).where(CarePlan.user_id == user_id)
 
     if status:
-        query = query.filter(CarePlan.status == status)
+        query = query.where(CarePlan.status == status)
 
-    return query.order_by(CarePlan.created_at.desc()).all()
+    return await fetch_page(
+        db, query, CarePlan.created_at, CarePlan.id, page_position(cursor), limit, response
+    )
 
 
 @router.get("/care-plans/{plan_id}", response_model=CarePlanResponse)
-async def get_care_plan(plan_id: int, db: Session = Depends(get_db)):
+async def get_care_plan(plan_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific care plan"""
-    plan = db.query(CarePlan).filter(CarePlan.id == plan_id).first()
+    plan = await db.get(CarePlan, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Care plan not found")
     return plan
@@ -346,18 +519,18 @@ async def get_care_plan(plan_id: int, db: Session = Depends(get_db)):
 async def update_care_plan(
     plan_id: int,
     plan_update: CarePlanUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a care plan"""
-    plan = db.query(CarePlan).filter(CarePlan.id == plan_id).first()
+    plan = await db.get(CarePlan, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Care plan not found")
 
     for field, value in plan_update.dict(exclude_unset=True).items():
         setattr(plan, field, value)
 
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
+    await db.refresh(plan)
     return plan
 
 
@@ -366,38 +539,43 @@ async def update_care_plan(
 # ============================================================================
 
 @router.post("/goals", response_model=HealthGoalResponse)
-async def create_health_goal(goal: HealthGoalCreate, db: Session = Depends(get_db)):
+async def create_health_goal(goal: HealthGoalCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new health goal"""
     db_goal = HealthGoal(**goal.dict())
     db.add(db_goal)
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
     return db_goal
 
 
 @router.get("/goals", response_model=List[HealthGoalResponse])
 async def get_health_goals(
     user_id: int,
+    response: Response,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get health goals for a user"""
-    query = db.query(HealthGoal).filter(HealthGoal.user_id == user_id)
+    """Get a page of a user's health goals, newest first"""
+    query = select(HealthGoal).where(HealthGoal.user_id == user_id)
 
     if status:
-        query = query.filter(HealthGoal.status == status)
+        query = query.where(HealthGoal.status == status)
 
-    return query.order_by(HealthGoal.created_at.desc()).all()
+    return await fetch_page(
+        db, query, HealthGoal.created_at, HealthGoal.id, page_position(cursor), limit, response
+    )
 
 
 @router.patch("/goals/{goal_id}", response_model=HealthGoalResponse)
 async def update_health_goal(
     goal_id: int,
     goal_update: HealthGoalUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update progress on a health goal"""
-    goal = db.query(HealthGoal).filter(HealthGoal.id == goal_id).first()
+    goal = await db.get(HealthGoal, goal_id)
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
@@ -409,65 +587,116 @@ async def update_health_goal(
         goal.status = "achieved"
         goal.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(goal)
+    await db.commit()
+    await db.refresh(goal)
     return goal
 
 
+# ============================================================================
+# DELTA SYNC
+# ============================================================================
+
+@router.get("/sync", response_model=HealthSyncResponse)
+async def sync_health_records(
+    user_id: int,
+    cursor: Optional[str] = None,
+    tables: Optional[List[str]] = Query(None),
+    limit: int = Query(HEALTH_SYNC_PAGE_SIZE, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the health records created, updated or deleted since the last sync
+
+    Omit the cursor for a first full sync, then pass the cursor from each
+    response to the next request. While has_more is true, sync again right
+    away for the rest.
+    """
+    try:
+        positions = decode_sync_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+    tables = tables or list(SYNC_TABLES)
+    unknown = [name for name in tables if name not in SYNC_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sync tables: {', '.join(unknown)}")
+
+    return await sync_changes(db, user_id, positions, tables, limit)
+
+
+# ============================================================================
+# TIMELINE
+# ============================================================================
+
+@router.get("/timeline/{user_id}", response_model=List[TimelineEvent])
+async def get_health_timeline(
+    user_id: int,
+    response: Response,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    types: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(HEALTH_PAGE_SIZE, ge=1, le=HEALTH_PAGE_SIZE_MAX),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a user's doses, symptoms, vitals, notes and care plan events as one
+    newest-first timeline
+
+    Pages work like the other health lists (cursor in, X-Next-Cursor out).
+    With stream=true the whole range (from the cursor, if given) is streamed
+    as newline-delimited JSON instead, one event per line, starting as soon
+    as the first page is read.
+    """
+    event_types = types or list(TIMELINE_SOURCES)
+    unknown = [event_type for event_type in event_types if event_type not in TIMELINE_SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown timeline types: {', '.join(unknown)}")
+    position = timeline_position(cursor)
+
+    if stream:
+        async def event_stream():
+            async for event in stream_timeline(user_id, event_types, start_date, end_date, position):
+                yield json.dumps(jsonable_encoder(event)) + "\n"
+
+        return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+    events, next_position = await timeline_page(
+        db, user_id, event_types, start_date, end_date, position, limit
+    )
+    if next_position is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_timeline_cursor(next_position)
+    return events
+
+
 # ============================================================================
 # DASHBOARD & ANALYTICS
 # ============================================================================
 
 @router.get("/dashboard/{user_id}", response_model=HealthDashboardSummary)
-async def get_health_dashboard(user_id: int, db: Session = Depends(get_db)):
+async def get_health_dashboard(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get comprehensive health dashboard summary"""
 
-    # Active medications count
-    active_meds = db.query(func.count(Medication.id)).filter(
-        and_(Medication.user_id == user_id, Medication.is_active == True)
-    ).scalar()
-
-    # Recent symptoms (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_symptoms = db.query(func.count(SymptomLog.id)).filter(
-        and_(SymptomLog.user_id == user_id, SymptomLog.logged_at >= week_ago)
-    ).scalar()
-
-    # Active care plans
-    active_plans = db.query(func.count(CarePlan.id)).filter(
-        and_(CarePlan.user_id == user_id, CarePlan.status == "active")
-    ).scalar()
-
-    # Medication adherence
-    adherence = calculate_medication_adherence(user_id, db)
-
-    # Recent vitals (last 5 of each type)
-    recent_vitals = db.query(VitalSign).filter(
-        VitalSign.user_id == user_id
-    ).order_by(VitalSign.measured_at.desc()).limit(10).all()
-
-    # Health goals progress
-    goals = db.query(HealthGoal).filter(
-        and_(HealthGoal.user_id == user_id, HealthGoal.status == "in_progress")
-    ).all()
-
-    # Upcoming appointments
-    upcoming = db.query(CarePlan.next_appointment).filter(
-        and_(
-            CarePlan.user_id == user_id,
-            CarePlan.next_appointment >= datetime.utcnow()
-        )
-    ).order_by(CarePlan.next_appointment).limit(5).all()
+    now = datetime.utcnow()
+    dashboard = (await db.execute(
+        dashboard_query(db.bind.dialect.name),
+        dict(adherence_params(user_id, now), week_start=now.date() - timedelta(days=6))
+    )).one()
+
+    medications = [model_from_json(Medication, row) for row in dashboard.medications or []]
+    upcoming = [model_from_json(CarePlan, row) for row in dashboard.upcoming or []]
 
     return HealthDashboardSummary(
         user_id=user_id,
-        active_medications_count=active_meds,
-        recent_symptoms_count=recent_symptoms,
-        active_care_plans_count=active_plans,
-        medication_adherence=adherence,
-        recent_vitals=recent_vitals,
-        upcoming_appointments=[apt[0] for apt in upcoming],
-        health_goals_progress=goals
+        active_medications_count=sum(1 for medication in medications if medication.is_active),
+        recent_symptoms_count=dashboard.recent_symptoms,
+        recent_abnormal_vitals_count=dashboard.recent_abnormal_vitals,
+        active_care_plans_count=dashboard.active_plans,
+        medication_adherence=build_adherence_stats(dashboard, medications, now),
+        recent_vitals=[model_from_json(VitalSign, row) for row in dashboard.recent_vitals or []],
+        upcoming_appointments=[care_plan.next_appointment for care_plan in upcoming],
+        health_goals_progress=[model_from_json(HealthGoal, row) for row in dashboard.goals or []]
     )
 
 
@@ -475,81 +704,223 @@ async def get_health_dashboard(user_id: int, db: Session = Depends(get_db)):
 # HELPER FUNCTIONS
 # ============================================================================
 
-def generate_medication_reminders(db: Session, medication: Medication):
-    """Generate scheduled medication doses for reminders"""
-    if not medication.reminder_times:
-        return
-
-    # Generate doses for the next 7 days
-    for day in range(7):
-        date = datetime.utcnow().date() + timedelta(days=day)
-        for time_str in medication.reminder_times:
-            hour, minute = map(int, time_str.split(':'))
-            scheduled_time = datetime.combine(date, datetime.min.time().replace(hour=hour, minute=minute))
-
-            dose = MedicationDose(
-                medication_id=medication.id,
-                scheduled_time=scheduled_time,
-                status="scheduled"
-            )
-            db.add(dose)
-
-    db.commit()
-
-
 def check_vital_abnormality(vital: VitalSignCreate) -> bool:
     """Check if a vital sign measurement is abnormal"""
-    abnormal_ranges = {
-        "blood_pressure": lambda v: v.systolic > 140 or v.systolic < 90 or v.diastolic > 90 or v.diastolic < 60,
-        "glucose": lambda v: v.value > 180 or v.value < 70,
-        "temperature": lambda v: v.value > 100.4 or v.value < 96.8,
-        "heart_rate": lambda v: v.value > 100 or v.value < 60,
-        "oxygen_saturation": lambda v: v.value < 95,
+    abnormal, _ = flag_abnormal_vitals([vital])
+    return bool(abnormal[0])
+
+
+def check_batch_size(batch: HealthBatchRequest) -> None:
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="No items provided")
+    if len(batch.items) > HEALTH_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {HEALTH_BATCH_MAX_ITEMS} items per batch")
+
+
+# Dashboard statements by dialect name, built once: the statement is large,
+# and reusing it saves rebuilding it and its cache key on every request
+_dashboard_queries = {}
+
+
+def dashboard_query(dialect_name: str):
+    """
+    The dashboard's counts and lists as one statement
+
+    Counts come back as columns and the lists as JSON arrays (see
+    json_array). Parameters are adherence_params plus week_start, the first
+    day of the recent symptom and vital counts.
+    """
+    query = _dashboard_queries.get(dialect_name)
+    if query is not None:
+        return query
+
+    user_id = bindparam("user_id")
+
+    # Symptom and abnormal vital counts for the last 7 days from the rollups
+    recent_rollups = select(
+        func.coalesce(func.sum(HealthDailyRollup.symptom_count), 0).label("recent_symptoms"),
+        func.coalesce(func.sum(HealthDailyRollup.abnormal_vital_count), 0).label("recent_abnormal_vitals")
+    ).where(
+        and_(HealthDailyRollup.user_id == user_id, HealthDailyRollup.day >= bindparam("week_start"))
+    ).subquery()
+
+    adherence_counts = medication_adherence_query()
+    query = select(
+        select(func.count(CarePlan.id)).where(
+            and_(CarePlan.user_id == user_id, CarePlan.status == "active")
+        ).scalar_subquery().label("active_plans"),
+        recent_rollups,
+        adherence_counts,
+        # All medications, for the active count and the expected dose schedule
+        json_array(
+            dialect_name, [getattr(Medication, name) for name in MEDICATION_SCHEDULE_FIELDS],
+            Medication.user_id == user_id, Medication.id
+        ).label("medications"),
+        # Recent vitals (last 10 readings)
+        json_array(
+            dialect_name, [getattr(VitalSign, name) for name in VitalSignResponse.model_fields],
+            VitalSign.user_id == user_id, VitalSign.measured_at, descending=True, limit=10
+        ).label("recent_vitals"),
+        # Health goals progress
+        json_array(
+            dialect_name, [getattr(HealthGoal, name) for name in HealthGoalResponse.model_fields],
+            and_(HealthGoal.user_id == user_id, HealthGoal.status == "in_progress"), HealthGoal.id
+        ).label("goals"),
+        # Upcoming appointments
+        json_array(
+            dialect_name, [CarePlan.next_appointment],
+            and_(CarePlan.user_id == user_id, CarePlan.next_appointment >= bindparam("now")),
+            CarePlan.next_appointment, limit=5
+        ).label("upcoming")
+    ).select_from(recent_rollups.join(adherence_counts, true()))
+
+    _dashboard_queries[dialect_name] = query
+    return query
+
+
+# Medication columns count_scheduled needs to expand a medication's schedule
+MEDICATION_SCHEDULE_FIELDS = (
+    "id", "reminder_enabled", "reminder_times", "start_date", "end_date", "is_active", "created_at", "updated_at"
+)
+
+
+def json_array(dialect_name: str, columns: list, where, order_by, descending: bool = False,
+               limit: Optional[int] = None):
+    """
+    Rows matching where as a JSON array scalar subquery, ordered by order_by
+
+    Each row becomes an object keyed by column name (json_agg on PostgreSQL,
+    json_group_array on SQLite), so lists can be fetched in the same
+    statement as the counts around them. Decode the objects with
+    model_from_json. An empty match gives [] on SQLite and NULL on PostgreSQL.
+    """
+    sqlite = dialect_name == "sqlite"
+    position = order_by.desc() if descending else order_by
+    rows = select(*columns, order_by.label("position")).where(where).order_by(position).limit(limit).subquery()
+    position = rows.c.position.desc() if descending else rows.c.position
+
+    pairs = []
+    for column in columns:
+        value = rows.c[column.key]
+        if sqlite and isinstance(column.type, JSON):
+            # SQLite stores JSON as text, which json_object would quote
+            value = func.json(value)
+        elif sqlite and isinstance(column.type, Float):
+            # json_object keeps only 15 significant digits of a REAL
+            value = case((value.is_(None), None), else_=func.printf("%!.17g", value))
+        pairs += [literal_column(f"'{column.key}'"), value]
+
+    if sqlite:
+        # json_group_array keeps the order rows come from the subquery in
+        array = func.json_group_array(func.json_object(*pairs), type_=JSON)
+    else:
+        array = func.json_agg(aggregate_order_by(func.json_build_object(*pairs), position), type_=JSON)
+    return select(array).select_from(rows).scalar_subquery()
+
+
+def model_from_json(model, row: dict):
+    """
+    Build a detached model instance from a json_array object
+
+    Timestamps arrive as ISO strings, SQLite booleans as 0/1 and SQLite
+    floats as text, so they are converted back to their Python types.
+    """
+    columns = model.__table__.c
+    values = {}
+    for key, value in row.items():
+        if value is not None and isinstance(columns[key].type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(columns[key].type, Boolean):
+            value = bool(value)
+        elif value is not None and isinstance(columns[key].type, Float):
+            value = float(value)
+        values[key] = value
+    return model(**values)
+
+
+def adherence_window_start(now: datetime) -> datetime:
+    """Start of the 30 days of doses adherence is measured over"""
+    return datetime.combine(now.date() - timedelta(days=30), datetime.min.time())
+
+
+def adherence_params(user_id: int, now: datetime) -> dict:
+    """Parameters for medication_adherence_query"""
+    today = now.date()
+    return {
+        "user_id": user_id,
+        "now": now,
+        "adherence_start": adherence_window_start(now).date(),
+        "today": today,
+        "today_end": datetime.combine(today + timedelta(days=1), datetime.min.time()),
     }
 
-    check = abnormal_ranges.get(vital.measurement_type)
-    if check:
-        return check(vital)
 
-    return False
+def medication_adherence_query():
+    """
+    Recorded dose counts behind MedicationAdherenceStats as a one-row subquery
 
+    Taken and missed doses for the adherence window come from
+    health_daily_rollups. Doses later today that were already acted on are
+    counted live so they can be left out of upcoming_doses_today. Run it
+    with adherence_params.
+    """
+    user_id = bindparam("user_id")
 
-def calculate_medication_adherence(user_id: int, db: Session) -> MedicationAdherenceStats:
-    """Calculate medication adherence statistics"""
-    # Get doses from last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    recorded = select(
+        func.coalesce(func.sum(HealthDailyRollup.doses_taken), 0).label("doses_taken"),
+        func.coalesce(func.sum(HealthDailyRollup.doses_missed), 0).label("doses_missed")
+    ).where(
+        and_(
+            HealthDailyRollup.user_id == user_id,
+            HealthDailyRollup.day >= bindparam("adherence_start"),
+            HealthDailyRollup.day <= bindparam("today")
+        )
+    ).subquery()
 
-    doses = db.query(MedicationDose).join(Medication).filter(
+    acted_on_later_today = select(
+        func.count(MedicationDose.id).label("acted_on_later_today")
+    ).join(Medication).where(
         and_(
             Medication.user_id == user_id,
-            MedicationDose.scheduled_time >= thirty_days_ago,
-            MedicationDose.scheduled_time <= datetime.utcnow()
+            MedicationDose.scheduled_time >= bindparam("now"),
+            MedicationDose.scheduled_time < bindparam("today_end"),
+            MedicationDose.status != "scheduled"
         )
-    ).all()
+    ).subquery()
 
-    total = len(doses)
-    taken = len([d for d in doses if d.status == "taken"])
-    missed = len([d for d in doses if d.status == "missed"])
+    return select(
+        recorded.c.doses_taken,
+        recorded.c.doses_missed,
+        acted_on_later_today.c.acted_on_later_today
+    ).select_from(recorded.join(acted_on_later_today, true())).subquery()
 
-    # Upcoming doses today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start + timedelta(days=1)
 
-    upcoming_today = db.query(func.count(MedicationDose.id)).join(Medication).filter(
-        and_(
-            Medication.user_id == user_id,
-            MedicationDose.scheduled_time >= datetime.utcnow(),
-            MedicationDose.scheduled_time < today_end,
-            MedicationDose.status == "scheduled"
-        )
-    ).scalar()
+def build_adherence_stats(counts, medications: List[Medication], now: datetime) -> MedicationAdherenceStats:
+    """
+    Build adherence statistics from a medication_adherence_query row
+
+    The number of doses scheduled comes from the virtual schedule.
+    """
+    today_end = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    window_start = adherence_window_start(now)
 
-    adherence_pct = (taken / total * 100) if total > 0 else 0
+    total = sum(count_scheduled(medication, window_start, now) for medication in medications)
+    upcoming_today = sum(count_scheduled(medication, now, today_end) for medication in medications)
+    upcoming_today = max(0, upcoming_today - counts.acted_on_later_today)
+    adherence_pct = min(100.0, counts.doses_taken / total * 100) if total > 0 else 0
 
     return MedicationAdherenceStats(
         total_doses_scheduled=total,
-        doses_taken=taken,
-        doses_missed=missed,
+        doses_taken=counts.doses_taken,
+        doses_missed=counts.doses_missed,
         adherence_percentage=round(adherence_pct, 1),
         upcoming_doses_today=upcoming_today
     )
+
+
+async def calculate_medication_adherence(user_id: int, db: AsyncSession) -> MedicationAdherenceStats:
+    """Calculate medication adherence statistics"""
+    now = datetime.utcnow()
+    medications = (await db.execute(select(Medication).where(Medication.user_id == user_id))).scalars().all()
+    counts = (await db.execute(select(medication_adherence_query()), adherence_params(user_id, now))).one()
+    return build_adherence_stats(counts, medications, now)
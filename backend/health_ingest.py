@@ -0,0 +1,172 @@
+"""
+Batch ingest for vital signs and symptom logs
+
+Outreach workers record readings for many people at once, and offline
+devices sync a backlog when they reconnect. A batch is validated item by
+item, abnormal vitals are flagged with one vectorized range check, and the
+valid items are written with a single multi-row INSERT and one rollup upsert
+in one transaction. Every item gets its own result, so a bad reading is
+reported without failing the rest.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import User
+from health_models import Medication, SymptomLog, VitalSign
+from health_rollups import record_symptom_rollups, record_vital_rollups
+from health_schemas import SymptomLogCreate, VitalSignCreate
+
+HEALTH_BATCH_MAX_ITEMS = int(os.getenv("HEALTH_BATCH_MAX_ITEMS", "1000"))
+
+# measurement_type -> {field: (low, high)}; a reading outside the range is abnormal
+VITAL_NORMAL_RANGES = {
+    "blood_pressure": {"systolic": (90, 140), "diastolic": (60, 90)},
+    "glucose": {"value": (70, 180)},
+    "temperature": {"value": (96.8, 100.4)},
+    "heart_rate": {"value": (60, 100)},
+    "oxygen_saturation": {"value": (95, None)},
+}
+VITAL_FIELDS = ("systolic", "diastolic", "value")
+
+
+def flag_abnormal_vitals(vitals: Sequence[VitalSignCreate]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Check a batch of readings against VITAL_NORMAL_RANGES in one pass
+
+    Returns:
+        (abnormal, incomplete) boolean arrays: readings outside the normal
+        range, and readings of a known type missing a value its range needs
+    """
+    types = np.array([vital.measurement_type for vital in vitals], dtype=object)
+    abnormal = np.zeros(len(vitals), dtype=bool)
+    incomplete = np.zeros(len(vitals), dtype=bool)
+
+    for field in VITAL_FIELDS:
+        values = np.array(
+            [getattr(vital, field) for vital in vitals], dtype=float
+        )  # None becomes NaN, which compares False below
+        low = np.full(len(vitals), -np.inf)
+        high = np.full(len(vitals), np.inf)
+        checked = np.zeros(len(vitals), dtype=bool)
+        for measurement_type, ranges in VITAL_NORMAL_RANGES.items():
+            if field not in ranges:
+                continue
+            rows = types == measurement_type
+            field_low, field_high = ranges[field]
+            low[rows] = -np.inf if field_low is None else field_low
+            high[rows] = np.inf if field_high is None else field_high
+            checked |= rows
+
+        abnormal |= (values < low) | (values > high)
+        incomplete |= checked & np.isnan(values)
+
+    return abnormal, incomplete
+
+
+def _validate(items: List[Dict[str, Any]], schema) -> Tuple[List[Tuple[int, BaseModel]], Dict[int, str]]:
+    """Parse each item with the schema, keeping the valid ones and an error per invalid one"""
+    valid, errors = [], {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.parse_obj(item)))
+        except ValidationError as e:
+            errors[index] = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+    return valid, errors
+
+
+async def _existing_ids(db: AsyncSession, model, ids: Set[int]) -> Set[int]:
+    if not ids:
+        return set()
+    result = await db.execute(select(model.id).where(model.id.in_(ids)))
+    return set(result.scalars())
+
+
+def _results(count: int, created: Dict[int, Dict], errors: Dict[int, str]) -> Dict:
+    results = []
+    for index in range(count):
+        if index in created:
+            results.append({"index": index, "status": "created", **created[index]})
+        else:
+            results.append({"index": index, "status": "invalid", "error": errors.get(index)})
+    return {"created": len(created), "failed": count - len(created), "results": results}
+
+
+async def _insert_rows(db: AsyncSession, model, rows: List[Dict]) -> List[int]:
+    """Multi-row INSERT returning the new IDs in the order of rows"""
+    if not rows:
+        return []
+    result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+
+async def ingest_vitals(db: AsyncSession, items: List[Dict[str, Any]]) -> Dict:
+    """
+    Validate, flag and insert a batch of vital sign readings
+
+    Returns:
+        BatchIngestResponse-shaped dict; the caller commits
+    """
+    valid, errors = _validate(items, VitalSignCreate)
+    abnormal, incomplete = flag_abnormal_vitals([vital for _, vital in valid])
+    known_users = await _existing_ids(db, User, {vital.user_id for _, vital in valid})
+
+    now = datetime.utcnow()
+    accepted, rows = [], []
+    for (index, vital), is_abnormal, is_incomplete in zip(valid, abnormal, incomplete):
+        if is_incomplete:
+            needed = " and ".join(VITAL_NORMAL_RANGES[vital.measurement_type])
+            errors[index] = f"{vital.measurement_type} readings need {needed}"
+        elif vital.user_id not in known_users:
+            errors[index] = "User not found"
+        else:
+            accepted.append((index, bool(is_abnormal)))
+            rows.append(dict(vital.dict(), measured_at=vital.measured_at or now, is_abnormal=bool(is_abnormal)))
+
+    ids = await _insert_rows(db, VitalSign, rows)
+    await record_vital_rollups(db, [VitalSign(**row) for row in rows])
+
+    created = {
+        index: {"id": vital_id, "is_abnormal": is_abnormal}
+        for (index, is_abnormal), vital_id in zip(accepted, ids)
+    }
+    return _results(len(items), created, errors)
+
+
+async def ingest_symptoms(db: AsyncSession, items: List[Dict[str, Any]]) -> Dict:
+    """
+    Validate and insert a batch of symptom logs
+
+    Returns:
+        BatchIngestResponse-shaped dict; the caller commits
+    """
+    valid, errors = _validate(items, SymptomLogCreate)
+    known_users = await _existing_ids(db, User, {symptom.user_id for _, symptom in valid})
+    known_medications = await _existing_ids(db, Medication, {
+        symptom.related_medication_id for _, symptom in valid if symptom.related_medication_id is not None
+    })
+
+    now = datetime.utcnow()
+    accepted, rows = [], []
+    for index, symptom in valid:
+        if symptom.user_id not in known_users:
+            errors[index] = "User not found"
+        elif symptom.related_medication_id is not None and symptom.related_medication_id not in known_medications:
+            errors[index] = "Related medication not found"
+        else:
+            accepted.append(index)
+            rows.append(dict(symptom.dict(), logged_at=symptom.logged_at or now))
+
+    ids = await _insert_rows(db, SymptomLog, rows)
+    await record_symptom_rollups(db, [SymptomLog(**row) for row in rows])
+
+    created = {index: {"id": symptom_id} for index, symptom_id in zip(accepted, ids)}
+    return _results(len(items), created, errors)
@@ -3,7 +3,7 @@ Health and Chronic Care Management Models
 For tracking medications, symptoms, vital signs, and care plans
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime, timedelta
@@ -31,7 +31,7 @@ class Medication(Base):
     start_date = Column(DateTime, default=datetime.utcnow)
     end_date = Column(DateTime, nullable=True)  # Null if ongoing
     reminder_enabled = Column(Boolean, default=True)
-    reminder_times = Column(JSON)  # List of times like ["08:00", "20:00"]
+    reminder_times = Column(JSON)  # List of HEALTH_TIMEZONE wall-clock times like ["08:00", "20:00"]
 
     # Tracking
     is_active = Column(Boolean, default=True)
@@ -46,9 +46,20 @@ class Medication(Base):
     # Relationships
     doses = relationship("MedicationDose", back_populates="medication", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_medications_user_active", "user_id", "is_active"),
+        Index("ix_medications_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_medications_user_created", "user_id", "created_at", "id"),
+    )
+
 
 class MedicationDose(Base):
-    """Track individual medication doses taken"""
+    """
+    Track individual medication doses taken
+
+    Rows exist only for doses that were acted on; the expected schedule is
+    computed from Medication.reminder_times (see medication_schedule.py).
+    """
     __tablename__ = "medication_doses"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -68,6 +79,12 @@ class MedicationDose(Base):
     # Relationships
     medication = relationship("Medication", back_populates="doses")
 
+    # A dose is identified by its medication and scheduled time, so there is
+    # at most one row per slot of the virtual schedule
+    __table_args__ = (
+        UniqueConstraint("medication_id", "scheduled_time", name="uq_medication_doses_medication_scheduled"),
+    )
+
 
 class SymptomLog(Base):
     """Track symptoms over time"""
@@ -94,6 +111,11 @@ class SymptomLog(Base):
     logged_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_symptom_logs_user_logged_at_id", "user_id", "logged_at", "id"),
+        Index("ix_symptom_logs_user_created", "user_id", "created_at", "id"),
+    )
+
 
 class VitalSign(Base):
     """Track vital signs and health metrics"""
@@ -125,6 +147,13 @@ class VitalSign(Base):
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Latest reading per type (one index scan per (user, type)) and type-filtered pages
+        Index("ix_vital_signs_user_type_measured_at_id", "user_id", "measurement_type", measured_at.desc(), id.desc()),
+        Index("ix_vital_signs_user_measured_at_id", "user_id", "measured_at", "id"),
+        Index("ix_vital_signs_user_created", "user_id", "created_at", "id"),
+    )
+
 
 class CarePlan(Base):
     """Comprehensive care plan for managing health conditions"""
@@ -165,6 +194,13 @@ class CarePlan(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(String)  # Provider who created the plan
 
+    __table_args__ = (
+        Index("ix_care_plans_user_status", "user_id", "status"),
+        Index("ix_care_plans_user_next_appointment", "user_id", "next_appointment"),
+        Index("ix_care_plans_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_care_plans_user_created", "user_id", "created_at", "id"),
+    )
+
 
 class HealthGoal(Base):
     """Track health goals and progress"""
@@ -197,6 +233,12 @@ class HealthGoal(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_health_goals_user_status", "user_id", "status"),
+        Index("ix_health_goals_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_health_goals_user_created", "user_id", "created_at", "id"),
+    )
+
 
 class HealthNote(Base):
     """General health notes and journal entries"""
@@ -221,3 +263,83 @@ class HealthNote(Base):
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_health_notes_user_created", "user_id", "created_at", "id"),
+    )
+
+
+class HealthDailyRollup(Base):
+    """Per-user daily totals, updated as doses, symptoms and vitals are recorded"""
+    __tablename__ = "health_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC day of the dose schedule / log / measurement
+
+    # Medication doses scheduled for this day that were acted on (the full
+    # schedule is computed from the medications, see medication_schedule.py)
+    doses_taken = Column(Integer, default=0, nullable=False)
+    doses_missed = Column(Integer, default=0, nullable=False)
+
+    # Symptoms
+    symptom_count = Column(Integer, default=0, nullable=False)
+    symptom_max_severity = Column(Integer, nullable=True)
+
+    # Vital signs
+    vital_count = Column(Integer, default=0, nullable=False)
+    abnormal_vital_count = Column(Integer, default=0, nullable=False)
+
+    # Metadata
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_health_daily_rollups_user_day"),
+    )
+
+
+class SymptomDailyRollup(Base):
+    """Per-user daily totals for each symptom, backing symptom trends"""
+    __tablename__ = "symptom_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    symptom = Column(String, nullable=False)
+
+    count = Column(Integer, default=0, nullable=False)
+    severity_sum = Column(Integer, default=0, nullable=False)
+    max_severity = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "symptom", name="uq_symptom_daily_rollups_user_day_symptom"),
+    )
+
+
+class HealthTombstone(Base):
+    """Record of a deleted health row, so synced clients can drop their copy"""
+    __tablename__ = "health_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    table_name = Column(String, nullable=False)  # Sync table name, e.g. "medications"
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_health_tombstones_user_deleted", "user_id", "deleted_at", "id"),
+    )
+
+
+class SchedulerLease(Base):
+    """
+    Time-limited lease naming the one process that runs a background job
+
+    Every worker runs the reminder scheduler, but only the process holding a
+    job's unexpired lease performs it; the holder renews it while alive.
+    """
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String, primary_key=True)  # Job name, e.g. "missed_doses"
+    holder = Column(String, nullable=False)  # "<hostname>:<pid>" of the holding process
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,78 @@
+"""
+Keyset pagination for the health list endpoints
+
+Lists come back newest first, ordered by (timestamp, id). The body stays a
+plain list; when more rows follow, the cursor for the next page is sent in
+the X-Next-Cursor header and passed back as ?cursor=. Each page is one index
+range scan from the cursor, so its cost does not grow with the user's
+history.
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+HEALTH_PAGE_SIZE = int(os.getenv("HEALTH_PAGE_SIZE", "100"))
+HEALTH_PAGE_SIZE_MAX = int(os.getenv("HEALTH_PAGE_SIZE_MAX", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Position = Tuple[datetime, int]
+
+
+def encode_cursor(payload: Any) -> str:
+    """Opaque, URL-safe token for a JSON-serializable position"""
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Any:
+    """
+    Raises:
+        ValueError: If the cursor is not a token from encode_cursor
+    """
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+
+def page_position(cursor: Optional[str]) -> Optional[Position]:
+    """(timestamp, id) the page starts after, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        timestamp, record_id = decode_cursor(cursor)
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid page cursor")
+
+
+def set_next_cursor(response: Response, timestamp: datetime, record_id: int) -> None:
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor([timestamp.isoformat(), record_id])
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query,
+    timestamp_column,
+    id_column,
+    position: Optional[Position],
+    limit: int,
+    response: Response
+) -> List:
+    """
+    Run a select for one page, newest first, after the given position
+
+    Sets the next-page cursor on the response when more rows follow.
+    """
+    if position is not None:
+        query = query.where(tuple_(timestamp_column, id_column) < tuple_(*position))
+    result = await db.execute(query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1))
+    rows = result.scalars().all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, getattr(rows[-1], timestamp_column.key), getattr(rows[-1], id_column.key))
+    return rows
@@ -0,0 +1,215 @@
+"""
+Incrementally maintained daily health rollups
+
+Every write to medication doses, symptom logs and vital signs adds its
+change to the user's row in health_daily_rollups (and symptom_daily_rollups)
+within the same transaction. Dashboards, trends and report summaries then
+read at most one row per day instead of every raw record.
+"""
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from health_models import HealthDailyRollup, SymptomDailyRollup, SymptomLog, VitalSign
+
+DAILY_COUNTERS = (
+    "doses_taken", "doses_missed",
+    "symptom_count", "vital_count", "abnormal_vital_count"
+)
+
+# Dose status -> rollup counter it is counted under
+DOSE_STATUS_COUNTERS = {"taken": "doses_taken", "missed": "doses_missed"}
+
+
+def _dialect_name(db: AsyncSession) -> str:
+    return db.bind.dialect.name
+
+
+def dialect_insert(db: AsyncSession, model):
+    """INSERT for the session's dialect, with on_conflict_do_nothing/do_update available"""
+    insert = sqlite_insert if _dialect_name(db) == "sqlite" else postgresql_insert
+    return insert(model)
+
+
+def _greatest(dialect_name: str, current, new):
+    """Larger of two nullable values (scalar MAX on SQLite, GREATEST elsewhere)"""
+    current, new = func.coalesce(current, new), func.coalesce(new, current)
+    if dialect_name == "sqlite":
+        return func.max(current, new)
+    return func.greatest(current, new)
+
+
+def _upsert(dialect_name: str, model, index_elements, additive, maximum: Optional[str] = None):
+    """
+    INSERT ... ON CONFLICT DO UPDATE that adds to counters and keeps the larger maximum
+
+    Values are bound at execution, so one statement serves a single row or
+    a whole batch.
+    """
+    insert = sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+    stmt = insert(model)
+    table = model.__table__
+
+    set_ = {name: table.c[name] + stmt.excluded[name] for name in additive}
+    if maximum:
+        set_[maximum] = _greatest(dialect_name, table.c[maximum], stmt.excluded[maximum])
+    if "updated_at" in table.c:
+        set_["updated_at"] = stmt.excluded.updated_at
+
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+
+def _daily_rollup_row(user_id: int, day: date, symptom_max_severity: Optional[int] = None, **deltas: int) -> Dict:
+    return dict(
+        user_id=user_id, day=day, symptom_max_severity=symptom_max_severity, updated_at=datetime.utcnow(),
+        **{name: deltas.get(name, 0) for name in DAILY_COUNTERS}
+    )
+
+
+async def add_to_daily_rollup(
+    db: AsyncSession,
+    user_id: int,
+    day: date,
+    symptom_max_severity: Optional[int] = None,
+    **deltas: int
+) -> None:
+    """
+    Add counter deltas to a user's rollup row for one day, creating it if needed
+
+    Runs in the caller's transaction, so the rollup commits (or rolls back)
+    together with the raw rows it describes.
+
+    Args:
+        db: Database session
+        user_id: User the rollup belongs to
+        day: UTC day being updated
+        symptom_max_severity: Severity to fold into the day's maximum, if any
+        **deltas: Changes to DAILY_COUNTERS, e.g. doses_taken=1, doses_missed=-1
+    """
+    await add_to_daily_rollups(db, [_daily_rollup_row(user_id, day, symptom_max_severity, **deltas)])
+
+
+async def add_to_daily_rollups(db: AsyncSession, rows: List[Dict]) -> None:
+    """
+    Apply many rollup deltas with one executemany upsert
+
+    Args:
+        db: Database session
+        rows: Dicts with user_id, day and DAILY_COUNTERS deltas (see _daily_rollup_row)
+    """
+    if not rows:
+        return
+    stmt = _upsert(
+        _dialect_name(db), HealthDailyRollup, ["user_id", "day"], DAILY_COUNTERS, maximum="symptom_max_severity"
+    )
+    await db.execute(stmt, rows)
+
+
+async def record_missed_doses(db: AsyncSession, missed: Iterable) -> None:
+    """
+    Count newly missed doses in their days' rollups
+
+    Args:
+        db: Database session
+        missed: (user_id, scheduled_time) pairs
+    """
+    per_day = Counter((user_id, scheduled_time.date()) for user_id, scheduled_time in missed)
+    await add_to_daily_rollups(db, [
+        _daily_rollup_row(user_id, day, doses_missed=count) for (user_id, day), count in per_day.items()
+    ])
+
+
+def _max(current: Optional[int], new: Optional[int]) -> Optional[int]:
+    return new if current is None else current if new is None else max(current, new)
+
+
+async def record_symptom_rollup(db: AsyncSession, symptom: SymptomLog) -> None:
+    """Count a newly logged symptom in the daily and per-symptom rollups"""
+    await record_symptom_rollups(db, [symptom])
+
+
+async def record_symptom_rollups(db: AsyncSession, symptoms: Iterable[SymptomLog]) -> None:
+    """Count newly logged symptoms, with one upsert per rollup table for the whole batch"""
+    daily: Dict = {}  # (user_id, day) -> [count, max severity]
+    per_symptom: Dict = {}  # (user_id, day, symptom) -> [count, severity sum, max severity]
+    for symptom in symptoms:
+        day = symptom.logged_at.date()
+        totals = daily.setdefault((symptom.user_id, day), [0, None])
+        totals[0] += 1
+        totals[1] = _max(totals[1], symptom.severity)
+
+        totals = per_symptom.setdefault((symptom.user_id, day, symptom.symptom), [0, 0, None])
+        totals[0] += 1
+        totals[1] += symptom.severity or 0
+        totals[2] = _max(totals[2], symptom.severity)
+
+    if not daily:
+        return
+    await add_to_daily_rollups(db, [
+        _daily_rollup_row(user_id, day, symptom_max_severity=max_severity, symptom_count=count)
+        for (user_id, day), (count, max_severity) in daily.items()
+    ])
+    await db.execute(
+        _upsert(_dialect_name(db), SymptomDailyRollup, ["user_id", "day", "symptom"], ("count", "severity_sum"),
+                maximum="max_severity"),
+        [
+            dict(user_id=user_id, day=day, symptom=name,
+                 count=count, severity_sum=severity_sum, max_severity=max_severity)
+            for (user_id, day, name), (count, severity_sum, max_severity) in per_symptom.items()
+        ]
+    )
+
+
+async def record_vital_rollup(db: AsyncSession, vital: VitalSign) -> None:
+    """Count a newly recorded vital sign in the daily rollup"""
+    await record_vital_rollups(db, [vital])
+
+
+async def record_vital_rollups(db: AsyncSession, vitals: Iterable[VitalSign]) -> None:
+    """Count newly recorded vital signs with one upsert for the whole batch"""
+    counts = Counter()
+    abnormal = Counter()
+    for vital in vitals:
+        key = (vital.user_id, vital.measured_at.date())
+        counts[key] += 1
+        abnormal[key] += 1 if vital.is_abnormal else 0
+
+    await add_to_daily_rollups(db, [
+        _daily_rollup_row(user_id, day, vital_count=count, abnormal_vital_count=abnormal[(user_id, day)])
+        for (user_id, day), count in counts.items()
+    ])
+
+
+async def record_dose_status_change(
+    db: AsyncSession,
+    user_id: int,
+    scheduled_time: datetime,
+    old_status: Optional[str],
+    new_status: Optional[str]
+) -> None:
+    """Move a dose between the taken/missed counters of its scheduled day"""
+    deltas = Counter()
+    if old_status in DOSE_STATUS_COUNTERS:
+        deltas[DOSE_STATUS_COUNTERS[old_status]] -= 1
+    if new_status in DOSE_STATUS_COUNTERS:
+        deltas[DOSE_STATUS_COUNTERS[new_status]] += 1
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        await add_to_daily_rollup(db, user_id, scheduled_time.date(), **deltas)
+
+
+async def remove_doses_from_rollups(db: AsyncSession, user_id: int, doses: Iterable) -> None:
+    """Take back the taken/missed counts of doses that are being deleted"""
+    per_day = {}
+    for dose in doses:
+        if dose.status in DOSE_STATUS_COUNTERS:
+            per_day.setdefault(dose.scheduled_time.date(), Counter())[DOSE_STATUS_COUNTERS[dose.status]] -= 1
+
+    for day, deltas in per_day.items():
+        await add_to_daily_rollup(db, user_id, day, **deltas)
@@ -2,15 +2,28 @@
 Pydantic schemas for health management API requests and responses
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, Optional, List
+from datetime import datetime, timezone
 
 
 # ============================================================================
 # Medication Schemas
 # ============================================================================
 
+def validate_reminder_times(reminder_times: Optional[List[str]]) -> Optional[List[str]]:
+    """Reject reminder times that are not valid 24-hour "HH:MM" values, zero-padding the rest"""
+    if reminder_times is None:
+        return None
+    normalized = []
+    for time_str in reminder_times:
+        try:
+            normalized.append(datetime.strptime(time_str, "%H:%M").strftime("%H:%M"))
+        except ValueError:
+            raise ValueError(f"Invalid reminder time {time_str!r}, expected HH:MM")
+    return normalized
+
+
 class MedicationBase(BaseModel):
     name: str
     dosage: Optional[str] = None
@@ -21,6 +34,8 @@ class MedicationBase(BaseModel):
     side_effects: Optional[str] = None
     reminder_enabled: bool = True
     reminder_times: Optional[List[str]] = None
+    start_date: Optional[datetime] = None  # Defaults to now; the schedule starts here
+    end_date: Optional[datetime] = None
     prescribing_provider: Optional[str] = None
     pharmacy: Optional[str] = None
     refills_remaining: int = 0
@@ -29,6 +44,11 @@ class MedicationBase(BaseModel):
 class MedicationCreate(MedicationBase):
     user_id: int
 
+    @field_validator("reminder_times")
+    @classmethod
+    def check_reminder_times(cls, reminder_times):
+        return validate_reminder_times(reminder_times)
+
 
 class MedicationUpdate(BaseModel):
     name: Optional[str] = None
@@ -39,9 +59,16 @@ class MedicationUpdate(BaseModel):
     instructions: Optional[str] = None
     reminder_enabled: Optional[bool] = None
     reminder_times: Optional[List[str]] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
     is_active: Optional[bool] = None
     refills_remaining: Optional[int] = None
 
+    @field_validator("reminder_times")
+    @classmethod
+    def check_reminder_times(cls, reminder_times):
+        return validate_reminder_times(reminder_times)
+
 
 class MedicationResponse(MedicationBase):
     id: int
@@ -71,14 +98,28 @@ class MedicationDoseUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class MedicationDoseRecord(MedicationDoseUpdate):
+    """Act on a dose identified by its medication and scheduled time"""
+    medication_id: int
+    scheduled_time: datetime
+
+    @field_validator("scheduled_time")
+    @classmethod
+    def to_naive_utc(cls, scheduled_time):
+        # Scheduled times are stored and compared as naive UTC
+        if scheduled_time.tzinfo is not None:
+            scheduled_time = scheduled_time.astimezone(timezone.utc).replace(tzinfo=None)
+        return scheduled_time
+
+
 class MedicationDoseResponse(BaseModel):
-    id: int
+    id: Optional[int]  # None for scheduled doses that have not been acted on
     medication_id: int
     scheduled_time: datetime
     taken_time: Optional[datetime]
     status: str
     notes: Optional[str]
-    created_at: datetime
+    created_at: Optional[datetime]
 
     class Config:
         from_attributes = True
@@ -97,6 +138,7 @@ class SymptomLogCreate(BaseModel):
     location: Optional[str] = None
     description: Optional[str] = None
     related_medication_id: Optional[int] = None
+    logged_at: Optional[datetime] = None  # When recorded offline; defaults to now
 
 
 class SymptomLogResponse(BaseModel):
@@ -273,8 +315,64 @@ class HealthDashboardSummary(BaseModel):
     user_id: int
     active_medications_count: int
     recent_symptoms_count: int
+    recent_abnormal_vitals_count: int = 0
     active_care_plans_count: int
     medication_adherence: MedicationAdherenceStats
     recent_vitals: List[VitalSignResponse]
     upcoming_appointments: List[datetime]
     health_goals_progress: List[HealthGoalResponse]
+
+
+# ============================================================================
+# Batch Ingest Schemas
+# ============================================================================
+
+class HealthBatchRequest(BaseModel):
+    # Items are validated one by one so a bad reading fails alone
+    items: List[Dict[str, Any]]
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: str  # created, invalid
+    id: Optional[int] = None
+    is_abnormal: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class BatchIngestResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+# ============================================================================
+# Delta Sync Schemas
+# ============================================================================
+
+class HealthSyncTombstone(BaseModel):
+    table: str
+    id: int
+    deleted_at: datetime
+
+
+class HealthSyncResponse(BaseModel):
+    cursor: str  # Send back as ?cursor= on the next sync
+    has_more: bool  # Some table had more changes than the page size; sync again
+    medications: List[MedicationResponse]
+    symptoms: List[SymptomLogResponse]
+    vitals: List[VitalSignResponse]
+    care_plans: List[CarePlanResponse]
+    goals: List[HealthGoalResponse]
+    deleted: List[HealthSyncTombstone]
+
+
+# ============================================================================
+# Timeline Schemas
+# ============================================================================
+
+class TimelineEvent(BaseModel):
+    type: str  # dose, symptom, vital, note, care_plan, appointment
+    id: int  # ID in the event's source table (the care plan for appointments)
+    occurred_at: datetime
+    data: Dict[str, Any]
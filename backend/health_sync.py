@@ -0,0 +1,134 @@
+"""
+Delta sync for health records
+
+Clients keep a local copy of a user's medications, symptoms, vitals, care
+plans and goals and ask only for what changed since their last sync. Each
+table is read in (timestamp, id) order from a per-table position: updated_at
+for editable tables, created_at for the append-only symptom and vital logs.
+Deleted rows are reported from health_tombstones the same way.
+
+The positions travel as one opaque cursor token, returned with every
+response and sent back on the next sync.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from health_models import Medication, SymptomLog, VitalSign, CarePlan, HealthGoal, HealthTombstone
+from health_pagination import Position, decode_cursor, encode_cursor
+
+# Rows per table per sync response
+HEALTH_SYNC_PAGE_SIZE = int(os.getenv("HEALTH_SYNC_PAGE_SIZE", "200"))
+# Changes newer than this are left for the next sync, so a transaction still
+# committing with an earlier timestamp is not skipped
+HEALTH_SYNC_LAG_SECONDS = float(os.getenv("HEALTH_SYNC_LAG_SECONDS", "2"))
+
+# Sync table name -> (model, column changes are ordered by)
+SYNC_TABLES = {
+    "medications": (Medication, Medication.updated_at),
+    "symptoms": (SymptomLog, SymptomLog.created_at),
+    "vitals": (VitalSign, VitalSign.created_at),
+    "care_plans": (CarePlan, CarePlan.updated_at),
+    "goals": (HealthGoal, HealthGoal.updated_at),
+}
+TOMBSTONES = "deleted"
+
+
+def encode_sync_cursor(positions: Dict[str, Position]) -> str:
+    return encode_cursor({
+        name: [changed_at.isoformat(), record_id] for name, (changed_at, record_id) in positions.items()
+    })
+
+
+def decode_sync_cursor(cursor: Optional[str]) -> Dict[str, Position]:
+    """
+    Parse a cursor from a previous sync
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return {}
+    try:
+        payload = decode_cursor(cursor)
+        return {
+            name: (datetime.fromisoformat(changed_at), int(record_id))
+            for name, (changed_at, record_id) in payload.items()
+        }
+    except (TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid sync cursor: {e}")
+
+
+def add_tombstone(db: AsyncSession, table_name: str, user_id: int, record_id: int) -> None:
+    """Record a deletion for synced clients; added to the caller's transaction"""
+    db.add(HealthTombstone(user_id=user_id, table_name=table_name, record_id=record_id))
+
+
+async def _changes_after(db: AsyncSession, model, changed_at, user_id: int, position: Optional[Position],
+                         until: datetime, limit: int):
+    """Up to limit rows after position, plus whether more are waiting"""
+    query = select(model).where(model.user_id == user_id, changed_at < until)
+    if position is not None:
+        query = query.where(tuple_(changed_at, model.id) > tuple_(*position))
+    result = await db.execute(query.order_by(changed_at, model.id).limit(limit + 1))
+    rows = result.scalars().all()
+    return rows[:limit], len(rows) > limit
+
+
+async def sync_changes(
+    db: AsyncSession,
+    user_id: int,
+    positions: Dict[str, Position],
+    tables: List[str],
+    limit: int = HEALTH_SYNC_PAGE_SIZE
+) -> Dict:
+    """
+    Collect the rows changed and deleted since the given positions
+
+    Args:
+        db: Database session
+        user_id: User whose records are synced
+        positions: Per-table positions from decode_sync_cursor
+        tables: Sync tables to read; positions of the others are passed through.
+            Tombstones are returned for every table.
+        limit: Maximum rows per table (and tombstones) in this response
+
+    Returns:
+        HealthSyncResponse-shaped dict
+    """
+    until = datetime.utcnow() - timedelta(seconds=HEALTH_SYNC_LAG_SECONDS)
+    positions = dict(positions)
+    response = {name: [] for name in SYNC_TABLES}
+    has_more = False
+
+    for name in tables:
+        model, changed_at = SYNC_TABLES[name]
+        rows, more = await _changes_after(db, model, changed_at, user_id, positions.get(name), until, limit)
+        if rows:
+            positions[name] = (getattr(rows[-1], changed_at.key), rows[-1].id)
+        response[name] = rows
+        has_more = has_more or more
+
+    # A first sync has nothing local to delete, so it starts from now
+    if TOMBSTONES not in positions:
+        positions[TOMBSTONES] = (until, 0)
+        response[TOMBSTONES] = []
+    else:
+        tombstones, more = await _changes_after(
+            db, HealthTombstone, HealthTombstone.deleted_at, user_id, positions[TOMBSTONES], until, limit
+        )
+        if tombstones:
+            positions[TOMBSTONES] = (tombstones[-1].deleted_at, tombstones[-1].id)
+        response[TOMBSTONES] = [
+            {"table": tombstone.table_name, "id": tombstone.record_id, "deleted_at": tombstone.deleted_at}
+            for tombstone in tombstones
+        ]
+        has_more = has_more or more
+
+    response["cursor"] = encode_sync_cursor(positions)
+    response["has_more"] = has_more
+    return response
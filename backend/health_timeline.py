@@ -0,0 +1,234 @@
+"""
+Unified health timeline
+
+Merges a user's recorded medication doses, symptoms, vital signs, health
+notes, care plans and care plan appointments into one newest-first stream.
+
+A page is one UNION ALL query over (type, id, occurred_at) keys. Each branch
+is a keyset range scan on its own (user, timestamp) index, limited to the
+page size before the union, so a page costs the same however long the
+history is. The page's rows are then loaded with one query per source.
+Pages are ordered by (occurred_at, type, id) and continue from a cursor of
+the same three values.
+"""
+
+import os
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import String, literal, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from health_models import Medication, MedicationDose, SymptomLog, VitalSign, HealthNote, CarePlan
+from health_pagination import decode_cursor, encode_cursor
+
+# Events per page when streaming a whole range as NDJSON
+TIMELINE_STREAM_PAGE_SIZE = int(os.getenv("TIMELINE_STREAM_PAGE_SIZE", "200"))
+
+TimelinePosition = Tuple[datetime, str, int]
+
+# Event type -> (id column, timestamp column, extra join, user filter)
+TIMELINE_SOURCES = {
+    "dose": (
+        MedicationDose.id, MedicationDose.scheduled_time,
+        (Medication, MedicationDose.medication_id == Medication.id), lambda user_id: Medication.user_id == user_id
+    ),
+    "symptom": (SymptomLog.id, SymptomLog.logged_at, None, lambda user_id: SymptomLog.user_id == user_id),
+    "vital": (VitalSign.id, VitalSign.measured_at, None, lambda user_id: VitalSign.user_id == user_id),
+    "note": (HealthNote.id, HealthNote.created_at, None, lambda user_id: HealthNote.user_id == user_id),
+    "care_plan": (CarePlan.id, CarePlan.created_at, None, lambda user_id: CarePlan.user_id == user_id),
+    "appointment": (CarePlan.id, CarePlan.next_appointment, None, lambda user_id: CarePlan.user_id == user_id),
+}
+
+
+def encode_timeline_cursor(position: TimelinePosition) -> str:
+    occurred_at, event_type, event_id = position
+    return encode_cursor([occurred_at.isoformat(), event_type, event_id])
+
+
+def timeline_position(cursor: Optional[str]) -> Optional[TimelinePosition]:
+    """(occurred_at, type, id) the page starts after, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        occurred_at, event_type, event_id = decode_cursor(cursor)
+        if event_type not in TIMELINE_SOURCES:
+            raise ValueError(event_type)
+        return datetime.fromisoformat(occurred_at), event_type, int(event_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid timeline cursor")
+
+
+def _branch(event_type: str, user_id: int, start: Optional[datetime], end: Optional[datetime],
+            position: Optional[TimelinePosition], limit: int):
+    """Keys of one source's next events, newest first"""
+    id_column, occurred_at, join, user_filter = TIMELINE_SOURCES[event_type]
+    query = select(
+        literal(event_type, String).label("type"),
+        id_column.label("id"),
+        occurred_at.label("occurred_at")
+    ).where(user_filter(user_id), occurred_at != None)
+    if join is not None:
+        query = query.join(*join)
+
+    if start:
+        query = query.where(occurred_at >= start)
+    if end:
+        query = query.where(occurred_at <= end)
+
+    # The type is constant within a branch, so the (occurred_at, type, id)
+    # cursor reduces to a plain range on this source's index
+    if position is not None:
+        after_at, after_type, after_id = position
+        if event_type < after_type:
+            query = query.where(occurred_at <= after_at)
+        elif event_type == after_type:
+            query = query.where(tuple_(occurred_at, id_column) < tuple_(after_at, after_id))
+        else:
+            query = query.where(occurred_at < after_at)
+
+    # Wrapped so each branch keeps its own ORDER BY / LIMIT inside the union
+    branch = query.order_by(occurred_at.desc(), id_column.desc()).limit(limit).subquery()
+    return select(branch.c.type, branch.c.id, branch.c.occurred_at)
+
+
+def _dose_event(dose: MedicationDose, medication_name: str) -> Dict:
+    return {
+        "medication_id": dose.medication_id,
+        "medication_name": medication_name,
+        "status": dose.status,
+        "scheduled_time": dose.scheduled_time,
+        "taken_time": dose.taken_time,
+        "notes": dose.notes
+    }
+
+
+def _symptom_event(symptom: SymptomLog) -> Dict:
+    return {
+        "symptom": symptom.symptom,
+        "severity": symptom.severity,
+        "duration": symptom.duration,
+        "location": symptom.location,
+        "description": symptom.description
+    }
+
+
+def _vital_event(vital: VitalSign) -> Dict:
+    return {
+        "measurement_type": vital.measurement_type,
+        "systolic": vital.systolic,
+        "diastolic": vital.diastolic,
+        "value": vital.value,
+        "unit": vital.unit,
+        "is_abnormal": vital.is_abnormal,
+        "notes": vital.notes
+    }
+
+
+def _note_event(note: HealthNote) -> Dict:
+    return {"title": note.title, "content": note.content, "category": note.category}
+
+
+def _care_plan_event(plan: CarePlan) -> Dict:
+    return {
+        "care_plan_id": plan.id,
+        "title": plan.title,
+        "condition": plan.condition,
+        "status": plan.status,
+        "primary_provider": plan.primary_provider
+    }
+
+
+async def _load_details(db: AsyncSession, keys: List) -> Dict[Tuple[str, int], Dict]:
+    """Event data for a page of (type, id) keys, one query per source present"""
+    ids: Dict[str, set] = {}
+    for key in keys:
+        ids.setdefault(key.type, set()).add(key.id)
+
+    details = {}
+    if "dose" in ids:
+        result = await db.execute(
+            select(MedicationDose, Medication.name).join(Medication).where(MedicationDose.id.in_(ids["dose"]))
+        )
+        for dose, medication_name in result:
+            details[("dose", dose.id)] = _dose_event(dose, medication_name)
+
+    for event_type, model, serialize in (
+        ("symptom", SymptomLog, _symptom_event),
+        ("vital", VitalSign, _vital_event),
+        ("note", HealthNote, _note_event),
+    ):
+        if event_type in ids:
+            result = await db.execute(select(model).where(model.id.in_(ids[event_type])))
+            for row in result.scalars():
+                details[(event_type, row.id)] = serialize(row)
+
+    plan_ids = ids.get("care_plan", set()) | ids.get("appointment", set())
+    if plan_ids:
+        result = await db.execute(select(CarePlan).where(CarePlan.id.in_(plan_ids)))
+        for plan in result.scalars():
+            for event_type in ("care_plan", "appointment"):
+                details[(event_type, plan.id)] = _care_plan_event(plan)
+    return details
+
+
+async def timeline_page(
+    db: AsyncSession,
+    user_id: int,
+    event_types: List[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    position: Optional[TimelinePosition],
+    limit: int
+) -> Tuple[List[Dict], Optional[TimelinePosition]]:
+    """
+    One page of timeline events, newest first
+
+    Returns:
+        (events, position of the last event if more follow, else None)
+    """
+    events = union_all(*[
+        _branch(event_type, user_id, start, end, position, limit + 1) for event_type in event_types
+    ]).subquery()
+    result = await db.execute(
+        select(events.c.type, events.c.id, events.c.occurred_at)
+        .order_by(events.c.occurred_at.desc(), events.c.type.desc(), events.c.id.desc())
+        .limit(limit + 1)
+    )
+    keys = result.all()
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+
+    details = await _load_details(db, keys)
+    page = [
+        {"type": key.type, "id": key.id, "occurred_at": key.occurred_at, "data": details.get((key.type, key.id), {})}
+        for key in keys
+    ]
+    next_position = (keys[-1].occurred_at, keys[-1].type, keys[-1].id) if has_more else None
+    return page, next_position
+
+
+async def stream_timeline(
+    user_id: int,
+    event_types: List[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    position: Optional[TimelinePosition] = None
+) -> AsyncIterator[Dict]:
+    """
+    Yield every event in the range, newest first, a page at a time
+
+    Each page uses its own short session, so a slow reader does not hold a
+    connection for the whole stream.
+    """
+    while True:
+        async with AsyncSessionLocal() as db:
+            page, position = await timeline_page(
+                db, user_id, event_types, start, end, position, TIMELINE_STREAM_PAGE_SIZE
+            )
+        for event in page:
+            yield event
+        if position is None:
+            return
@@ -7,8 +7,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 from dataset_models import HealthService, TransitStop
 from embeddings import generate_embedding
+from opening_hours import resource_hours_store
 import math
 
+# Namespace of health service keys in the resource hours store
+HEALTH_SERVICES_HOURS_NAMESPACE = "health_services"
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -33,6 +37,14 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+def _annotate_hours(service: Dict, fid: Optional[str]) -> Dict:
+    """Attach structured hours and the current open status to a service result"""
+    hours = resource_hours_store.get(f"{HEALTH_SERVICES_HOURS_NAMESPACE}:{fid}") if fid else None
+    service["hours"] = hours.text if hours else None
+    service["open_now"] = hours.is_open_at() if hours else None
+    return service
+
+
 def search_health_services_hybrid(
     db: Session,
     user_lat: float,
@@ -40,7 +52,8 @@ def search_health_services_hybrid(
     query: Optional[str] = None,
     max_distance_km: float = 50.0,
     limit: int = 10,
-    semantic_weight: float = 0.5
+    semantic_weight: float = 0.5,
+    open_now: bool = False
 ) -> List[Dict]:
     """
     Hybrid search for health services combining distance and semantic similarity
@@ -53,13 +66,24 @@ def search_health_services_hybrid(
         max_distance_km: Maximum distance to search (km)
         limit: Maximum number of results
         semantic_weight: Weight for semantic score (0-1), distance weight is (1 - semantic_weight)
+        open_now: Only return services that are open right now
 
     Returns:
         List of health services with distance, similarity scores, and ranking
     """
 
+    # Restrict to services the hours index says are open, before any distance work
+    open_filter = ""
+    open_fids = []
+    if open_now:
+        prefix = f"{HEALTH_SERVICES_HOURS_NAMESPACE}:"
+        open_fids = [key[len(prefix):] for key in resource_hours_store.open_keys() if key.startswith(prefix)]
+        if not open_fids:
+            return []
+        open_filter = "AND fid = ANY(:open_fids)"
+
     # Step 1: Find services within max distance using PostGIS
-    distance_query = text("""
+    distance_query = text(f"""
         SELECT
             id,
             longitude,
@@ -78,7 +102,8 @@ def search_health_services_hybrid(
             ST_Distance(
                 location::geography,
                 ST_SetSRID(ST_MakePoint(:user_lon, :user_lat), 4326)::geography
-            ) / 1000.0 as distance_km
+            ) / 1000.0 as distance_km,
+            fid
         FROM health_services
         WHERE location IS NOT NULL
         AND ST_DWithin(
@@ -86,6 +111,7 @@ def search_health_services_hybrid(
             ST_SetSRID(ST_MakePoint(:user_lon, :user_lat), 4326)::geography,
             :max_distance_meters
         )
+        {open_filter}
         ORDER BY distance_km
         LIMIT :query_limit
     """)
@@ -97,14 +123,15 @@ def search_health_services_hybrid(
             "user_lat": user_lat,
             "user_lon": user_lon,
             "max_distance_meters": max_distance_km * 1000,  # Convert km to meters
-            "query_limit": limit * 3 if query else limit  # Get more results for semantic filtering
+            "query_limit": limit * 3 if query else limit,  # Get more results for semantic filtering
+            "open_fids": open_fids
         }
     ).fetchall()
 
     # If no query provided, return results sorted by distance only
     if not query:
         return [
-            {
+            _annotate_hours({
                 "id": row[0],
                 "longitude": row[1],
                 "latitude": row[2],
@@ -122,7 +149,7 @@ def search_health_services_hybrid(
                 "distance_miles": float(row[14]) * 0.621371,
                 "similarity_score": None,
                 "combined_score": None
-            }
+            }, row[15])
             for row in results
         ]
 
@@ -132,7 +159,7 @@ def search_health_services_hybrid(
     if not query_embedding:
         # Fallback to distance-only if embedding fails
         print("Warning: Failed to generate query embedding, using distance-only search")
-        return search_health_services_hybrid(db, user_lat, user_lon, None, max_distance_km, limit)
+        return search_health_services_hybrid(db, user_lat, user_lon, None, max_distance_km, limit, open_now=open_now)
 
     # Step 3: Calculate semantic similarity and combined scores
     scored_results = []
@@ -169,7 +196,7 @@ def search_health_services_hybrid(
         # Combined score (weighted average)
         combined_score = (semantic_weight * similarity_score) + ((1 - semantic_weight) * distance_score)
 
-        scored_results.append({
+        scored_results.append(_annotate_hours({
             "id": row[0],
             "longitude": row[1],
             "latitude": row[2],
@@ -188,7 +215,7 @@ def search_health_services_hybrid(
             "similarity_score": similarity_score,
             "distance_score": distance_score,
             "combined_score": combined_score
-        })
+        }, row[15]))
 
     # Sort by combined score (highest first)
     scored_results.sort(key=lambda x: x['combined_score'], reverse=True)
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from datetime import timedelta, datetime, timezone
 from typing import Optional, List
 import json
@@ -10,20 +12,34 @@ import re
 import numpy as np
 from pydantic import BaseModel
 
-from database import engine, get_db, Base
-from models import User, Conversation, Message
+from database import engine, get_db, Base, SessionLocal
+from models import User, Conversation, Message, MessageResource
 from auth import (
-    authenticate_user,
+    authenticate_user_async,
     authenticate_face,
+    face_index,
     create_access_token,
-    get_password_hash,
+    get_password_hash_async,
     get_current_user,
+    invalidate_cached_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from chatbot import get_chatbot_response, generate_conversation_report
+from chatbot import get_chatbot_reply
 from embeddings import generate_embedding, get_similar_messages
 from hybrid_search import search_health_services_hybrid, find_nearest_transit_stops
+from report_jobs import (
+    report_jobs,
+    ReportJob,
+    has_current_report,
+    generate_reports_batch,
+    REPORT_BATCH_MAX_CONVERSATIONS
+)
+from conversation_summary import should_update_summary, schedule_summary_update
 from health_api import router as health_router
+from health_pagination import NEXT_CURSOR_HEADER
+from reminder_scheduler import reminder_scheduler
+from tools import get_cache_stats
+from tools.http_client import http_client
 import health_models  # Import health models to ensure they're created
 
 # Create database tables
@@ -34,6 +50,24 @@ app = FastAPI(title="Homeless Assistant API")
 # Include health management routes
 app.include_router(health_router)
 
+
+@app.on_event("startup")
+async def start_reminder_scheduler():
+    """Start pushing medication reminders and marking missed doses"""
+    reminder_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close pooled outbound HTTP connections"""
+    http_client.close()
+
+
+@app.on_event("shutdown")
+async def stop_reminder_scheduler():
+    await reminder_scheduler.stop()
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +75,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Pydantic models
@@ -96,7 +131,10 @@ class ConnectionManager:
         await websocket.accept()
         self.active_connections[user_id] = websocket
 
-    def disconnect(self, user_id: int):
+    def disconnect(self, user_id: int, websocket: Optional[WebSocket] = None):
+        # Leave a newer connection for the same user in place
+        if websocket is not None and self.active_connections.get(user_id) is not websocket:
+            return
         if user_id in self.active_connections:
             del self.active_connections[user_id]
 
@@ -108,6 +146,24 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+async def push_report_job(job: ReportJob):
+    """Push a finished report job to the user's WebSocket, if connected"""
+    if job.user_id is not None:
+        await manager.send_message(json.dumps({"type": "report_job", **job.to_dict()}), job.user_id)
+
+
+report_jobs.on_finished = push_report_job
+
+
+async def push_medication_reminder(user_id: int, reminder: dict):
+    """Push a due medication reminder to the user's WebSocket"""
+    await manager.send_message(json.dumps(reminder), user_id)
+
+
+reminder_scheduler.on_due = push_medication_reminder
+reminder_scheduler.connected_user_ids = lambda: list(manager.active_connections)
+
+
 # Routes
 @app.get("/")
 async def root():
@@ -136,7 +192,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         # Generate token for guest user
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": str(db_user.id)}, expires_delta=access_token_expires
+            data={"sub": str(db_user.id), "guest": True}, expires_delta=access_token_expires
         )
 
         return {
@@ -151,8 +207,11 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     if user.email and get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    # Hand the connection back to the pool while bcrypt runs, as logins do
+    db.rollback()
+
     # Create user with password
-    hashed_password = get_password_hash(user.password) if user.password else None
+    hashed_password = await get_password_hash_async(user.password) if user.password else None
     db_user = User(
         username=user.username,
         email=user.email,
@@ -182,7 +241,7 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """Login with username/email and password"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -259,8 +318,10 @@ async def login(
 #         face_encoding = face_encodings[0]
 
 #         # Store encoding
-#         user.face_encoding = json.dumps(face_encoding.tolist())
+#         db_user = db.query(User).filter(User.id == user.id).first()
+#         db_user.face_encoding = face_encoding
 #         db.commit()
+#         face_index.invalidate()
 
 #         return {"message": "Face registered successfully"}
 
@@ -280,6 +341,7 @@ async def select_character(
 
     user.character_id = character.character_id
     db.commit()
+    invalidate_cached_user(user.id)
     return {"message": "Character selected successfully", "character_id": character.character_id}
 
 
@@ -314,7 +376,15 @@ async def end_conversation(
     conversation_id: int,
     db: Session = Depends(get_db)
 ):
-    """End conversation and generate report - TEMPORARY NO AUTH"""
+    """
+    End conversation and start generating its report - TEMPORARY NO AUTH
+
+    Returns a report job right away. The stored report is reused when no
+    messages have arrived since it was generated; otherwise the report is
+    generated in the background and can be polled via
+    /conversation/{conversation_id}/report/jobs/{job_id} or received over the
+    conversation's WebSocket.
+    """
     conversation = db.query(Conversation).filter(
         Conversation.id == conversation_id
     ).first()
@@ -322,18 +392,56 @@ async def end_conversation(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    # Get all messages
-    messages = db.query(Message).filter(Message.conversation_id == conversation_id).all()
-    message_list = [{"role": msg.role, "content": msg.content} for msg in messages]
-
-    # Generate report with health data (for guest mode, use conversation_id as user_id)
-    report = await generate_conversation_report(message_list, conversation_id=conversation_id, db=db)
+    last_message_id = db.query(func.max(Message.id)).filter(
+        Message.conversation_id == conversation_id
+    ).scalar()
 
     conversation.ended_at = datetime.utcnow()
-    conversation.report = report
     db.commit()
 
-    return {"report": report}
+    if has_current_report(conversation, last_message_id):
+        job = report_jobs.completed(conversation)
+    else:
+        job = report_jobs.submit(conversation, last_message_id)
+
+    return job.to_dict()
+
+
+class BatchReportRequest(BaseModel):
+    conversation_ids: List[int]
+
+
+@app.post("/conversations/reports/batch")
+async def batch_generate_reports(request: BatchReportRequest):
+    """
+    End many conversations and generate their reports - TEMPORARY NO AUTH
+
+    Streams newline-delimited JSON: one event per conversation as its report
+    finishes, then a final batch_complete event with counts.
+    """
+    if not request.conversation_ids:
+        raise HTTPException(status_code=400, detail="No conversation IDs provided")
+    if len(request.conversation_ids) > REPORT_BATCH_MAX_CONVERSATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {REPORT_BATCH_MAX_CONVERSATIONS} conversations per batch"
+        )
+
+    async def event_stream():
+        async for event in generate_reports_batch(request.conversation_ids):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@app.get("/conversation/{conversation_id}/report/jobs/{job_id}")
+async def get_report_job(conversation_id: int, job_id: str):
+    """Get the status of a report job, including the report once completed"""
+    job = report_jobs.get(job_id)
+    if not job or job.conversation_id != conversation_id:
+        raise HTTPException(status_code=404, detail="Report job not found")
+
+    return job.to_dict()
 
 
 @app.get("/conversation/{conversation_id}/report")
@@ -430,6 +538,7 @@ class HealthServiceSearchRequest(BaseModel):
     max_distance_km: float = 50.0
     limit: int = 10
     semantic_weight: float = 0.5
+    open_now: bool = False
 
 
 @app.post("/search/health-services")
@@ -447,6 +556,7 @@ async def search_health_services(
         max_distance_km: Maximum search radius in kilometers (default: 50)
         limit: Maximum number of results (default: 10)
         semantic_weight: Weight for semantic matching 0-1 (default: 0.5)
+        open_now: Only return services that are open right now (default: false)
 
     Returns:
         List of health services with distances, transit stops, and map data
@@ -460,7 +570,8 @@ async def search_health_services(
         query=request.query,
         max_distance_km=request.max_distance_km,
         limit=request.limit,
-        semantic_weight=request.semantic_weight
+        semantic_weight=request.semantic_weight,
+        open_now=request.open_now
     )
 
     # For each result, find nearest transit stops
@@ -487,6 +598,12 @@ async def search_health_services(
     }
 
 
+@app.get("/tools/cache/stats")
+async def tool_cache_stats():
+    """Get size and hit-rate statistics for the tool result caches"""
+    return get_cache_stats()
+
+
 def parse_location_from_message(message: str) -> Optional[dict]:
     """
     Parse location coordinates from a message.
@@ -512,24 +629,34 @@ def parse_location_from_message(message: str) -> Optional[dict]:
 @app.websocket("/ws/{conversation_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
-    conversation_id: int,
-    db: Session = Depends(get_db)
+    conversation_id: int
 ):
-    """WebSocket endpoint for real-time chat"""
-    await websocket.accept()
+    """
+    WebSocket endpoint for real-time chat
 
-    try:
-        # Get conversation
+    Database sessions are opened per write and closed straight away, so an
+    open socket holds no pooled connection while it waits on the user or the
+    model.
+    """
+    # Get conversation and history, then release the connection
+    with SessionLocal() as db:
         conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-        if not conversation:
-            await websocket.send_json({"error": "Conversation not found"})
-            await websocket.close()
-            return
+        if conversation:
+            messages = db.query(Message).filter(
+                Message.conversation_id == conversation_id
+            ).order_by(Message.id).all()
+            message_history = [{"role": msg.role, "content": msg.content} for msg in messages]
 
-        # Get conversation history
-        messages = db.query(Message).filter(Message.conversation_id == conversation_id).all()
-        message_history = [{"role": msg.role, "content": msg.content} for msg in messages]
+    if not conversation:
+        await websocket.accept()
+        await websocket.send_json({"error": "Conversation not found"})
+        await websocket.close()
+        return
 
+    # Register the socket so report jobs can push to it
+    await manager.connect(websocket, conversation.user_id)
+
+    try:
         while True:
             # Receive message from client
             data = await websocket.receive_json()
@@ -546,26 +673,29 @@ async def websocket_endpoint(
                 longitude = location_data["longitude"]
                 print(f"[Location] Detected coordinates: {latitude}, {longitude}")
 
-                # Update conversation with location
+                # Keep the (detached) conversation in step for the chatbot tools
                 conversation.latitude = latitude
                 conversation.longitude = longitude
-                db.commit()
 
             # Generate embedding for user message
             user_embedding = generate_embedding(user_message)
 
-            # Save user message
-            db_message = Message(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_message,
-                is_voice=is_voice,
-                latitude=latitude,
-                longitude=longitude,
-                embedding=user_embedding
-            )
-            db.add(db_message)
-            db.commit()
+            # Save user message (and location) in one short transaction
+            with SessionLocal() as db:
+                if location_data:
+                    db.query(Conversation).filter(Conversation.id == conversation_id).update(
+                        {"latitude": latitude, "longitude": longitude}
+                    )
+                db.add(Message(
+                    conversation_id=conversation_id,
+                    role="user",
+                    content=user_message,
+                    is_voice=is_voice,
+                    latitude=latitude,
+                    longitude=longitude,
+                    embedding=user_embedding
+                ))
+                db.commit()
             print(f"[Embedding] Generated embedding for user message (dim: {len(user_embedding) if user_embedding else 0})")
 
             # Add to history (include location if available)
@@ -576,30 +706,49 @@ async def websocket_endpoint(
             message_history.append(message_dict)
 
             # Get AI response (pass conversation object which now has location)
-            assistant_response = await get_chatbot_response(message_history, conversation)
+            assistant_response, assistant_resources = await get_chatbot_reply(message_history, conversation)
 
             # Generate embedding for assistant response
             assistant_embedding = generate_embedding(assistant_response)
 
-            # Save assistant message
-            db_message = Message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=assistant_response,
-                is_voice=False,
-                embedding=assistant_embedding
-            )
-            db.add(db_message)
-            db.commit()
+            # Save assistant message and its resources in one short transaction
+            with SessionLocal() as db:
+                db_message = Message(
+                    conversation_id=conversation_id,
+                    role="assistant",
+                    content=assistant_response,
+                    is_voice=False,
+                    embedding=assistant_embedding
+                )
+                db.add(db_message)
+                db.flush()
+
+                # Store resources found by tools as rows linked to the message
+                db.add_all([
+                    MessageResource(
+                        message_id=db_message.id,
+                        conversation_id=conversation_id,
+                        resource_type=resource.get("type"),
+                        resource_id=str(resource.get("id")),
+                        data=resource
+                    )
+                    for resource in assistant_resources
+                ])
+                db.commit()
             print(f"[Embedding] Generated embedding for assistant message (dim: {len(assistant_embedding) if assistant_embedding else 0})")
 
             # Add to history
             message_history.append({"role": "assistant", "content": assistant_response})
 
+            # Fold older messages into the rolling summary every few turns
+            if should_update_summary(len(message_history)):
+                schedule_summary_update(conversation_id)
+
             # Send response to client
             await websocket.send_json({
                 "role": "assistant",
                 "content": assistant_response,
+                "resources": assistant_resources,
                 "timestamp": datetime.now(timezone.utc).isoformat()
             })
 
@@ -608,6 +757,8 @@ async def websocket_endpoint(
     except Exception as e:
         print(f"WebSocket error: {str(e)}")
         await websocket.send_json({"error": str(e)})
+    finally:
+        manager.disconnect(conversation.user_id, websocket)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+"""
+Virtual medication schedule
+
+Expected doses are computed on the fly from each medication's
+reminder_times, start_date and end_date instead of being stored. A
+MedicationDose row is only written once a dose is acted on (taken, missed or
+skipped), so upcoming-dose and adherence queries work over any time window
+without placeholder rows.
+
+Reminder times are the user's wall-clock times ("08:00") in HEALTH_TIMEZONE.
+Every other time, including the scheduled times computed from them, is naive
+UTC like the rest of the health tables.
+"""
+
+import os
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from health_models import Medication, MedicationDose
+
+# Time zone reminder times are read in
+HEALTH_TIMEZONE = ZoneInfo(os.getenv("HEALTH_TIMEZONE", "America/Los_Angeles"))
+
+# "8:00", "08:00", "8am", "8:30 pm", "8 A.M." - the forms stored before reminder times were validated
+REMINDER_TIME_PATTERN = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?\s*m\.?)?\s*$", re.IGNORECASE)
+
+
+def normalize_reminder_time(value) -> Optional[str]:
+    """
+    Read a stored reminder time as a zero-padded 24-hour "HH:MM"
+
+    Returns:
+        The normalized time, or None if the value is not a recognizable time
+    """
+    match = REMINDER_TIME_PATTERN.match(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    elif match.group(2) is None:
+        return None  # A bare number is not a time
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def parse_reminder_times(reminder_times: Optional[List[str]]) -> List[time]:
+    """Parse reminder times, tolerating legacy forms like "8:00" or "8am" and skipping malformed entries"""
+    parsed = set()
+    for value in reminder_times or []:
+        normalized = normalize_reminder_time(value)
+        if normalized is not None:
+            hour, minute = map(int, normalized.split(":"))
+            parsed.add(time(hour=hour, minute=minute))
+    return sorted(parsed)
+
+
+def local_date(moment: datetime) -> date:
+    """HEALTH_TIMEZONE calendar day of a naive UTC time"""
+    return moment.replace(tzinfo=timezone.utc).astimezone(HEALTH_TIMEZONE).date()
+
+
+def scheduled_at(day: date, reminder_time: time) -> datetime:
+    """
+    Naive UTC time of a reminder on a HEALTH_TIMEZONE calendar day
+
+    Across a DST change the UTC time shifts by an hour, so the dose stays at
+    the same wall-clock time. A time skipped by the spring change (e.g.
+    02:30) falls an hour later on the clock.
+    """
+    local = datetime.combine(day, reminder_time, tzinfo=HEALTH_TIMEZONE)
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def schedule_window(medication: Medication, start: datetime, end: datetime) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Clip [start, end) to the period the medication's schedule is in effect
+
+    A medication without an end_date that has been deactivated stops at its
+    last update.
+
+    Returns:
+        (start, end) of the overlap, or None if there is none
+    """
+    if not medication.reminder_enabled or not medication.reminder_times:
+        return None
+
+    schedule_start = medication.start_date or medication.created_at
+    schedule_end = medication.end_date
+    if schedule_end is None and medication.is_active is False:
+        schedule_end = medication.updated_at
+
+    if schedule_start and schedule_start > start:
+        start = schedule_start
+    if schedule_end and schedule_end < end:
+        end = schedule_end
+    return (start, end) if start < end else None
+
+
+def iter_scheduled_times(medication: Medication, start: datetime, end: datetime) -> Iterator[datetime]:
+    """Yield the medication's scheduled dose times in [start, end), in order"""
+    window = schedule_window(medication, start, end)
+    if window is None:
+        return
+    start, end = window
+
+    reminder_times = parse_reminder_times(medication.reminder_times)
+    day, last_day = local_date(start), local_date(end)
+    while day <= last_day:
+        for reminder_time in reminder_times:
+            scheduled_time = scheduled_at(day, reminder_time)
+            if start <= scheduled_time < end:
+                yield scheduled_time
+        day += timedelta(days=1)
+
+
+def is_scheduled_time(medication: Medication, moment: datetime) -> bool:
+    """Whether moment is one of the medication's scheduled dose times"""
+    return next(iter_scheduled_times(medication, moment, moment + timedelta(minutes=1)), None) == moment
+
+
+def count_scheduled(medication: Medication, start: datetime, end: datetime) -> int:
+    """Count the medication's scheduled doses in [start, end) without expanding them"""
+    window = schedule_window(medication, start, end)
+    if window is None:
+        return 0
+    start, end = window
+
+    total = 0
+    for reminder_time in parse_reminder_times(medication.reminder_times):
+        first_day = local_date(start)
+        if scheduled_at(first_day, reminder_time) < start:
+            first_day += timedelta(days=1)
+        last_day = local_date(end)
+        if scheduled_at(last_day, reminder_time) >= end:
+            last_day -= timedelta(days=1)
+        total += max(0, (last_day - first_day).days + 1)
+    return total
+
+
+def dose_to_dict(dose: MedicationDose) -> Dict:
+    return {
+        "id": dose.id,
+        "medication_id": dose.medication_id,
+        "scheduled_time": dose.scheduled_time,
+        "taken_time": dose.taken_time,
+        "status": dose.status,
+        "notes": dose.notes,
+        "created_at": dose.created_at
+    }
+
+
+def expand_doses(
+    medications: Iterable[Medication],
+    start: datetime,
+    end: datetime,
+    recorded: Iterable[MedicationDose] = ()
+) -> List[Dict]:
+    """
+    Merge the virtual schedule with recorded doses for a time window
+
+    Scheduled times without a recorded dose come back as status "scheduled"
+    with no id. Recorded doses off the schedule (e.g. an extra dose) are
+    included as well.
+
+    Returns:
+        Dose dicts shaped like MedicationDoseResponse, sorted by scheduled_time
+    """
+    recorded_by_key = {(dose.medication_id, dose.scheduled_time): dose for dose in recorded}
+
+    doses = []
+    for medication in medications:
+        for scheduled_time in iter_scheduled_times(medication, start, end):
+            dose = recorded_by_key.pop((medication.id, scheduled_time), None)
+            if dose is not None:
+                doses.append(dose_to_dict(dose))
+            else:
+                doses.append({
+                    "id": None,
+                    "medication_id": medication.id,
+                    "scheduled_time": scheduled_time,
+                    "taken_time": None,
+                    "status": "scheduled",
+                    "notes": None,
+                    "created_at": None
+                })
+
+    doses.extend(dose_to_dict(dose) for dose in recorded_by_key.values())
+    doses.sort(key=lambda dose: dose["scheduled_time"])
+    return doses
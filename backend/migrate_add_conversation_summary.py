@@ -0,0 +1,36 @@
+"""
+Database migration script to add rolling summaries to conversations
+Run this script to update your existing database schema
+"""
+
+from sqlalchemy import create_engine, text
+from database import DATABASE_URL
+
+def migrate_database():
+    """Add rolling summary columns to the conversations table"""
+
+    # Configure engine based on database type
+    if DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        print("Starting database migration...")
+
+        for column, column_type in [("summary", "TEXT"), ("summary_message_id", "INTEGER")]:
+            try:
+                print(f"Adding {column} column to conversations table...")
+                conn.execute(text(f"ALTER TABLE conversations ADD COLUMN {column} {column_type}"))
+                conn.commit()
+                print(f"✓ {column} added")
+
+            except Exception as e:
+                conn.rollback()
+                print(f"{column} migration (may already exist): {e}")
+
+        print("\n✓ Database migration completed successfully!")
+        print("Reports on long conversations now use the rolling summary.")
+
+if __name__ == "__main__":
+    migrate_database()
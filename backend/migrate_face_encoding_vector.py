@@ -0,0 +1,68 @@
+"""
+Database migration script to store face encodings as pgvector vectors
+This script will:
+1. Convert users.face_encoding from JSON text to vector(128)
+2. Create an HNSW index for nearest-neighbour face matching
+
+SQLite databases need no changes: the JSON arrays already stored there are
+read back as vectors, and face matching runs on an in-memory matrix.
+"""
+
+from sqlalchemy import create_engine, text
+from database import DATABASE_URL
+import sys
+
+
+def migrate_face_encoding_vector():
+    """Convert face encodings to vector(128) and index them"""
+    if DATABASE_URL.startswith("sqlite"):
+        print("SQLite database detected - no migration needed.")
+        print("Face encodings are matched in memory in SQLite mode.")
+        return
+
+    engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        try:
+            print("Enabling pgvector extension...")
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+            conn.commit()
+            print("✓ pgvector extension enabled")
+
+            column_type = conn.execute(text("""
+                SELECT udt_name
+                FROM information_schema.columns
+                WHERE table_name = 'users' AND column_name = 'face_encoding';
+            """)).scalar()
+
+            if column_type == "vector":
+                print("✓ users.face_encoding is already a vector column")
+            else:
+                print("Converting users.face_encoding to vector(128)...")
+                # Stored JSON arrays ("[0.1, 0.2, ...]") are valid vector literals
+                conn.execute(text("""
+                    ALTER TABLE users
+                    ALTER COLUMN face_encoding TYPE vector(128)
+                    USING face_encoding::vector(128);
+                """))
+                conn.commit()
+                print("✓ users.face_encoding converted")
+
+            print("Creating face encoding index (HNSW, euclidean distance)...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS users_face_encoding_idx
+                ON users
+                USING hnsw (face_encoding vector_l2_ops);
+            """))
+            conn.commit()
+            print("✓ Face encoding index created")
+
+            print("\n✅ Face encoding migration completed successfully!")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate_face_encoding_vector()
@@ -0,0 +1,110 @@
+"""
+Database migration script to add composite indexes to the health tables
+Run this script to update an existing database; new databases get the
+indexes from the model definitions
+"""
+
+from sqlalchemy import create_engine, text
+from database import DATABASE_URL
+from migrate_health_rollups import migrate_health_rollups
+
+# (index name, table, column list)
+HEALTH_INDEXES = [
+    ("ix_vital_signs_user_type_measured_at_id", "vital_signs", "user_id, measurement_type, measured_at DESC, id DESC"),
+    ("ix_vital_signs_user_measured_at_id", "vital_signs", "user_id, measured_at, id"),
+    ("ix_medications_user_active", "medications", "user_id, is_active"),
+    ("ix_symptom_logs_user_logged_at_id", "symptom_logs", "user_id, logged_at, id"),
+    ("ix_care_plans_user_status", "care_plans", "user_id, status"),
+    ("ix_care_plans_user_next_appointment", "care_plans", "user_id, next_appointment"),
+    ("ix_health_goals_user_status", "health_goals", "user_id, status"),
+    ("ix_medications_user_updated", "medications", "user_id, updated_at, id"),
+    ("ix_symptom_logs_user_created", "symptom_logs", "user_id, created_at, id"),
+    ("ix_vital_signs_user_created", "vital_signs", "user_id, created_at, id"),
+    ("ix_care_plans_user_updated", "care_plans", "user_id, updated_at, id"),
+    ("ix_health_goals_user_updated", "health_goals", "user_id, updated_at, id"),
+    ("ix_medications_user_created", "medications", "user_id, created_at, id"),
+    ("ix_care_plans_user_created", "care_plans", "user_id, created_at, id"),
+    ("ix_health_goals_user_created", "health_goals", "user_id, created_at, id"),
+    ("ix_health_notes_user_created", "health_notes", "user_id, created_at, id"),
+]
+
+# Replaced by an index above that adds id for (timestamp, id) keyset pages
+SUPERSEDED_INDEXES = [
+    "ix_vital_signs_user_type_measured_at",
+    "ix_vital_signs_user_measured_at",
+    "ix_symptom_logs_user_logged_at",
+    # Replaced by the unique index below
+    "ix_medication_doses_medication_scheduled",
+]
+
+# A dose is identified by (medication_id, scheduled_time); only the most
+# recently created row of any duplicates is kept
+DOSE_UNIQUE_INDEX = "uq_medication_doses_medication_scheduled"
+DEDUPE_DOSES = """
+    DELETE FROM medication_doses WHERE id NOT IN (
+        SELECT MAX(id) FROM medication_doses GROUP BY medication_id, scheduled_time
+    )
+"""
+
+
+def migrate_database():
+    """Create any missing health table indexes and drop the ones they replace"""
+    removed_doses = 0
+
+    # Configure engine based on database type
+    if DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        print("Starting database migration...")
+
+        for name, table, columns in HEALTH_INDEXES:
+            try:
+                print(f"Creating {name} on {table}...")
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+                conn.commit()
+                print(f"✓ {name} ready")
+
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ {name} failed: {e}")
+
+        try:
+            print("Removing duplicate medication doses...")
+            removed_doses = conn.execute(text(DEDUPE_DOSES)).rowcount
+            print(f"Creating {DOSE_UNIQUE_INDEX} on medication_doses...")
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {DOSE_UNIQUE_INDEX} "
+                f"ON medication_doses (medication_id, scheduled_time)"
+            ))
+            conn.commit()
+            print(f"✓ {DOSE_UNIQUE_INDEX} ready ({removed_doses} duplicate doses removed)")
+
+        except Exception as e:
+            conn.rollback()
+            removed_doses = 0
+            print(f"❌ {DOSE_UNIQUE_INDEX} failed: {e}")
+
+        for name in SUPERSEDED_INDEXES:
+            try:
+                print(f"Dropping superseded {name}...")
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                conn.commit()
+                print(f"✓ {name} dropped")
+
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ Dropping {name} failed: {e}")
+
+    # Duplicates were each counted in the rollups, so recount from the rows left
+    if removed_doses:
+        print("\nRecounting daily rollups without the removed duplicates...")
+        migrate_health_rollups()
+
+    print("\n✓ Database migration completed successfully!")
+
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,107 @@
+"""
+Database migration script to add daily health rollups
+This script will:
+1. (Re)create the health_daily_rollups and symptom_daily_rollups tables
+2. Rebuild both from the existing medication doses, symptom logs and
+   vital signs
+
+Rollups are derived data, so the tables are dropped and rebuilt each run;
+this also picks up any change to their columns.
+"""
+
+import sys
+
+from sqlalchemy import Integer, func, literal, null, select, union_all
+
+from database import engine
+from health_models import (
+    Medication, MedicationDose, SymptomLog, VitalSign,
+    HealthDailyRollup, SymptomDailyRollup
+)
+
+
+def _zero():
+    return literal(0, Integer)
+
+
+def migrate_health_rollups():
+    """Create the rollup tables and backfill them from raw health records"""
+    print("Recreating rollup tables...")
+    for table in (HealthDailyRollup.__table__, SymptomDailyRollup.__table__):
+        table.drop(bind=engine, checkfirst=True)
+        table.create(bind=engine)
+    print("✓ health_daily_rollups and symptom_daily_rollups ready")
+
+    dose_day = func.date(MedicationDose.scheduled_time)
+    symptom_day = func.date(SymptomLog.logged_at)
+    vital_day = func.date(VitalSign.measured_at)
+
+    # One row of partial counts per (user, day) from each source table
+    doses = select(
+        Medication.user_id.label("user_id"),
+        dose_day.label("day"),
+        func.count(MedicationDose.id).filter(MedicationDose.status == "taken").label("doses_taken"),
+        func.count(MedicationDose.id).filter(MedicationDose.status == "missed").label("doses_missed"),
+        _zero().label("symptom_count"),
+        null().label("symptom_max_severity"),
+        _zero().label("vital_count"),
+        _zero().label("abnormal_vital_count")
+    ).join(Medication).where(
+        MedicationDose.status.in_(["taken", "missed"])
+    ).group_by(Medication.user_id, dose_day)
+
+    symptoms = select(
+        SymptomLog.user_id, symptom_day, _zero(), _zero(),
+        func.count(SymptomLog.id), func.max(SymptomLog.severity), _zero(), _zero()
+    ).group_by(SymptomLog.user_id, symptom_day)
+
+    vitals = select(
+        VitalSign.user_id, vital_day, _zero(), _zero(), _zero(), null(),
+        func.count(VitalSign.id), func.count(VitalSign.id).filter(VitalSign.is_abnormal == True)
+    ).group_by(VitalSign.user_id, vital_day)
+
+    parts = union_all(doses, symptoms, vitals).subquery()
+    counters = [
+        "doses_taken", "doses_missed",
+        "symptom_count", "vital_count", "abnormal_vital_count"
+    ]
+    daily = select(
+        parts.c.user_id,
+        parts.c.day,
+        *[func.sum(parts.c[name]) for name in counters],
+        func.max(parts.c.symptom_max_severity)
+    ).group_by(parts.c.user_id, parts.c.day)
+
+    per_symptom = select(
+        SymptomLog.user_id,
+        symptom_day,
+        SymptomLog.symptom,
+        func.count(SymptomLog.id),
+        func.coalesce(func.sum(SymptomLog.severity), 0),
+        func.max(SymptomLog.severity)
+    ).group_by(SymptomLog.user_id, symptom_day, SymptomLog.symptom)
+
+    with engine.connect() as conn:
+        try:
+            print("Rebuilding health_daily_rollups...")
+            result = conn.execute(HealthDailyRollup.__table__.insert().from_select(
+                ["user_id", "day", *counters, "symptom_max_severity"], daily
+            ))
+            print(f"✓ {result.rowcount} daily rollup rows written")
+
+            print("Rebuilding symptom_daily_rollups...")
+            result = conn.execute(SymptomDailyRollup.__table__.insert().from_select(
+                ["user_id", "day", "symptom", "count", "severity_sum", "max_severity"], per_symptom
+            ))
+            print(f"✓ {result.rowcount} symptom rollup rows written")
+
+            conn.commit()
+            print("\n✓ Database migration completed successfully!")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    migrate_health_rollups()
@@ -0,0 +1,84 @@
+"""
+Database migration script to move resource data out of message text
+This script will:
+1. Create the message_resources table
+2. Copy resource lists embedded as <!-- RESOURCE_DATA:... --> comments in
+   assistant messages into message_resources rows
+3. Strip the comments from messages.content
+4. Optionally (--reembed) regenerate embeddings for the cleaned messages
+"""
+
+import json
+import re
+import sys
+
+from database import SessionLocal, engine
+from models import Message, MessageResource
+
+RESOURCE_DATA_PATTERN = re.compile(r"\s*<!-- RESOURCE_DATA:(.+?) -->", re.DOTALL)
+BATCH_SIZE = 200
+
+
+def migrate_message_resources(reembed: bool = False):
+    """Backfill message_resources from embedded resource comments"""
+    print("Creating message_resources table...")
+    MessageResource.__table__.create(bind=engine, checkfirst=True)
+    print("✓ message_resources table ready")
+
+    if reembed:
+        from embeddings import generate_embedding
+
+    db = SessionLocal()
+    migrated_messages = 0
+    migrated_resources = 0
+    last_id = 0
+    try:
+        while True:
+            messages = db.query(Message).filter(
+                Message.id > last_id,
+                Message.content.like("%<!-- RESOURCE_DATA:%")
+            ).order_by(Message.id).limit(BATCH_SIZE).all()
+            if not messages:
+                break
+
+            for message in messages:
+                last_id = message.id
+                for match in RESOURCE_DATA_PATTERN.finditer(message.content):
+                    try:
+                        resource_data = json.loads(match.group(1))
+                    except ValueError as e:
+                        print(f"Skipping unparseable resource data in message {message.id}: {e}")
+                        continue
+                    if resource_data.get("type") != "resource_list":
+                        continue
+                    for resource in resource_data.get("resources") or []:
+                        db.add(MessageResource(
+                            message_id=message.id,
+                            conversation_id=message.conversation_id,
+                            resource_type=resource.get("type"),
+                            resource_id=str(resource.get("id")),
+                            data=resource
+                        ))
+                        migrated_resources += 1
+
+                message.content = RESOURCE_DATA_PATTERN.sub("", message.content)
+                if reembed:
+                    message.embedding = generate_embedding(message.content)
+                migrated_messages += 1
+
+            db.commit()
+            print(f"  Processed messages up to id {last_id}")
+
+        print(f"\n✓ Moved {migrated_resources} resources out of {migrated_messages} messages")
+        if migrated_messages and not reembed:
+            print("Run with --reembed to regenerate embeddings for the cleaned messages.")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_message_resources(reembed="--reembed" in sys.argv)
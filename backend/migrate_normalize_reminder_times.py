@@ -0,0 +1,73 @@
+"""
+Database migration script to normalize stored medication reminder times
+Reminder times are now validated as 24-hour "HH:MM" when a medication is
+created or updated, but rows saved before that can hold forms like "8:00"
+or "8am". This script rewrites every stored time as zero-padded "HH:MM"
+and drops values that are not times at all, so the reminder scheduler and
+API responses see one format.
+"""
+
+from sqlalchemy import create_engine, select, update
+from database import DATABASE_URL
+from health_models import Medication
+from medication_schedule import normalize_reminder_time
+
+def normalized_reminder_times(reminder_times):
+    """Sorted, de-duplicated "HH:MM" times, or None if none are usable"""
+    if not isinstance(reminder_times, list):
+        return None
+    normalized = {normalize_reminder_time(value) for value in reminder_times}
+    normalized.discard(None)
+    return sorted(normalized) or None
+
+def migrate_database():
+    """Rewrite medication reminder_times in the normalized format"""
+
+    # Configure engine based on database type
+    if DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(DATABASE_URL)
+
+    medications = Medication.__table__
+
+    with engine.connect() as conn:
+        print("Starting database migration...")
+
+        try:
+            print("Normalizing medication reminder times...")
+            rows = conn.execute(
+                select(medications.c.id, medications.c.reminder_times)
+                .where(medications.c.reminder_times != None)
+            ).all()
+
+            changed = dropped = 0
+            for medication_id, reminder_times in rows:
+                normalized = normalized_reminder_times(reminder_times)
+                if normalized == reminder_times:
+                    continue
+                unreadable = [
+                    value for value in (reminder_times if isinstance(reminder_times, list) else [reminder_times])
+                    if normalize_reminder_time(value) is None
+                ]
+                if unreadable:
+                    print(f"  Medication {medication_id}: dropping unreadable times {unreadable!r}")
+                    dropped += 1
+                conn.execute(
+                    update(medications).where(medications.c.id == medication_id)
+                    .values(reminder_times=normalized)
+                )
+                changed += 1
+            conn.commit()
+            print(f"✓ {changed} medications updated ({dropped} had unreadable times dropped)")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration failed: {e}")
+            return
+
+        print("\n✓ Database migration completed successfully!")
+        print("Stored reminder times are now zero-padded 24-hour HH:MM values.")
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,41 @@
+"""
+Database migration script for the virtual medication schedule
+Doses are now computed from each medication's reminder_times, and a
+medication_doses row is only written once a dose is acted on. This script
+deletes the placeholder rows (status "scheduled") that were pre-generated
+for the week after a medication was created.
+"""
+
+from sqlalchemy import create_engine, text
+from database import DATABASE_URL
+
+def migrate_database():
+    """Delete pre-generated placeholder dose rows"""
+
+    # Configure engine based on database type
+    if DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(DATABASE_URL)
+
+    with engine.connect() as conn:
+        print("Starting database migration...")
+
+        try:
+            print("Deleting placeholder medication doses...")
+            result = conn.execute(text(
+                "DELETE FROM medication_doses WHERE status = 'scheduled' AND taken_time IS NULL"
+            ))
+            conn.commit()
+            print(f"✓ {result.rowcount} placeholder doses deleted")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration failed: {e}")
+            return
+
+        print("\n✓ Database migration completed successfully!")
+        print("Upcoming doses are now computed from each medication's reminder times.")
+
+if __name__ == "__main__":
+    migrate_database()
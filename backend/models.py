@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Float, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -12,7 +12,7 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=True)
     email = Column(String, unique=True, index=True, nullable=True)
     hashed_password = Column(String, nullable=True)
-    face_encoding = Column(Text, nullable=True)  # Store face encoding as JSON string
+    face_encoding = Column(Vector(128), nullable=True)  # face_recognition encoding
     is_guest = Column(Boolean, default=False)
     character_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -28,6 +28,10 @@ class Conversation(Base):
     started_at = Column(DateTime, default=datetime.utcnow)
     ended_at = Column(DateTime, nullable=True)
     report = Column(Text, nullable=True)
+    report_message_id = Column(Integer, nullable=True)  # Last message covered by the stored report
+    report_generated_at = Column(DateTime, nullable=True)
+    summary = Column(Text, nullable=True)  # Rolling summary of earlier messages
+    summary_message_id = Column(Integer, nullable=True)  # Last message folded into the summary
     latitude = Column(Float, nullable=True)  # User's current latitude
     longitude = Column(Float, nullable=True)  # User's current longitude
 
@@ -49,3 +53,17 @@ class Message(Base):
     embedding = Column(Vector(768), nullable=True)  # Semantic embedding of message content
 
     conversation = relationship("Conversation", back_populates="messages")
+    resources = relationship("MessageResource", back_populates="message")
+
+
+class MessageResource(Base):
+    __tablename__ = "message_resources"
+
+    id = Column(Integer, primary_key=True, index=True)
+    message_id = Column(Integer, ForeignKey("messages.id"), nullable=False, index=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False, index=True)
+    resource_type = Column(String, nullable=True)  # Dataset resource type, e.g. 'healthcare', 'shelter'
+    resource_id = Column(String, nullable=False)  # Resource ID within its dataset
+    data = Column(JSON, nullable=False)  # Full resource record as returned by the search tool
+
+    message = relationship("Message", back_populates="resources")
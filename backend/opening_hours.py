@@ -0,0 +1,369 @@
+"""
+Structured weekly opening hours for resources
+
+Hours are stored as minute-of-week intervals, where minute 0 is Monday 00:00
+and a week has 10,080 minutes. Intervals that run past midnight or past the
+end of the week are split, so "is it open now?" is a simple range check.
+
+Known hours live in datasets/resource_hours.json, keyed by resource key
+(e.g. "health_services:12", where 12 is the FID from the behavioral health
+CSV), and are indexed by hour of week so "open now" becomes a local filter.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+RESOURCE_TIMEZONE = ZoneInfo(os.getenv("RESOURCE_TIMEZONE", "America/Los_Angeles"))
+RESOURCE_HOURS_PATH = os.getenv(
+    "RESOURCE_HOURS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets", "resource_hours.json")
+)
+
+DAY_INDEX = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+# Full, abbreviated and plural day names ("Sat", "Thurs", "Saturdays")
+DAY_PATTERN = r"(mon|tue|wed|thu|fri|sat|sun)(?:(?:day|sday|nesday|rsday|urday)s?|s|r|rs)?\.?(?![a-z])"
+DAY_RANGE_PATTERN = re.compile(DAY_PATTERN + r"\s*-\s*" + DAY_PATTERN)
+SINGLE_DAY_PATTERN = re.compile(r"\b" + DAY_PATTERN)
+
+TIME_PATTERN = r"(noon|midnight|\b(\d{1,2})(?::(\d{2}))?(?!\d)\s*(a\.?m\.?|p\.?m\.?)?)"
+TIME_RANGE_PATTERN = re.compile(TIME_PATTERN + r"\s*-\s*" + TIME_PATTERN)
+
+# A bare number range like "9-5" only counts as hours with a day right next to
+# it, so prose such as "ages 18-24" or "2-3 million pounds" is not read as hours
+DAY_WORD = r"(?:\b" + DAY_PATTERN + r"|daily|every ?day|weekdays?|weekends?)"
+DAY_BEFORE_RANGE_PATTERN = re.compile(DAY_WORD + r"\s*[:,]?\s*(?:from\s+)?$")
+DAY_AFTER_RANGE_PATTERN = re.compile(r"^\s*[:,]?\s*(?:on\s+)?" + DAY_WORD)
+
+ALWAYS_OPEN_PATTERN = re.compile(r"24\s*/\s*7|24\s*hours?|24\s*hrs?|always open|around the clock")
+
+# Commas only split segments when followed by a day name, so "9am-12pm, 1pm-5pm" stays together
+SEGMENT_SPLIT_PATTERN = re.compile(r"[;\n|]|,(?=\s*(?:mon|tue|wed|thu|fri|sat|sun|daily|every|weekday|weekend))")
+
+
+class WeeklyHours:
+    """Opening hours for one resource as merged minute-of-week intervals"""
+
+    def __init__(self, intervals: List[Tuple[int, int]], text: str = ""):
+        self.intervals = _merge_intervals(intervals)
+        self.text = text
+
+    @property
+    def is_24h(self) -> bool:
+        return self.intervals == [(0, MINUTES_PER_WEEK)]
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.intervals
+
+    def is_open_at(self, when: Optional[datetime] = None) -> bool:
+        """Check whether the resource is open at the given time (default: now)"""
+        minute = minute_of_week(when)
+        return any(start <= minute < end for start, end in self.intervals)
+
+    def to_dict(self) -> Dict:
+        return {"hours": self.text, "intervals": [list(interval) for interval in self.intervals]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WeeklyHours":
+        return cls([tuple(interval) for interval in data.get("intervals", [])], data.get("hours", ""))
+
+
+def minute_of_week(when: Optional[datetime] = None) -> int:
+    """
+    Convert a datetime to minutes since Monday 00:00 in the resource timezone
+
+    Naive datetimes are assumed to already be in resource local time.
+    """
+    if when is None:
+        when = datetime.now(RESOURCE_TIMEZONE)
+    elif when.tzinfo is not None:
+        when = when.astimezone(RESOURCE_TIMEZONE)
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _parse_time(match_groups: Tuple) -> Tuple[Optional[int], int, Optional[str]]:
+    """Return (hour, minute, meridiem) for one TIME_PATTERN match"""
+    word, hour, minute, meridiem = match_groups
+    if word == "noon":
+        return 12, 0, "pm"
+    if word == "midnight":
+        return 0, 0, "am"
+    meridiem = meridiem.replace(".", "") if meridiem else None
+    return int(hour), int(minute or 0), meridiem
+
+
+def _to_minutes(hour: int, minute: int, meridiem: Optional[str]) -> int:
+    if meridiem == "am" and hour == 12:
+        hour = 0
+    elif meridiem == "pm" and hour != 12:
+        hour += 12
+    return hour * 60 + minute
+
+
+def _parse_time_range(match) -> Optional[Tuple[int, int]]:
+    """Convert a TIME_RANGE_PATTERN match to (start_minute, end_minute) of a day"""
+    start_hour, start_minute, start_meridiem = _parse_time(match.groups()[0:4])
+    end_hour, end_minute, end_meridiem = _parse_time(match.groups()[4:8])
+
+    if start_hour > 24 or end_hour > 24 or start_minute > 59 or end_minute > 59:
+        return None
+
+    if start_meridiem is None and end_meridiem is None:
+        # 24-hour clock if any hour is past 12, otherwise assume e.g. "9-5" means 9am-5pm
+        if start_hour <= 12 and end_hour <= 12:
+            start_meridiem = "am" if start_hour != 12 else "pm"
+            end_meridiem = "pm" if end_hour <= start_hour or end_hour == 12 else "am"
+    elif start_meridiem is None:
+        # "9-5pm" means 9am-5pm, "1-5pm" means 1pm-5pm
+        same = _to_minutes(start_hour, start_minute, end_meridiem)
+        start_meridiem = end_meridiem if same < _to_minutes(end_hour, end_minute, end_meridiem) else "am"
+    elif end_meridiem is None:
+        end_meridiem = start_meridiem
+
+    start = _to_minutes(start_hour, start_minute, start_meridiem)
+    end = _to_minutes(end_hour, end_minute, end_meridiem)
+    if end <= start:
+        end += MINUTES_PER_DAY  # Overnight, e.g. "8pm - 6am"
+    return start, end
+
+
+def _is_clock_range(match, segment: str) -> bool:
+    """
+    Check that a TIME_RANGE_PATTERN match reads as opening hours
+
+    The range needs an am/pm, a minutes part, noon or midnight, or a day
+    name directly before or after it.
+    """
+    start_word, _, start_minute, start_meridiem = match.groups()[0:4]
+    end_word, _, end_minute, end_meridiem = match.groups()[4:8]
+    if start_meridiem or end_meridiem or start_minute or end_minute:
+        return True
+    if start_word in ("noon", "midnight") or end_word in ("noon", "midnight"):
+        return True
+    return bool(
+        DAY_BEFORE_RANGE_PATTERN.search(segment[:match.start()])
+        or DAY_AFTER_RANGE_PATTERN.search(segment[match.end():])
+    )
+
+
+def _parse_days(segment: str) -> Set[int]:
+    """Find the days of week mentioned in a segment"""
+    days: Set[int] = set()
+
+    if re.search(r"daily|every ?day|7 days|all week", segment):
+        return set(range(7))
+    if "weekday" in segment:
+        days.update(range(5))
+    if "weekend" in segment:
+        days.update([5, 6])
+
+    for match in DAY_RANGE_PATTERN.finditer(segment):
+        first, last = DAY_INDEX[match.group(1)], DAY_INDEX[match.group(2)]
+        day = first
+        while True:
+            days.add(day)
+            if day == last:
+                break
+            day = (day + 1) % 7
+    remainder = DAY_RANGE_PATTERN.sub(" ", segment)
+    for match in SINGLE_DAY_PATTERN.finditer(remainder):
+        days.add(DAY_INDEX[match.group(1)])
+
+    return days
+
+
+@lru_cache(maxsize=4096)
+def parse_weekly_hours(hours_text: Optional[str]) -> Optional[WeeklyHours]:
+    """
+    Parse free-text opening hours into a WeeklyHours
+
+    Understands strings like "24/7", "Closed", "9:00 AM - 5:00 PM",
+    "Mon-Fri 9am-5pm; Sat 10am-2pm" and overnight ranges like "8pm - 6am".
+    A bare range such as "9-5" is only read as hours next to a day name
+    ("Mon-Fri 9-5"), since search abstracts are full of other number ranges.
+
+    Args:
+        hours_text: Hours string from a dataset or search result
+
+    Returns:
+        WeeklyHours, or None if no hours could be recognized
+    """
+    if not hours_text:
+        return None
+
+    text = hours_text.strip().lower()
+    text = text.replace("–", "-").replace("—", "-")
+    text = re.sub(r"\s+(to|through|thru)\s+", " - ", text)
+
+    intervals: List[Tuple[int, int]] = []
+    pending_days: Set[int] = set()
+    found_hours = False
+
+    for segment in SEGMENT_SPLIT_PATTERN.split(text):
+        days = _parse_days(segment) | pending_days
+        time_ranges = [
+            r for r in (
+                _parse_time_range(m) for m in TIME_RANGE_PATTERN.finditer(segment)
+                if pending_days or _is_clock_range(m, segment)
+            ) if r
+        ]
+        always_open = bool(ALWAYS_OPEN_PATTERN.search(segment))
+        closed = "closed" in segment
+
+        if not time_ranges and not always_open:
+            if closed and days:
+                found_hours = True
+                pending_days = set()
+            elif days:
+                # Days listed without hours apply to the next segment, e.g. "Mon, Wed, Fri 9-5"
+                pending_days = days
+            continue
+
+        pending_days = set()
+        found_hours = True
+        if not days:
+            days = set(range(7))
+        if always_open:
+            time_ranges = [(0, MINUTES_PER_DAY)]
+
+        for day in days:
+            for start, end in time_ranges:
+                start += day * MINUTES_PER_DAY
+                end += day * MINUTES_PER_DAY
+                if end > MINUTES_PER_WEEK:
+                    # Sunday night into Monday morning wraps to the start of the week
+                    intervals.append((start, MINUTES_PER_WEEK))
+                    intervals.append((0, end - MINUTES_PER_WEEK))
+                else:
+                    intervals.append((start, end))
+
+    if not found_hours:
+        if re.search(r"\bclosed\b", text):
+            return WeeklyHours([], hours_text.strip())
+        return None
+
+    return WeeklyHours(intervals, hours_text.strip())
+
+
+# ============================================================================
+# Hours store and open-now index
+# ============================================================================
+
+class OpenNowIndex:
+    """
+    Interval index over resource hours bucketed by hour of week
+
+    Each of the 168 buckets lists the intervals overlapping that hour, so an
+    "open at" query only checks the handful of intervals in one bucket.
+    """
+
+    BUCKET_MINUTES = 60
+
+    def __init__(self):
+        self._buckets: List[List[Tuple[int, int, str]]] = [[] for _ in range(MINUTES_PER_WEEK // self.BUCKET_MINUTES)]
+
+    def add(self, key: str, hours: WeeklyHours) -> None:
+        for start, end in hours.intervals:
+            first_bucket = start // self.BUCKET_MINUTES
+            last_bucket = (end - 1) // self.BUCKET_MINUTES
+            for bucket in range(first_bucket, last_bucket + 1):
+                self._buckets[bucket].append((start, end, key))
+
+    def open_at(self, when: Optional[datetime] = None) -> Set[str]:
+        """Return the keys of all resources open at the given time"""
+        minute = minute_of_week(when)
+        return {key for start, end, key in self._buckets[minute // self.BUCKET_MINUTES] if start <= minute < end}
+
+
+def normalize_resource_name(name: str) -> str:
+    """Lowercase a resource name and strip punctuation for name lookups"""
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", (name or "").lower()).split())
+
+
+class ResourceHoursStore:
+    """Structured hours for known resources, loaded lazily from RESOURCE_HOURS_PATH"""
+
+    def __init__(self, path: str = RESOURCE_HOURS_PATH):
+        self.path = path
+        self._hours: Optional[Dict[str, WeeklyHours]] = None
+        self._names: Dict[str, str] = {}
+        self._index = OpenNowIndex()
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        hours: Dict[str, WeeklyHours] = {}
+        names: Dict[str, str] = {}
+        index = OpenNowIndex()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for key, entry in data.items():
+                    weekly_hours = WeeklyHours.from_dict(entry)
+                    hours[key] = weekly_hours
+                    index.add(key, weekly_hours)
+                    if entry.get("name"):
+                        names.setdefault(normalize_resource_name(entry["name"]), key)
+            except Exception as e:
+                print(f"[Hours] Error loading {self.path}: {str(e)}")
+        else:
+            print(f"[Hours] Warning: {self.path} not found")
+
+        self._names = names
+        self._index = index
+        self._hours = hours
+
+    def _ensure_loaded(self) -> Dict[str, WeeklyHours]:
+        if self._hours is None:
+            with self._lock:
+                if self._hours is None:
+                    self._load()
+        return self._hours
+
+    def get(self, key: str, fallback_text: Optional[str] = None) -> Optional[WeeklyHours]:
+        """
+        Get structured hours for a resource key
+
+        Falls back to parsing fallback_text (e.g. the dataset "hours" field)
+        when the store has no entry for the key.
+        """
+        hours = self._ensure_loaded().get(key)
+        if hours is None and fallback_text:
+            hours = parse_weekly_hours(fallback_text)
+        return hours
+
+    def find_by_name(self, name: str) -> Optional[Tuple[str, WeeklyHours]]:
+        """Look up a resource's hours by its (normalized) name"""
+        hours = self._ensure_loaded()
+        key = self._names.get(normalize_resource_name(name))
+        if key is None:
+            return None
+        return key, hours[key]
+
+    def open_keys(self, when: Optional[datetime] = None) -> Set[str]:
+        """Keys of all stored resources open at the given time (default: now)"""
+        self._ensure_loaded()
+        return self._index.open_at(when)
+
+
+resource_hours_store = ResourceHoursStore()
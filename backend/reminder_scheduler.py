@@ -0,0 +1,377 @@
+"""
+In-process medication reminder scheduler
+
+Reminder times are "HH:MM" wall-clock strings in HEALTH_TIMEZONE, so however
+many users there are, a day has at most 1440 distinct due minutes. They are
+converted to UTC as they are queued; the scheduler loads the minutes that
+fall in the next window into a heap (a reminder event at the minute and a
+missed-dose event a grace period later) and sleeps until the earliest one.
+When a minute comes due, the medications with reminders in effect are
+streamed in keyset batches and those with a dose at the minute (by
+parse_reminder_times, so legacy "8:00" style values count) are handled:
+
+- reminder: doses not yet acted on are pushed to users with an open
+  WebSocket through on_due. Health rows are keyed by conversation (guest
+  mode uses the conversation_id as the health user_id), so a dose goes to
+  the user who owns that conversation; one without a conversation is not
+  pushed to anyone
+- missed: doses still not acted on get a "missed" row in one multi-row
+  INSERT ... ON CONFLICT DO NOTHING per batch, and the day's rollups are
+  updated with one upsert for the rows actually inserted
+
+Every worker process runs a scheduler and pushes reminders to its own
+WebSocket connections, but only the process holding the missed-dose lease
+(a scheduler_leases row it keeps renewing) marks doses missed.
+
+Memory stays bounded by the window length and batch size, not by the number
+of users or medications.
+"""
+
+import asyncio
+import heapq
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import String, and_, cast, distinct, or_, select, update
+
+from database import AsyncSessionLocal
+from health_models import Medication, MedicationDose, SchedulerLease
+from models import Conversation
+from health_rollups import dialect_insert, record_missed_doses
+from medication_schedule import iter_scheduled_times, local_date, parse_reminder_times, scheduled_at
+
+MEDICATION_REMINDERS_ENABLED = os.getenv("MEDICATION_REMINDERS_ENABLED", "true").lower() == "true"
+# How far ahead due minutes are loaded into the heap at a time
+REMINDER_WINDOW_MINUTES = int(os.getenv("REMINDER_WINDOW_MINUTES", "15"))
+# Medications (or connected users) handled per query
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+# A dose not acted on this long after its scheduled time is marked missed
+MISSED_DOSE_GRACE_MINUTES = int(os.getenv("MISSED_DOSE_GRACE_MINUTES", "120"))
+# On startup, overdue doses from this far back are marked missed as well
+MISSED_DOSE_CATCHUP_HOURS = int(os.getenv("MISSED_DOSE_CATCHUP_HOURS", "24"))
+# How long the missed-dose lease lasts without renewal; the holder renews it
+# every third of this, and another process takes over once it expires
+SCHEDULER_LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "60"))
+MISSED_DOSE_LEASE = "missed_doses"
+
+REMIND = "remind"
+MISS = "miss"
+
+
+def _minute(moment: datetime) -> datetime:
+    return moment.replace(second=0, microsecond=0)
+
+
+def _batches(items: List, size: int) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _active_at(slot: datetime):
+    """
+    Filter for medications with reminders in effect at the slot
+
+    Which of them have a dose at the slot is decided by _is_due, since
+    reminder_times may hold legacy forms ("8:00", "8am") that only
+    parse_reminder_times reads.
+    """
+    return and_(
+        Medication.is_active == True,
+        Medication.reminder_enabled == True,
+        Medication.reminder_times != None,
+        or_(Medication.start_date == None, Medication.start_date <= slot),
+        or_(Medication.end_date == None, Medication.end_date > slot)
+    )
+
+
+def _is_due(medication: Medication, slot: datetime) -> bool:
+    """Whether the medication's schedule has a dose at the slot"""
+    return next(iter_scheduled_times(medication, slot, slot + timedelta(minutes=1)), None) == slot
+
+
+async def _acted_on(db, medication_ids: List[int], slot: datetime) -> Set[int]:
+    """IDs of medications that already have a recorded dose at the slot"""
+    result = await db.execute(
+        select(MedicationDose.medication_id).where(
+            MedicationDose.medication_id.in_(medication_ids),
+            MedicationDose.scheduled_time == slot
+        )
+    )
+    return set(result.scalars())
+
+
+class ReminderScheduler:
+    """Heap of upcoming due minutes, refilled one window at a time"""
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str, datetime]] = []  # (fire_at, kind, slot)
+        self._queued: Set[Tuple[str, datetime]] = set()
+        # slot -> IDs of medications already reminded, so re-firing a slot after
+        # reschedule() does not push the same reminder twice
+        self._reminded: Dict[datetime, Set[int]] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._is_leader = False
+        self.on_due: Optional[Callable[[int, Dict], Awaitable[None]]] = None
+        self.connected_user_ids: Callable[[], Iterable[int]] = lambda: ()
+
+    def start(self) -> None:
+        if self._task is None and MEDICATION_REMINDERS_ENABLED:
+            self._task = asyncio.create_task(self._run())
+            print(f"[Reminders] Scheduler started ({REMINDER_WINDOW_MINUTES} min window)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _push(self, fire_at: datetime, kind: str, slot: datetime) -> None:
+        if (kind, slot) not in self._queued:
+            self._queued.add((kind, slot))
+            heapq.heappush(self._heap, (fire_at, kind, slot))
+
+    async def _renew_lease(self) -> bool:
+        """
+        Take or extend the missed-dose lease
+
+        Returns:
+            True if this process holds the lease until SCHEDULER_LEASE_SECONDS from now
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=SCHEDULER_LEASE_SECONDS)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                dialect_insert(db, SchedulerLease).values(
+                    name=MISSED_DOSE_LEASE, holder=self._holder, expires_at=expires_at
+                ).on_conflict_do_nothing(index_elements=["name"])
+            )
+            result = await db.execute(
+                update(SchedulerLease).where(
+                    SchedulerLease.name == MISSED_DOSE_LEASE,
+                    or_(SchedulerLease.holder == self._holder, SchedulerLease.expires_at < now)
+                ).values(holder=self._holder, expires_at=expires_at)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def _update_leadership(self) -> None:
+        try:
+            is_leader = await self._renew_lease()
+        except Exception as e:
+            print(f"[Reminders] Failed to renew the missed-dose lease: {str(e)}")
+            is_leader = False
+
+        if is_leader and not self._is_leader:
+            print(f"[Reminders] {self._holder} now marks missed doses")
+            # The previous holder may have stopped before marking slots this
+            # process skipped, so catch up as on startup
+            if self._loaded_until is not None:
+                now = _minute(datetime.utcnow())
+                try:
+                    await self._load_window(now, max(now, self._loaded_until), catch_up=True)
+                except Exception as e:
+                    print(f"[Reminders] Failed to load schedule: {str(e)}")
+        self._is_leader = is_leader
+
+    async def _reminder_times(self) -> Set:
+        """Distinct times of day any active medication has a reminder at"""
+        times = set()
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(distinct(cast(Medication.reminder_times, String))).where(
+                    Medication.is_active == True,
+                    Medication.reminder_enabled == True,
+                    Medication.reminder_times != None
+                )
+            )
+            async for (reminder_times,) in result:
+                # SQLite hands the JSON back decoded despite the cast
+                if isinstance(reminder_times, str):
+                    try:
+                        reminder_times = json.loads(reminder_times)
+                    except ValueError:
+                        continue
+                if isinstance(reminder_times, list):
+                    times.update(parse_reminder_times(reminder_times))
+        return times
+
+    async def _load_window(self, start: datetime, end: datetime, catch_up: bool = False) -> None:
+        """
+        Queue the events that fire in [start, end)
+
+        With catch_up, doses whose grace period ran out in the catch-up
+        period before start are queued for missed-dose marking right away.
+        """
+        times = await self._reminder_times()
+        grace = timedelta(minutes=MISSED_DOSE_GRACE_MINUTES)
+        miss_start = start - grace
+        if catch_up:
+            miss_start -= timedelta(hours=MISSED_DOSE_CATCHUP_HOURS)
+
+        day, last_day = local_date(miss_start), local_date(end)
+        while day <= last_day:
+            for time_of_day in times:
+                slot = scheduled_at(day, time_of_day)
+                if start <= slot < end:
+                    self._push(slot, REMIND, slot)
+                if miss_start <= slot < end - grace:
+                    self._push(max(slot + grace, start), MISS, slot)
+            day += timedelta(days=1)
+        self._loaded_until = end
+
+    async def _send_reminders(self, slot: datetime) -> int:
+        """Push the slot's pending doses to the connected users whose conversations they belong to"""
+        if self.on_due is None:
+            return 0
+        # Reloads start at the current minute, so older slots never fire again
+        current_minute = _minute(datetime.utcnow())
+        self._reminded = {
+            reminded_slot: ids for reminded_slot, ids in self._reminded.items() if reminded_slot >= current_minute
+        }
+        reminded = self._reminded.setdefault(slot, set())
+
+        sent = 0
+        for user_ids in _batches(list(self.connected_user_ids()), REMINDER_BATCH_SIZE):
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Medication, Conversation.user_id).join(
+                        Conversation, Conversation.id == Medication.user_id
+                    ).where(_active_at(slot), Conversation.user_id.in_(user_ids))
+                )
+                due = [(med, recipient_id) for med, recipient_id in result.all() if _is_due(med, slot)]
+                if not due:
+                    continue
+                acted_on = await _acted_on(db, [med.id for med, _ in due], slot)
+
+            for med, recipient_id in due:
+                if med.id in acted_on or med.id in reminded:
+                    continue
+                try:
+                    await self.on_due(recipient_id, {
+                        "type": "medication_reminder",
+                        "conversation_id": med.user_id,
+                        "medication_id": med.id,
+                        "medication_name": med.name,
+                        "dosage": med.dosage,
+                        "instructions": med.instructions,
+                        "scheduled_time": slot.isoformat()
+                    })
+                    reminded.add(med.id)
+                    sent += 1
+                except Exception as e:
+                    print(f"[Reminders] Failed to notify user {recipient_id}: {str(e)}")
+        return sent
+
+    async def _mark_missed(self, slot: datetime) -> int:
+        """Record a missed dose for every medication still not acted on at the slot"""
+        marked = 0
+        last_id = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Medication).where(_active_at(slot), Medication.id > last_id)
+                    .order_by(Medication.id).limit(REMINDER_BATCH_SIZE)
+                )
+                batch = result.scalars().all()
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                medications = {med.id: med for med in batch if _is_due(med, slot)}
+                if medications:
+                    # Doses already recorded (including by a request racing
+                    # this insert) keep their row and are not counted again
+                    result = await db.execute(
+                        dialect_insert(db, MedicationDose).values([
+                            {"medication_id": medication_id, "scheduled_time": slot, "status": "missed"}
+                            for medication_id in medications
+                        ]).on_conflict_do_nothing(
+                            index_elements=["medication_id", "scheduled_time"]
+                        ).returning(MedicationDose.medication_id)
+                    )
+                    missed = [medications[medication_id] for medication_id in result.scalars()]
+                    if missed:
+                        await record_missed_doses(db, [(med.user_id, slot) for med in missed])
+                    await db.commit()
+                    marked += len(missed)
+
+            if len(batch) < REMINDER_BATCH_SIZE:
+                break
+        return marked
+
+    async def _fire(self, kind: str, slot: datetime) -> None:
+        self._queued.discard((kind, slot))
+        try:
+            if kind == REMIND:
+                sent = await self._send_reminders(slot)
+                if sent:
+                    print(f"[Reminders] Sent {sent} reminders for {slot:%Y-%m-%d %H:%M}")
+            elif self._is_leader:
+                marked = await self._mark_missed(slot)
+                if marked:
+                    print(f"[Reminders] Marked {marked} doses missed for {slot:%Y-%m-%d %H:%M}")
+        except Exception as e:
+            print(f"[Reminders] {kind} for {slot:%Y-%m-%d %H:%M} failed: {str(e)}")
+
+    async def _run(self) -> None:
+        window = timedelta(minutes=REMINDER_WINDOW_MINUTES)
+        renew_every = timedelta(seconds=SCHEDULER_LEASE_SECONDS / 3)
+        await self._update_leadership()
+        renew_at = datetime.utcnow() + renew_every
+        now = datetime.utcnow()
+        try:
+            await self._load_window(_minute(now), _minute(now) + window, catch_up=True)
+        except Exception as e:
+            print(f"[Reminders] Failed to load schedule: {str(e)}")
+            self._loaded_until = _minute(now)
+
+        while True:
+            now = datetime.utcnow()
+            if now >= renew_at:
+                await self._update_leadership()
+                renew_at = now + renew_every
+            if now >= self._loaded_until:
+                try:
+                    await self._load_window(self._loaded_until, _minute(now) + window)
+                except Exception as e:
+                    print(f"[Reminders] Failed to load schedule: {str(e)}")
+
+            while self._heap and self._heap[0][0] <= now:
+                _, kind, slot = heapq.heappop(self._heap)
+                await self._fire(kind, slot)
+
+            next_at = min(self._loaded_until, renew_at)
+            if self._heap and self._heap[0][0] < next_at:
+                next_at = self._heap[0][0]
+            delay = max(1.0, (next_at - datetime.utcnow()).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def reschedule(self) -> None:
+        """
+        Pick up a medication created or changed within the loaded window
+
+        The next load only covers minutes after the current window, so the
+        window is reloaded from the current minute; reminders already sent for
+        it are not sent again.
+        """
+        if self._task is None:
+            return
+        self._loaded_until = _minute(datetime.utcnow())
+        self._wakeup.set()
+
+
+reminder_scheduler = ReminderScheduler()
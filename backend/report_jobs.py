@@ -0,0 +1,331 @@
+"""
+Background report generation jobs
+
+Ending a conversation enqueues a job and returns its ID right away. The
+finished report is stored on the conversation, can be fetched by polling the
+job, and is pushed to the user's WebSocket when one is connected.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from database import SessionLocal
+from models import Conversation, Message, MessageResource
+from chatbot import build_conversation_report, get_health_summaries
+from conversation_summary import split_summarized
+
+# Finished jobs are kept for polling this long
+REPORT_JOB_RETENTION_SECONDS = int(os.getenv("REPORT_JOB_RETENTION_SECONDS", "3600"))
+# Reports generated at once by a batch request
+REPORT_BATCH_CONCURRENCY = int(os.getenv("REPORT_BATCH_CONCURRENCY", "4"))
+REPORT_BATCH_MAX_CONVERSATIONS = int(os.getenv("REPORT_BATCH_MAX_CONVERSATIONS", "100"))
+
+
+def _set_report(conversation: Conversation, report: str, last_message_id: Optional[int]) -> None:
+    conversation.report = report
+    conversation.report_message_id = last_message_id
+    conversation.report_generated_at = datetime.utcnow()
+
+
+def has_current_report(conversation: Conversation, last_message_id: Optional[int]) -> bool:
+    """Whether the stored report already covers every message in the conversation"""
+    return bool(conversation.report) and conversation.report_message_id is not None \
+        and conversation.report_message_id == last_message_id
+
+
+def load_conversation_resources(db, conversation_ids: List[int], up_to_message_id: Optional[int] = None) -> Dict[int, List[Dict]]:
+    """
+    Load the resources recommended in each conversation, in the order they were shown
+
+    One indexed query on message_resources.conversation_id covers all conversations.
+    """
+    resources = {conversation_id: [] for conversation_id in conversation_ids}
+    if not conversation_ids:
+        return resources
+
+    query = db.query(MessageResource.conversation_id, MessageResource.data).filter(
+        MessageResource.conversation_id.in_(conversation_ids)
+    )
+    if up_to_message_id is not None:
+        query = query.filter(MessageResource.message_id <= up_to_message_id)
+
+    for conversation_id, data in query.order_by(MessageResource.id).all():
+        resources[conversation_id].append(data)
+    return resources
+
+
+class ReportJob:
+    """One report generation run over a conversation's messages up to last_message_id"""
+
+    def __init__(self, conversation_id: int, user_id: Optional[int], last_message_id: Optional[int]):
+        self.id = uuid.uuid4().hex
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.last_message_id = last_message_id
+        self.status = "pending"
+        self.report: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self._finished_monotonic = time.monotonic()
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "conversation_id": self.conversation_id,
+            "status": self.status,
+            "report": self.report,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ReportJobManager:
+    """
+    In-process registry of report jobs
+
+    At most one job runs per conversation and message state; submitting again
+    while it runs returns the same job.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, ReportJob] = {}
+        self._active: Dict[int, str] = {}  # conversation_id -> pending/running job ID
+        self.on_finished: Optional[Callable[[ReportJob], Awaitable[None]]] = None
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - REPORT_JOB_RETENTION_SECONDS
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job._finished_monotonic is not None and job._finished_monotonic < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    def completed(self, conversation: Conversation) -> ReportJob:
+        """Register an already finished job for a conversation's stored report"""
+        self._prune()
+        job = ReportJob(conversation.id, conversation.user_id, conversation.report_message_id)
+        job.report = conversation.report
+        job._finish("completed")
+        self._jobs[job.id] = job
+        return job
+
+    def submit(self, conversation: Conversation, last_message_id: Optional[int]) -> ReportJob:
+        """Start generating a report in the background, or return the job already doing so"""
+        self._prune()
+
+        active_id = self._active.get(conversation.id)
+        if active_id is not None:
+            active_job = self._jobs.get(active_id)
+            if active_job and active_job.last_message_id == last_message_id:
+                return active_job
+
+        job = ReportJob(conversation.id, conversation.user_id, last_message_id)
+        self._jobs[job.id] = job
+        self._active[conversation.id] = job.id
+        job._task = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job: ReportJob) -> None:
+        """
+        Generate and store one report
+
+        Like generate_reports_batch, the inputs are loaded and the session
+        closed before the model call, so a running job does not hold a pooled
+        connection while the report is generated.
+        """
+        job.status = "running"
+        try:
+            db = SessionLocal()
+            try:
+                conversation = db.query(Conversation).filter(Conversation.id == job.conversation_id).first()
+                if not conversation:
+                    raise ValueError("Conversation not found")
+
+                query = db.query(Message).filter(Message.conversation_id == job.conversation_id)
+                if job.last_message_id is not None:
+                    query = query.filter(Message.id <= job.last_message_id)
+                messages = query.order_by(Message.id).all()
+                message_list = [{"role": msg.role, "content": msg.content} for msg in messages]
+                summary, summarized_count = split_summarized(conversation, messages)
+                resources = load_conversation_resources(db, [job.conversation_id], job.last_message_id)[job.conversation_id]
+                # For guest mode, conversation_id is used as the health data user_id
+                health_summaries = await get_health_summaries([job.conversation_id], db)
+            finally:
+                db.close()
+
+            report = await build_conversation_report(
+                message_list,
+                summary=summary,
+                summarized_count=summarized_count,
+                health_data_text=health_summaries.get(job.conversation_id, ""),
+                resources=resources
+            )
+
+            write_db = SessionLocal()
+            try:
+                conversation = write_db.query(Conversation).filter(Conversation.id == job.conversation_id).first()
+                if conversation:
+                    _set_report(conversation, report, job.last_message_id)
+                    write_db.commit()
+            finally:
+                write_db.close()
+
+            job.report = report
+            job._finish("completed")
+            print(f"[Report] Job {job.id} completed for conversation {job.conversation_id}")
+        except Exception as e:
+            job.error = str(e)
+            job._finish("failed")
+            print(f"[Report] Job {job.id} failed for conversation {job.conversation_id}: {str(e)}")
+        finally:
+            if self._active.get(job.conversation_id) == job.id:
+                del self._active[job.conversation_id]
+
+        if self.on_finished:
+            try:
+                await self.on_finished(job)
+            except Exception as e:
+                print(f"[Report] Failed to notify job {job.id}: {str(e)}")
+
+
+report_jobs = ReportJobManager()
+
+
+async def generate_reports_batch(conversation_ids: List[int]) -> AsyncIterator[Dict]:
+    """
+    End many conversations and generate their reports concurrently
+
+    Conversations, messages and health summaries for the whole batch are
+    loaded up front in a few set-based queries. At most
+    REPORT_BATCH_CONCURRENCY reports are generated at a time, all through the
+    shared report model handle.
+
+    Yields:
+        One event per conversation as its report finishes (stored reports that
+        are still current come first), then a final batch_complete event
+    """
+    conversation_ids = list(dict.fromkeys(conversation_ids))
+    events = []
+    pending = []
+
+    db = SessionLocal()
+    try:
+        conversations = {
+            conversation.id: conversation
+            for conversation in db.query(Conversation).filter(Conversation.id.in_(conversation_ids)).all()
+        }
+        messages_by_conversation = {conversation_id: [] for conversation_id in conversations}
+        messages = db.query(Message).filter(
+            Message.conversation_id.in_(list(conversations))
+        ).order_by(Message.conversation_id, Message.id).all()
+        for msg in messages:
+            messages_by_conversation[msg.conversation_id].append(msg)
+
+        ended_at = datetime.utcnow()
+        for conversation_id in conversation_ids:
+            conversation = conversations.get(conversation_id)
+            if conversation is None:
+                events.append({"event": "conversation", "conversation_id": conversation_id, "status": "not_found"})
+                continue
+
+            conversation.ended_at = ended_at
+            conversation_messages = messages_by_conversation[conversation_id]
+            last_message_id = conversation_messages[-1].id if conversation_messages else None
+
+            if has_current_report(conversation, last_message_id):
+                events.append({
+                    "event": "conversation",
+                    "conversation_id": conversation_id,
+                    "status": "completed",
+                    "reused": True,
+                    "report": conversation.report
+                })
+                continue
+
+            summary, summarized_count = split_summarized(conversation, conversation_messages)
+            pending.append({
+                "conversation_id": conversation_id,
+                "last_message_id": last_message_id,
+                "messages": [{"role": msg.role, "content": msg.content} for msg in conversation_messages],
+                "summary": summary,
+                "summarized_count": summarized_count
+            })
+
+        # For guest mode, conversation_id is used as the health data user_id
+        pending_ids = [item["conversation_id"] for item in pending]
+        health_summaries = await get_health_summaries(pending_ids, db)
+        resources = load_conversation_resources(db, pending_ids)
+        db.commit()
+    finally:
+        db.close()
+
+    for event in events:
+        yield event
+
+    semaphore = asyncio.Semaphore(REPORT_BATCH_CONCURRENCY)
+
+    async def generate(item: Dict) -> Dict:
+        conversation_id = item["conversation_id"]
+        async with semaphore:
+            try:
+                report = await build_conversation_report(
+                    item["messages"],
+                    summary=item["summary"],
+                    summarized_count=item["summarized_count"],
+                    health_data_text=health_summaries.get(conversation_id, ""),
+                    resources=resources[conversation_id]
+                )
+            except Exception as e:
+                print(f"[Report] Batch report failed for conversation {conversation_id}: {str(e)}")
+                return {"event": "conversation", "conversation_id": conversation_id, "status": "failed", "error": str(e)}
+
+        write_db = SessionLocal()
+        try:
+            conversation = write_db.query(Conversation).filter(Conversation.id == conversation_id).first()
+            if conversation:
+                _set_report(conversation, report, item["last_message_id"])
+                write_db.commit()
+        finally:
+            write_db.close()
+
+        return {"event": "conversation", "conversation_id": conversation_id, "status": "completed", "reused": False, "report": report}
+
+    # Tasks keep running (and storing reports) even if the client stops reading
+    tasks = [asyncio.create_task(generate(item)) for item in pending]
+    completed = sum(1 for event in events if event["status"] == "completed")
+    failed = 0
+    for next_finished in asyncio.as_completed(tasks):
+        event = await next_finished
+        if event["status"] == "completed":
+            completed += 1
+        else:
+            failed += 1
+        yield event
+
+    yield {
+        "event": "batch_complete",
+        "total": len(conversation_ids),
+        "completed": completed,
+        "failed": failed,
+        "not_found": len(conversation_ids) - len(conversations)
+    }
@@ -0,0 +1,43 @@
+"""
+Shared pytest setup for the backend tests
+
+Backend modules import each other as top-level modules (e.g. `from database
+import ...`), so the backend directory is put on sys.path the same way
+running from it does.
+
+Tests run against a throwaway SQLite database (or TEST_DATABASE_URL), set
+before anything imports database.
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["MEDICATION_REMINDERS_ENABLED"] = "false"
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    """
+    The FastAPI app module, imported against the test database
+
+    main creates every table on import, and the dataset tables need
+    SpatiaLite on SQLite. Only the app's own tables are created here.
+    """
+    import database
+    import models  # noqa: F401
+    import health_models  # noqa: F401
+
+    database.Base.metadata.create_all(bind=database.engine)
+    with mock.patch.object(database.Base.metadata, "create_all"):
+        import main
+    return main
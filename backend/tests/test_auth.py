@@ -0,0 +1,22 @@
+"""
+Tests for resolving the current user from a bearer token
+"""
+
+from fastapi.testclient import TestClient
+
+
+def test_guest_me_reflects_selected_character(main_module):
+    client = TestClient(main_module.app)
+    registered = client.post("/register", json={"is_guest": True}).json()
+    headers = {"Authorization": f"Bearer {registered['access_token']}"}
+    user_id = registered["user"]["id"]
+
+    assert client.get("/me", headers=headers).json()["character_id"] is None
+
+    response = client.post("/character/select", json={"user_id": user_id, "character_id": 3})
+    assert response.status_code == 200
+
+    me = client.get("/me", headers=headers).json()
+    assert me["id"] == user_id
+    assert me["is_guest"] is True
+    assert me["character_id"] == 3
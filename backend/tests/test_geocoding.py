@@ -0,0 +1,26 @@
+"""
+Tests for offline reverse geocoding
+"""
+
+import json
+
+from tools.geocoding import TRANSIT_STOPS_JSON, OfflineResolver
+
+
+def test_north_park_is_not_labelled_by_street_names():
+    resolver = OfflineResolver()
+    # North Park is in San Diego, though many nearby stops are on "El Cajon Bl"
+    assert resolver.resolve(32.7552, -117.13) == "San Diego, CA"
+
+
+def test_el_cajon_boulevard_stops_in_san_diego_keep_their_city():
+    resolver = OfflineResolver()
+    with open(TRANSIT_STOPS_JSON) as f:
+        stops = [
+            stop["coordinates"] for stop in json.load(f)
+            if (stop.get("name") or "").startswith("El Cajon Bl")
+            and (stop.get("coordinates") or {}).get("longitude", 0) < -117.1
+        ]
+    assert stops
+    for coordinates in stops:
+        assert resolver.resolve(coordinates["latitude"], coordinates["longitude"]) != "El Cajon, CA"
@@ -0,0 +1,75 @@
+"""
+Tests for the health dashboard summary
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import SessionLocal, async_engine
+from health_models import CarePlan, HealthGoal, Medication, VitalSign
+from models import User
+
+
+def create_history():
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        user = User(is_guest=True)
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Medication(user_id=user.id, name="metformin", reminder_times=["08:00", "20:00"],
+                       start_date=now - timedelta(days=60)),
+            Medication(user_id=user.id, name="old", reminder_times=["09:00"], is_active=False),
+            CarePlan(user_id=user.id, title="Diabetes", next_appointment=now + timedelta(days=30)),
+            CarePlan(user_id=user.id, title="Blood pressure", next_appointment=now + timedelta(days=7)),
+            CarePlan(user_id=user.id, title="Past", status="completed", next_appointment=now - timedelta(days=7)),
+            HealthGoal(user_id=user.id, title="Walk daily", progress_percentage=1 / 3),
+            HealthGoal(user_id=user.id, title="Done", status="achieved"),
+        ])
+        db.add_all([
+            VitalSign(user_id=user.id, measurement_type="glucose", value=100 + day + 0.123456789012345,
+                      measured_at=now - timedelta(days=day), is_abnormal=day == 0)
+            for day in range(15)
+        ])
+        db.commit()
+        return user.id, now
+
+
+def test_dashboard_is_one_statement(main_module):
+    user_id, now = create_history()
+    client = TestClient(main_module.app)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = client.get(f"/api/health/dashboard/{user_id}")
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    dashboard = response.json()
+    assert dashboard["active_medications_count"] == 1
+    assert dashboard["active_care_plans_count"] == 2
+    assert dashboard["upcoming_appointments"] == [
+        (now + timedelta(days=7)).isoformat(), (now + timedelta(days=30)).isoformat()
+    ]
+    assert [goal["title"] for goal in dashboard["health_goals_progress"]] == ["Walk daily"]
+    assert dashboard["health_goals_progress"][0]["progress_percentage"] == 1 / 3
+
+    vitals = dashboard["recent_vitals"]
+    assert [vital["value"] for vital in vitals] == [100 + day + 0.123456789012345 for day in range(10)]
+    assert vitals[0]["is_abnormal"] is True and vitals[1]["is_abnormal"] is False
+    assert vitals[0]["measured_at"] == now.isoformat()
+
+
+def test_dashboard_without_history(main_module):
+    client = TestClient(main_module.app)
+    dashboard = client.get("/api/health/dashboard/999999").json()
+    assert dashboard["recent_vitals"] == []
+    assert dashboard["upcoming_appointments"] == []
+    assert dashboard["health_goals_progress"] == []
+    assert dashboard["active_medications_count"] == 0
@@ -0,0 +1,57 @@
+"""
+Tests for the shared outbound HTTP client
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.http_client import OutboundHTTPClient
+
+
+class IdleClosingHandler(BaseHTTPRequestHandler):
+    """Answers as if keeping the connection alive, then closes it like an idle timeout would"""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "keep-alive")
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def idle_closing_server():
+    IdleClosingHandler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), IdleClosingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_client_recovers_from_closed_keepalive_socket(idle_closing_server):
+    client = OutboundHTTPClient(retry_backoff=0)
+    try:
+        assert client.get(idle_closing_server).json() == {"ok": True}
+        # The pooled socket was closed by the server while idle
+        assert client.get(idle_closing_server).json() == {"ok": True}
+    finally:
+        client.close()
+    assert IdleClosingHandler.connections == 2
+
@@ -0,0 +1,53 @@
+"""
+Tests for recording medication doses by scheduled time
+"""
+
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from database import SessionLocal
+from health_models import Medication, MedicationDose
+from models import User
+
+
+def create_medication():
+    with SessionLocal() as db:
+        user = User(is_guest=True)
+        db.add(user)
+        db.flush()
+        medication = Medication(
+            user_id=user.id, name="metformin", reminder_times=["08:00"], start_date=datetime(2026, 1, 1)
+        )
+        db.add(medication)
+        db.commit()
+        return medication.id
+
+
+def record(client, medication_id, scheduled_time):
+    return client.post("/api/health/medications/doses", json={
+        "medication_id": medication_id, "scheduled_time": scheduled_time, "status": "taken"
+    })
+
+
+def test_scheduled_dose_is_recorded(main_module):
+    medication_id = create_medication()
+    client = TestClient(main_module.app)
+    # 08:00 in San Diego on July 1 is 15:00 UTC
+    response = record(client, medication_id, "2026-07-01T15:00:00")
+    assert response.status_code == 200
+    assert response.json()["status"] == "taken"
+
+    # The same dose given with its UTC offset
+    assert record(client, medication_id, "2026-07-01T08:00:00-07:00").status_code == 200
+    with SessionLocal() as db:
+        assert db.query(MedicationDose).filter(MedicationDose.medication_id == medication_id).count() == 1
+
+
+def test_unscheduled_time_is_rejected(main_module):
+    medication_id = create_medication()
+    client = TestClient(main_module.app)
+    for scheduled_time in ("2026-07-01T15:00:01", "2026-07-01T16:00:00", "2025-07-01T15:00:00"):
+        assert record(client, medication_id, scheduled_time).status_code == 400
+    with SessionLocal() as db:
+        assert db.query(MedicationDose).filter(MedicationDose.medication_id == medication_id).count() == 0
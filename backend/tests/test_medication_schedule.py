@@ -0,0 +1,49 @@
+"""
+Tests for the virtual medication schedule
+"""
+
+from datetime import datetime
+
+from health_models import Medication
+from medication_schedule import count_scheduled, is_scheduled_time, iter_scheduled_times
+
+
+def medication(reminder_times):
+    return Medication(
+        id=1, user_id=1, name="test", reminder_times=reminder_times, reminder_enabled=True,
+        is_active=True, start_date=datetime(2026, 1, 1)
+    )
+
+
+def test_reminder_times_are_local_wall_clock():
+    med = medication(["08:00", "20:00"])
+    # San Diego is UTC-7 in summer, so 08:00 and 20:00 there are 15:00 and 03:00 (next day) UTC
+    assert list(iter_scheduled_times(med, datetime(2026, 7, 1), datetime(2026, 7, 2))) == [
+        datetime(2026, 7, 1, 3, 0), datetime(2026, 7, 1, 15, 0)
+    ]
+
+
+def test_dose_keeps_its_wall_clock_time_across_dst():
+    med = medication(["8:00"])
+    scheduled = list(iter_scheduled_times(med, datetime(2026, 10, 31), datetime(2026, 11, 3)))
+    # Standard time starts on November 1, moving 08:00 from 15:00 to 16:00 UTC
+    assert scheduled == [datetime(2026, 10, 31, 15, 0), datetime(2026, 11, 1, 16, 0), datetime(2026, 11, 2, 16, 0)]
+
+
+def test_count_matches_expanded_schedule():
+    med = medication(["00:30", "08:00", "23:45"])
+    for start, end in [
+        (datetime(2026, 3, 7, 12), datetime(2026, 3, 10, 7)),
+        (datetime(2026, 10, 30, 7, 30), datetime(2026, 11, 2, 8)),
+        (datetime(2026, 6, 1, 15), datetime(2026, 6, 1, 15, 1)),
+    ]:
+        assert count_scheduled(med, start, end) == len(list(iter_scheduled_times(med, start, end)))
+
+
+def test_is_scheduled_time():
+    med = medication(["08:00"])
+    assert is_scheduled_time(med, datetime(2026, 7, 1, 15, 0))
+    assert not is_scheduled_time(med, datetime(2026, 7, 1, 15, 0, 30))
+    assert not is_scheduled_time(med, datetime(2026, 7, 1, 8, 0))
+    # Before the medication's start date
+    assert not is_scheduled_time(med, datetime(2025, 7, 1, 15, 0))
@@ -0,0 +1,58 @@
+"""
+Tests for free-text opening hours parsing
+"""
+
+import pytest
+
+from opening_hours import MINUTES_PER_DAY, parse_weekly_hours
+from tools import check_hours_availability
+
+
+def day_interval(day: int, start_hour: int, end_hour: int):
+    return (day * MINUTES_PER_DAY + start_hour * 60, day * MINUTES_PER_DAY + end_hour * 60)
+
+
+@pytest.mark.parametrize("text", [
+    "The shelter serves ages 18-24 in downtown San Diego.",
+    "Last year the food bank distributed 2-3 million pounds of food.",
+    "Founded in 1950, it runs 3-4 programs for families of 2-6 people.",
+    "Open Monday. Serves youth ages 18-24.",
+])
+def test_number_ranges_in_prose_are_not_hours(text):
+    assert parse_weekly_hours(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10am-2pm Saturdays", [day_interval(5, 10, 14)]),
+    ("Wednesdays 9-4", [day_interval(2, 9, 16)]),
+    ("Thurs 9am-5pm", [day_interval(3, 9, 17)]),
+    ("Mon-Fri 9-5", [day_interval(day, 9, 17) for day in range(5)]),
+    ("Mon, Wed, Fri 9-5", [day_interval(day, 9, 17) for day in (0, 2, 4)]),
+    ("9 to 5 Monday through Friday", [day_interval(day, 9, 17) for day in range(5)]),
+    ("9-5 daily", [day_interval(day, 9, 17) for day in range(7)]),
+    ("9:00 AM - 5:00 PM", [day_interval(day, 9, 17) for day in range(7)]),
+])
+def test_hours_with_clock_or_day_context_parse(text, expected):
+    hours = parse_weekly_hours(text)
+    assert hours is not None
+    assert hours.intervals == expected
+
+
+def test_always_open():
+    assert parse_weekly_hours("Open 24/7").is_24h
+
+
+def test_prose_abstract_is_left_to_verify(monkeypatch):
+    abstract = "The shelter serves ages 18-24 and has distributed 2-3 million meals since 1990."
+    monkeypatch.setattr(check_hours_availability.resource_hours_store, "find_by_name", lambda name: None)
+    monkeypatch.setattr(check_hours_availability.hours_lookup_cache, "get", lambda name, resource_type: {
+        "search_query": f"{name} {resource_type} hours San Diego",
+        "hours_info": abstract,
+        "source_url": "https://example.org/shelter",
+        "fetched_at": 0,
+    })
+
+    result = check_hours_availability.check_resource_availability("Example Youth Shelter", "shelter")
+
+    assert result["is_open"] is None
+    assert result["status"] == "Hours information found - verify with resource"
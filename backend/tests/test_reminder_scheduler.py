@@ -0,0 +1,55 @@
+"""
+Tests for who the medication reminder scheduler pushes reminders to
+"""
+
+import asyncio
+from datetime import date, datetime, time
+
+from database import SessionLocal
+from health_models import Medication
+from medication_schedule import scheduled_at
+from models import Conversation, User
+from reminder_scheduler import ReminderScheduler
+
+OWNER_ID = 910001
+CONVERSATION_ID = 910002
+ORPHAN_HEALTH_USER_ID = 910003
+
+
+def create_reminders():
+    """
+    A guest's medication keyed by their conversation, as guest mode stores it
+
+    Another user's id matches the conversation id, and a medication whose
+    health user_id has no conversation cannot be attributed to anyone.
+    """
+    with SessionLocal() as db:
+        db.add_all([
+            User(id=OWNER_ID, is_guest=True),
+            User(id=CONVERSATION_ID, is_guest=True),
+            User(id=ORPHAN_HEALTH_USER_ID, is_guest=True),
+        ])
+        db.flush()
+        db.add(Conversation(id=CONVERSATION_ID, user_id=OWNER_ID))
+        db.add_all([
+            Medication(user_id=user_id, name=name, reminder_times=["08:00"], start_date=datetime(2026, 1, 1))
+            for user_id, name in ((CONVERSATION_ID, "metformin"), (ORPHAN_HEALTH_USER_ID, "orphan"))
+        ])
+        db.commit()
+
+
+def test_reminders_go_to_the_conversation_owner(main_module):
+    create_reminders()
+    pushed = []
+
+    async def on_due(user_id, reminder):
+        pushed.append((user_id, reminder["medication_name"], reminder["conversation_id"]))
+
+    scheduler = ReminderScheduler()
+    scheduler.on_due = on_due
+    scheduler.connected_user_ids = lambda: [OWNER_ID, CONVERSATION_ID, ORPHAN_HEALTH_USER_ID]
+
+    sent = asyncio.run(scheduler._send_reminders(scheduled_at(date(2026, 7, 1), time(8, 0))))
+
+    assert sent == 1
+    assert pushed == [(OWNER_ID, "metformin", CONVERSATION_ID)]
@@ -0,0 +1,33 @@
+"""
+Tests for the concurrent safe sleep web searches
+"""
+
+import time
+
+from tools import safe_places_to_sleep
+
+
+def test_options_stream_as_each_search_finishes(monkeypatch):
+    delays = {"slow": 0.3, "fast": 0.05, "stuck": 1.0}
+    monkeypatch.setattr(safe_places_to_sleep, "build_safe_sleep_queries", lambda *args: [
+        {"source": source, "type": source, "query": source} for source in delays
+    ])
+
+    def search(search_item, deadline):
+        time.sleep(delays[search_item["source"]])
+        return None if search_item["source"] == "stuck" else {"type": search_item["source"]}
+
+    monkeypatch.setattr(safe_places_to_sleep, "_search_safe_sleep_source", search)
+
+    started = time.monotonic()
+    arrivals = []
+    options, skipped = safe_places_to_sleep.search_safe_sleep_options(
+        32.7, -117.1, "San Diego, CA", deadline_seconds=0.6,
+        on_option=lambda option: arrivals.append((option["type"], time.monotonic() - started))
+    )
+
+    assert [option_type for option_type, _ in arrivals] == ["fast", "slow"]
+    # Each option is handed over when its own search finishes, not at the deadline
+    assert arrivals[0][1] < 0.25
+    assert options == [{"type": "fast"}, {"type": "slow"}]
+    assert [source["source"] for source in skipped] == ["stuck"]
@@ -0,0 +1,47 @@
+"""
+Tests for the local transit hub and 24-hour facility index
+"""
+
+import pytest
+
+from tools.safe_sleep_index import LocalSafeSleepIndex
+
+
+@pytest.mark.parametrize("stop_name", [
+    "Las Pulgas Rd & Bldg 43260 (Gas Station)",
+    "Palm Av & Hollister St (Palm Av Trolley Stn)",
+    "Dennery Rd & Home Depot Drwy",
+    "Lindbergh Field & Terminal 2 West",
+    "Washington St & Trolley Tracks",
+    "Hwy 78 & FAH Medical Station",
+])
+def test_curbside_stops_are_not_hubs(stop_name):
+    assert LocalSafeSleepIndex._hub_name(stop_name) is None
+
+
+def test_spellings_of_one_station_share_a_key():
+    keys = {
+        LocalSafeSleepIndex._hub_key(LocalSafeSleepIndex._hub_name(name))
+        for name in ["Fifth Avenue Station", "5th Avenue Station"]
+    }
+    assert len(keys) == 1
+    assert LocalSafeSleepIndex._hub_name("Escondido Transit Center Stall 12") == "Escondido Transit Center"
+
+
+def test_transit_hub_options(monkeypatch):
+    index = LocalSafeSleepIndex()
+    index.transit_hubs(32.7, -117.1, 1)  # Load the datasets first
+
+    stop = {
+        "id": "99999", "name": "Fifth Avenue Station", "agency": "MTS", "stop_code": None,
+        "wheelchair_accessible": False, "coordinates": {"latitude": 32.7, "longitude": -117.1},
+        "hub_name": "Fifth Avenue Station", "hub_key": "5th ave station",
+    }
+    monkeypatch.setattr(index._transit_hubs, "within", lambda *args: [(0.1, stop), (0.2, dict(stop, id="99998"))])
+
+    options = index.transit_hubs(32.7, -117.1, 1)
+    assert len(options) == 1
+    assert options[0]["info"] == "MTS stop #99999, not wheelchair accessible"
+
+    monkeypatch.setattr(index._transit_hubs, "within", lambda *args: [(0.1, dict(stop, id=""))])
+    assert index.transit_hubs(32.7, -117.1, 1)[0]["info"] == "MTS station, not wheelchair accessible"
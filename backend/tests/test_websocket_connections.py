@@ -0,0 +1,54 @@
+"""
+Tests for database connection use by open chat WebSockets
+"""
+
+import asyncio
+import socket
+
+import uvicorn
+import websockets
+
+from database import SessionLocal, engine
+from models import Conversation, User
+
+IDLE_SOCKETS = 500
+
+
+def create_conversations(count: int):
+    with SessionLocal() as db:
+        users = [User(is_guest=True) for _ in range(count)]
+        db.add_all(users)
+        db.flush()
+        conversations = [Conversation(user_id=user.id) for user in users]
+        db.add_all(conversations)
+        db.commit()
+        return [conversation.id for conversation in conversations]
+
+
+def test_idle_sockets_hold_no_db_connections(main_module):
+    conversation_ids = create_conversations(IDLE_SOCKETS)
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main_module.app, log_level="warning", ws="websockets"))
+
+    async def open_idle_sockets():
+        serving = asyncio.create_task(server.serve(sockets=[listener]))
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        sockets = []
+        try:
+            for conversation_id in conversation_ids:
+                sockets.append(await websockets.connect(f"ws://127.0.0.1:{port}/ws/{conversation_id}"))
+            while len(main_module.manager.active_connections) < IDLE_SOCKETS:
+                await asyncio.sleep(0.05)
+
+            # Every socket is connected and waiting for the user
+            return engine.pool.checkedout()
+        finally:
+            await asyncio.gather(*(ws.close() for ws in sockets))
+            server.should_exit = True
+            await serving
+
+    assert asyncio.run(open_idle_sockets()) == 0
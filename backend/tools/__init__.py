@@ -1,5 +1,6 @@
 """Tools package"""
 from .location_tool import location_tool, get_location_func
 from .search_tool import search_web_func, perform_web_search
+from .cache import get_cache_stats
 
-__all__ = ['location_tool', 'get_location_func', 'search_web_func', 'perform_web_search']
+__all__ = ['location_tool', 'get_location_func', 'search_web_func', 'perform_web_search', 'get_cache_stats']
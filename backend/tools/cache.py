@@ -0,0 +1,118 @@
+"""
+In-process caching for tool results
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Size of a location cell in degrees (0.01 deg is roughly 1.1 km / 0.7 miles)
+LOCATION_CELL_DEGREES = float(os.getenv("TOOL_CACHE_CELL_DEGREES", "0.01"))
+
+
+class TTLCache:
+    """
+    Bounded LRU cache where every entry carries its own expiry time
+
+    Least recently used entries are evicted once max_entries is reached,
+    so memory stays bounded no matter how many distinct keys are seen.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        """Store value under key for ttl_seconds"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Return size and hit-rate statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a query and collapse whitespace so equivalent queries share a key"""
+    return " ".join((query or "").lower().split())
+
+
+def snap_to_cell(latitude: Optional[float], longitude: Optional[float], cell_degrees: float = LOCATION_CELL_DEGREES) -> Optional[Tuple[int, int]]:
+    """
+    Snap coordinates to a grid cell so nearby requests share cache entries
+
+    Returns:
+        (row, column) cell index, or None if no location was given
+    """
+    if latitude is None or longitude is None:
+        return None
+    return (int(latitude // cell_degrees), int(longitude // cell_degrees))
+
+
+# Registry of every tool cache so they can be reported together
+_caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, max_entries: int = 1024) -> TTLCache:
+    """Get or create a named tool cache"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches.setdefault(name, TTLCache(name, max_entries))
+    return cache
+
+
+def get_cache_stats() -> Dict[str, Dict]:
+    """Return statistics for every registered tool cache"""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -3,9 +3,29 @@ Tool for checking resource hours and availability
 """
 
 from vertexai.generative_models import FunctionDeclaration
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from typing import Dict, Optional, List
-import requests
+from typing import Dict, Optional, List, Tuple
+from .cache import get_cache
+from .dataset_search import DATASETS_DIR
+from .http_client import http_client
+from opening_hours import WeeklyHours, normalize_resource_name, parse_weekly_hours, resource_hours_store
+
+# Lookups younger than this are served as-is
+HOURS_LOOKUP_FRESH_SECONDS = int(os.getenv("HOURS_LOOKUP_FRESH_SECONDS", str(6 * 3600)))
+# Older lookups are still served, but refreshed in the background, until this age
+HOURS_LOOKUP_MAX_STALE_SECONDS = int(os.getenv("HOURS_LOOKUP_MAX_STALE_SECONDS", str(7 * 24 * 3600)))
+# SQLite file backing the lookup cache across restarts ("" disables persistence)
+HOURS_LOOKUP_CACHE_PATH = os.getenv(
+    "HOURS_LOOKUP_CACHE_PATH",
+    os.path.join(os.path.dirname(DATASETS_DIR), "hours_lookup_cache.db")
+)
 
 # Define check hours function
 check_hours_func = FunctionDeclaration(
@@ -55,17 +75,24 @@ def parse_hours_string(hours_str: str) -> Optional[Dict]:
         hours_str: Hours string from search results
         
     Returns:
-        Dict with 'open', 'close' times or 'is_24h' flag, or None if unparseable
+        Dict with 'open', 'close' times or 'is_24h' flag, or None if unparseable.
+        When the weekly schedule can be parsed, 'intervals' holds it as
+        minute-of-week ranges.
     """
     if not hours_str:
         return None
-        
+
+    weekly_hours = parse_weekly_hours(hours_str)
+    if weekly_hours is not None:
+        parsed = {"intervals": weekly_hours.intervals}
+        if weekly_hours.is_24h:
+            parsed["is_24h"] = True
+        elif weekly_hours.is_closed:
+            parsed["is_closed"] = True
+        return parsed
+
     hours_str = hours_str.strip().lower()
-    
-    # Handle 24-hour facilities
-    if "24" in hours_str or "24/7" in hours_str or "always" in hours_str:
-        return {"is_24h": True}
-    
+
     # Handle closed
     if "closed" in hours_str or "n/a" in hours_str:
         return {"is_closed": True}
@@ -86,10 +113,173 @@ def parse_hours_string(hours_str: str) -> Optional[Dict]:
     return None
 
 
+def _apply_weekly_hours(result: Dict, weekly_hours: WeeklyHours) -> Dict:
+    """Set open status fields on an availability result from structured hours"""
+    result['is_open'] = weekly_hours.is_open_at()
+    if weekly_hours.is_24h:
+        result['status'] = "Open 24/7"
+    elif result['is_open']:
+        result['status'] = "Currently open"
+    else:
+        result['status'] = "Currently closed"
+    return result
+
+
+# ============================================================================
+# Lookup cache
+# ============================================================================
+
+class PersistentHoursLookupCache:
+    """SQLite-backed store of web hours lookups keyed by normalized name and type"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS hours_lookup (
+                    resource_name TEXT NOT NULL,
+                    resource_type TEXT NOT NULL,
+                    lookup TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (resource_name, resource_type)
+                )
+            """)
+            self._initialized = True
+        return conn
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[float, Dict]]:
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT fetched_at, lookup FROM hours_lookup WHERE resource_name = ? AND resource_type = ?",
+                    key
+                ).fetchone()
+            return (row[0], json.loads(row[1])) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[Hours] Persistent cache read error: {str(e)}")
+            return None
+
+    def set(self, key: Tuple[str, str], fetched_at: float, lookup: Dict) -> None:
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO hours_lookup (resource_name, resource_type, lookup, fetched_at) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], json.dumps(lookup), fetched_at)
+                )
+        except sqlite3.Error as e:
+            print(f"[Hours] Persistent cache write error: {str(e)}")
+
+
+class HoursLookupCache:
+    """
+    Stale-while-revalidate cache in front of the web hours lookup
+
+    Only the raw hours text is cached; callers derive "is open" from it at
+    request time, so cached entries never report a stale open status.
+    """
+
+    def __init__(self, persistent: Optional[PersistentHoursLookupCache] = None):
+        self._memory = get_cache("hours_lookup", max_entries=int(os.getenv("HOURS_LOOKUP_CACHE_MAX_ENTRIES", "2048")))
+        self._persistent = persistent
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hours-refresh")
+
+    def _store(self, key: Tuple[str, str], lookup: Dict) -> None:
+        fetched_at = time.time()
+        self._memory.set(key, (fetched_at, lookup), HOURS_LOOKUP_MAX_STALE_SECONDS)
+        if self._persistent:
+            self._persistent.set(key, fetched_at, lookup)
+
+    def _refresh(self, key: Tuple[str, str], resource_name: str, resource_type: str) -> None:
+        try:
+            self._store(key, _web_hours_lookup(resource_name, resource_type))
+        except Exception as e:
+            print(f"[Hours] Background refresh failed for {resource_name}: {str(e)}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: Tuple[str, str], resource_name: str, resource_type: str) -> None:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_executor.submit(self._refresh, key, resource_name, resource_type)
+
+    def get(self, resource_name: str, resource_type: str) -> Dict:
+        """
+        Get the hours lookup for a resource, fetching it only on a cold miss
+
+        Returns:
+            Lookup dict with 'search_query', 'hours_info', 'source_url' and
+            'fetched_at' (unix time of the web lookup)
+        """
+        key = (normalize_resource_name(resource_name), resource_type)
+
+        entry = self._memory.get(key)
+        if entry is None and self._persistent:
+            entry = self._persistent.get(key)
+            if entry is not None:
+                age = time.time() - entry[0]
+                if age < HOURS_LOOKUP_MAX_STALE_SECONDS:
+                    self._memory.set(key, entry, HOURS_LOOKUP_MAX_STALE_SECONDS - age)
+                else:
+                    entry = None
+
+        if entry is None:
+            lookup = _web_hours_lookup(resource_name, resource_type)
+            self._store(key, lookup)
+            return dict(lookup, fetched_at=time.time())
+
+        fetched_at, lookup = entry
+        if time.time() - fetched_at >= HOURS_LOOKUP_FRESH_SECONDS:
+            self._schedule_refresh(key, resource_name, resource_type)
+        return dict(lookup, fetched_at=fetched_at)
+
+
+def _web_hours_lookup(resource_name: str, resource_type: str) -> Dict:
+    """Search DuckDuckGo for a resource's hours"""
+    search_query = f"{resource_name} {resource_type} hours San Diego"
+    url = "https://api.duckduckgo.com/"
+    params = {
+        'q': search_query,
+        'format': 'json',
+        'no_html': 1
+    }
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
+    response = http_client.get(url, params=params, headers=headers, timeout=10)
+    data = response.json()
+
+    # Extract hours information from abstract
+    return {
+        'search_query': search_query,
+        'hours_info': data.get('Abstract') or None,
+        'source_url': data.get('AbstractURL') or None
+    }
+
+
+hours_lookup_cache = HoursLookupCache(
+    PersistentHoursLookupCache(HOURS_LOOKUP_CACHE_PATH) if HOURS_LOOKUP_CACHE_PATH else None
+)
+
+
 def check_resource_availability(resource_name: str, resource_type: str, phone_number: Optional[str] = None) -> Dict:
     """
     Check if a resource is currently open
-    
+
+    Resources in our structured hours store are answered locally; others
+    are looked up on the web (through hours_lookup_cache) and their hours
+    text parsed where possible.
+
     Args:
         resource_name: Name of the resource
         resource_type: Type of resource (shelter, food_bank, healthcare, other)
@@ -100,37 +290,33 @@ def check_resource_availability(resource_name: str, resource_type: str, phone_nu
     """
     try:
         day_name, current_time, hour_24 = get_current_day_time()
-        
+
+        known = resource_hours_store.find_by_name(resource_name)
+        if known is not None:
+            _, weekly_hours = known
+            return _apply_weekly_hours({
+                'resource_name': resource_name,
+                'resource_type': resource_type,
+                'current_time': current_time,
+                'current_day': day_name,
+                'phone_number': phone_number or 'Not provided',
+                'hours_found': weekly_hours.text,
+                'source': 'local'
+            }, weekly_hours)
+
         # Search for resource information
-        search_query = f"{resource_name} {resource_type} hours San Diego"
-        url = "https://api.duckduckgo.com/"
-        params = {
-            'q': search_query,
-            'format': 'json',
-            'no_html': 1
-        }
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        
-        # Extract hours information from abstract or related topics
-        hours_info = None
-        source = None
-        
-        if data.get('Abstract'):
-            hours_info = data.get('Abstract', '')
-            source = data.get('AbstractURL', '')
-        
+        lookup = hours_lookup_cache.get(resource_name, resource_type)
+        hours_info = lookup['hours_info']
+        source = lookup['source_url']
+
         result = {
             'resource_name': resource_name,
             'resource_type': resource_type,
             'current_time': current_time,
             'current_day': day_name,
-            'search_query': search_query,
-            'phone_number': phone_number or 'Not provided'
+            'search_query': lookup['search_query'],
+            'phone_number': phone_number or 'Not provided',
+            'hours_checked_at': datetime.fromtimestamp(lookup['fetched_at']).strftime("%Y-%m-%d %I:%M %p")
         }
         
         if hours_info:
@@ -138,13 +324,11 @@ def check_resource_availability(resource_name: str, resource_type: str, phone_nu
             result['source_url'] = source
             
             # Try to determine if open
-            hours_lower = hours_info.lower()
-            if "24" in hours_lower or "24/7" in hours_lower:
-                result['is_open'] = True
-                result['status'] = "Open 24/7"
-            elif "closed" in hours_lower:
-                result['is_open'] = False
-                result['status'] = "Currently closed"
+            # Only text parse_weekly_hours recognizes as hours (including "24/7"
+            # and "closed") sets an open status; anything else is left to verify
+            weekly_hours = parse_weekly_hours(hours_info)
+            if weekly_hours is not None:
+                _apply_weekly_hours(result, weekly_hours)
             else:
                 result['status'] = "Hours information found - verify with resource"
                 result['is_open'] = None  # Uncertain
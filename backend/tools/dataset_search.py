@@ -7,9 +7,22 @@ import os
 import math
 from typing import List, Dict, Optional
 
+from opening_hours import resource_hours_store
+
 # Path to datasets directory
 DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'datasets')
 
+# Hours store namespace for each dataset (healthcare_resources.json ids are the CSV FIDs)
+DATASET_HOURS_NAMESPACE = {
+    'healthcare_resources.json': 'health_services',
+}
+
+
+def resource_hours_key(dataset_file: str, resource_id) -> str:
+    """Build the resource_hours.json key for a dataset resource"""
+    namespace = DATASET_HOURS_NAMESPACE.get(dataset_file, os.path.splitext(dataset_file)[0])
+    return f"{namespace}:{resource_id}"
+
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -29,7 +42,7 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
-def search_local_datasets(query: str, latitude: Optional[float] = None, longitude: Optional[float] = None, max_results: int = 5) -> List[Dict]:
+def search_local_datasets(query: str, latitude: Optional[float] = None, longitude: Optional[float] = None, max_results: int = 5, open_now: bool = False) -> List[Dict]:
     """
     Search local JSON datasets for resources
 
@@ -38,6 +51,7 @@ def search_local_datasets(query: str, latitude: Optional[float] = None, longitud
         latitude: User's latitude for distance sorting
         longitude: User's longitude for distance sorting
         max_results: Maximum number of results to return
+        open_now: Only return resources with known hours that are open right now
 
     Returns:
         List of matching resources sorted by distance
@@ -77,6 +91,18 @@ def search_local_datasets(query: str, latitude: Optional[float] = None, longitud
                 data = json.load(f)
 
             for resource in data:
+                # Attach structured hours and current open status
+                hours_key = resource_hours_key(dataset_file, resource.get('id'))
+                weekly_hours = resource_hours_store.get(hours_key, resource.get('hours'))
+                if weekly_hours is not None:
+                    resource['hours'] = weekly_hours.text or resource.get('hours')
+                    resource['open_now'] = weekly_hours.is_open_at()
+                else:
+                    resource['open_now'] = None
+
+                if open_now and not resource['open_now']:
+                    continue
+
                 # Calculate distance if coordinates provided
                 distance = None
                 if latitude is not None and longitude is not None and 'coordinates' in resource:
@@ -117,6 +143,11 @@ def format_results_for_llm(results: List[Dict]) -> str:
         formatted += f"   Phone: {resource.get('phone', 'N/A')}\n"
         formatted += f"   Hours: {resource.get('hours', 'N/A')}\n"
 
+        if resource.get('open_now') is True:
+            formatted += "   Status: Open now\n"
+        elif resource.get('open_now') is False:
+            formatted += "   Status: Closed now\n"
+
         if 'distance_miles' in resource:
             formatted += f"   Distance: {resource['distance_miles']} miles from you\n"
 
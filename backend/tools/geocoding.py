@@ -0,0 +1,276 @@
+"""
+Reverse geocoding for tool location names
+
+Lookups are resolved in order from:
+1. An in-process LRU cache keyed by rounded coordinates
+2. An offline resolver built from our San Diego County datasets
+3. A persistent SQLite cache of earlier Nominatim answers
+4. Nominatim itself (rate limited to one request per second)
+
+Most lookups inside San Diego County never leave the process.
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Optional, Tuple
+
+from .cache import get_cache
+from .dataset_search import DATASETS_DIR
+from .http_client import http_client
+from .spatial_index import GridIndex
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+
+# Decimal places kept when rounding coordinates for cache keys (2 = ~1.1 km)
+GEOCODE_PRECISION = int(os.getenv("GEOCODE_PRECISION", "2"))
+GEOCODE_CACHE_PATH = os.getenv(
+    "GEOCODE_CACHE_PATH",
+    os.path.join(os.path.dirname(DATASETS_DIR), "geocode_cache.db")
+)
+GEOCODE_CACHE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", "300"))
+
+# Only trust the offline resolver when a known point is this close
+OFFLINE_MAX_DISTANCE_MILES = float(os.getenv("GEOCODE_OFFLINE_MAX_DISTANCE_MILES", "3"))
+
+HEALTH_SERVICES_CSV = os.path.join(DATASETS_DIR, "Behavioral_Health_Services_San_Diego_County_1657686067853346365.csv")
+TRANSIT_STOPS_JSON = os.path.join(DATASETS_DIR, "transit_stops.json")
+
+# Matches the "City, CA 92101" tail of a street address
+ADDRESS_CITY_PATTERN = re.compile(r",\s*([^,]+?),\s*CA\s*\d{5}", re.IGNORECASE)
+
+geocode_cache = get_cache("reverse_geocode", max_entries=int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "4096")))
+
+
+def _rounded_key(latitude: float, longitude: float) -> Tuple[float, float]:
+    return (round(latitude, GEOCODE_PRECISION), round(longitude, GEOCODE_PRECISION))
+
+
+def _city_from_address(address: str) -> Optional[str]:
+    match = ADDRESS_CITY_PATTERN.search(address or "")
+    if not match:
+        return None
+    return match.group(1).strip().title()
+
+
+# ============================================================================
+# Offline resolver
+# ============================================================================
+
+class OfflineResolver:
+    """
+    Map coordinates to a city using points from our own datasets
+
+    Health service addresses provide city names, with the Region column as a
+    fallback. Transit stops fill in the gaps between services, each taking the
+    city of its nearest service. Stop names are not used: streets named after
+    cities ("El Cajon Bl", "Coronado Ave") run far outside them.
+    """
+
+    def __init__(self):
+        self._index: Optional[GridIndex] = None
+        self._lock = threading.Lock()
+
+    def _build_index(self) -> GridIndex:
+        index = GridIndex(cell_degrees=0.02)
+        services = GridIndex(cell_degrees=0.02)
+
+        try:
+            with open(HEALTH_SERVICES_CSV, "r", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    if not row.get("LAT") or not row.get("LONG"):
+                        continue
+                    city = _city_from_address(row.get("Address", ""))
+                    if city:
+                        label = f"{city}, CA"
+                    elif row.get("Region") and row["Region"].lower() != "countywide":
+                        label = f"{row['Region'].split(',')[0].strip()} San Diego County, CA"
+                    else:
+                        continue
+                    latitude, longitude = float(row["LAT"]), float(row["LONG"])
+                    services.add(latitude, longitude, label)
+                    index.add(latitude, longitude, label)
+        except Exception as e:
+            print(f"[Geocoding] Error loading health services: {str(e)}")
+
+        try:
+            with open(TRANSIT_STOPS_JSON, "r") as f:
+                stops = json.load(f)
+            for stop in stops:
+                coordinates = stop.get("coordinates") or {}
+                latitude, longitude = coordinates.get("latitude"), coordinates.get("longitude")
+                if latitude is None or longitude is None:
+                    continue
+                nearest = services.nearest(latitude, longitude, OFFLINE_MAX_DISTANCE_MILES)
+                if nearest is not None:
+                    index.add(latitude, longitude, nearest[1])
+        except Exception as e:
+            print(f"[Geocoding] Error loading transit stops: {str(e)}")
+
+        print(f"[Geocoding] Offline resolver indexed {index.size} points")
+        return index
+
+    def resolve(self, latitude: float, longitude: float) -> Optional[str]:
+        """Return the city of the nearest known point, or None if none is close enough"""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build_index()
+
+        nearest = self._index.nearest(latitude, longitude, OFFLINE_MAX_DISTANCE_MILES)
+        return nearest[1] if nearest else None
+
+
+# ============================================================================
+# Persistent cache
+# ============================================================================
+
+class PersistentGeocodeCache:
+    """
+    SQLite-backed store of Nominatim answers keyed by rounded coordinates
+
+    Entries expire ttl_seconds after they were stored, like the in-memory
+    cache: expired rows are purged when the store is first opened and are
+    never returned by get().
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS reverse_geocode (
+                        latitude REAL NOT NULL,
+                        longitude REAL NOT NULL,
+                        name TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (latitude, longitude)
+                    )
+                """)
+                conn.execute(
+                    "DELETE FROM reverse_geocode WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+            self._initialized = True
+        return conn
+
+    def get(self, key: Tuple[float, float]) -> Optional[Tuple[str, float]]:
+        """
+        Returns:
+            (name, seconds until the entry expires), or None if missing or expired
+        """
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT name, created_at FROM reverse_geocode WHERE latitude = ? AND longitude = ?",
+                    key
+                ).fetchone()
+                if row is None:
+                    return None
+                remaining = row[1] + self.ttl_seconds - time.time()
+                if remaining <= 0:
+                    conn.execute(
+                        "DELETE FROM reverse_geocode WHERE latitude = ? AND longitude = ?",
+                        key
+                    )
+                    return None
+            return row[0], remaining
+        except sqlite3.Error as e:
+            print(f"[Geocoding] Persistent cache read error: {str(e)}")
+            return None
+
+    def set(self, key: Tuple[float, float], name: str) -> None:
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO reverse_geocode (latitude, longitude, name, created_at) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], name, time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"[Geocoding] Persistent cache write error: {str(e)}")
+
+
+offline_resolver = OfflineResolver()
+persistent_cache = PersistentGeocodeCache(GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL_SECONDS)
+
+
+def _nominatim_lookup(latitude: float, longitude: float) -> Optional[str]:
+    """Reverse geocode with Nominatim (OpenStreetMap)"""
+    params = {
+        'lat': latitude,
+        'lon': longitude,
+        'format': 'json',
+        'zoom': 10  # City level
+    }
+    response = http_client.get(NOMINATIM_URL, params=params, timeout=5)
+
+    if response.status_code != 200:
+        return None
+
+    address = response.json().get('address', {})
+
+    # Try to get city, state, country
+    city = address.get('city') or address.get('town') or address.get('village')
+    state = address.get('state')
+    country = address.get('country')
+
+    if city and state:
+        return f"{city}, {state}"
+    elif city and country:
+        return f"{city}, {country}"
+    elif city:
+        return city
+    return None
+
+
+def get_location_name(latitude: float, longitude: float) -> Optional[str]:
+    """
+    Get city/location name from coordinates
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+
+    Returns:
+        Location string (e.g., "San Diego, CA") or None if failed
+    """
+    key = _rounded_key(latitude, longitude)
+
+    cached = geocode_cache.get(key)
+    if cached is not None:
+        return cached or None
+
+    ttl_seconds = GEOCODE_CACHE_TTL_SECONDS
+    try:
+        name = offline_resolver.resolve(latitude, longitude)
+        if name is None:
+            stored = persistent_cache.get(key)
+            if stored is not None:
+                # Keep the stored entry's original expiry rather than restarting it
+                name, ttl_seconds = stored
+        if name is None:
+            name = _nominatim_lookup(latitude, longitude)
+            if name:
+                persistent_cache.set(key, name)
+    except Exception as e:
+        print(f"Reverse geocoding error: {str(e)}")
+        return None
+
+    if name:
+        geocode_cache.set(key, name, ttl_seconds)
+    else:
+        # Remember failures briefly so we don't hammer Nominatim
+        geocode_cache.set(key, "", GEOCODE_NEGATIVE_TTL_SECONDS)
+    return name
@@ -0,0 +1,188 @@
+"""
+Shared outbound HTTP client for tool calls
+
+All tools go through this module so connections to DuckDuckGo, Nominatim and
+other services are pooled and kept alive instead of opening a new TCP+TLS
+connection per request, with per-host concurrency and rate limits, timeouts
+and retries on transient failures.
+
+Requests block the calling thread (rate-limit waits and retry backoff
+included), so async code runs the tools on a worker thread rather than on
+the event loop.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.5"))
+DEFAULT_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+
+DEFAULT_USER_AGENT = "HomelessAssistantApp/1.0"
+
+# Hosts with stricter usage policies get fewer concurrent requests
+PER_HOST_LIMITS = {
+    "nominatim.openstreetmap.org": 1,
+}
+
+# Minimum seconds between the starts of two requests to a host, shared by
+# every thread and coroutine in the process
+PER_HOST_MIN_INTERVALS = {
+    "nominatim.openstreetmap.org": 1.0,  # Nominatim allows at most 1 request per second
+}
+
+# Status codes worth retrying - everything else is returned to the caller
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OutboundHTTPClient:
+    """Pooled HTTP client with per-host concurrency and rate limits and retries"""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_retries: int = MAX_RETRIES,
+        retry_backoff: float = RETRY_BACKOFF_SECONDS,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        )
+        self._headers = {"User-Agent": DEFAULT_USER_AGENT}
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_request_at: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Client and semaphore management
+    # ------------------------------------------------------------------
+
+    def _get_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    limits=self._limits,
+                    timeout=self.timeout,
+                    headers=self._headers,
+                    follow_redirects=True,
+                )
+            return self._client
+
+    @staticmethod
+    def _host_limit(host: str) -> int:
+        return PER_HOST_LIMITS.get(host, DEFAULT_PER_HOST_LIMIT)
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self._host_limit(host))
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    def _reserve_slot(self, host: str) -> float:
+        """
+        Claim the host's next request slot
+
+        Returns:
+            Seconds to wait before sending, 0 for hosts without a minimum interval
+        """
+        interval = PER_HOST_MIN_INTERVALS.get(host)
+        if not interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = start_at + interval
+        return start_at - now
+
+    def _backoff(self, attempt: int) -> float:
+        return self.retry_backoff * (2 ** attempt)
+
+    @staticmethod
+    def _time_left(deadline: Optional[float], url: str) -> Optional[float]:
+        """Seconds until deadline (a time.monotonic() value), raising once it has passed"""
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise httpx.TimeoutException(f"Deadline passed before requesting {url}")
+        return remaining
+
+    def _request_timeout(self, timeout: Optional[float], deadline: Optional[float], url: str) -> float:
+        request_timeout = timeout if timeout is not None else self.timeout
+        remaining = self._time_left(deadline, url)
+        return request_timeout if remaining is None else min(request_timeout, remaining)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> httpx.Response:
+        """
+        Send a GET request using the shared connection pool
+
+        Args:
+            url: Request URL
+            params: Optional query parameters
+            headers: Optional headers, merged over the client defaults
+            timeout: Optional timeout in seconds (defaults to HTTP_TIMEOUT_SECONDS)
+            deadline: Optional time.monotonic() value the request, including
+                waits and retries, must finish by. Each attempt's timeout is
+                cut to the time left, and no retry starts after it.
+
+        Returns:
+            The HTTP response. Transport errors (httpx.TimeoutException once
+            the deadline has passed) are raised once retries are exhausted.
+        """
+        client = self._get_client()
+        host = urlsplit(url).hostname or ""
+        semaphore = self._semaphore(host)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with semaphore:
+                    time.sleep(self._reserve_slot(host))
+                    request_timeout = self._request_timeout(timeout, deadline, url)
+                    response = client.get(url, params=params, headers=headers, timeout=request_timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            backoff = self._backoff(attempt)
+            if deadline is not None and time.monotonic() + backoff >= deadline:
+                raise httpx.TimeoutException(f"Deadline passed while retrying {url}")
+            time.sleep(backoff)
+
+    def close(self) -> None:
+        """Close the connection pool"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+# Shared client used by all tools
+http_client = OutboundHTTPClient()
@@ -3,9 +3,23 @@ Tool for finding safe places to sleep for unsheltered individuals
 """
 
 from vertexai.generative_models import FunctionDeclaration
-import requests
-from typing import Dict, Optional, List
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, Optional, List, Set, Tuple
 from datetime import datetime
+from .http_client import http_client
+from .geocoding import get_location_name
+from .safe_sleep_index import local_safe_sleep_index
+
+# Time budget shared by all safe sleep searches in one request
+SAFE_SLEEP_DEADLINE_SECONDS = float(os.getenv("SAFE_SLEEP_DEADLINE_SECONDS", "8"))
+
+# Worker threads for concurrent safe sleep searches
+_search_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SAFE_SLEEP_SEARCH_WORKERS", "10")),
+    thread_name_prefix="safe-sleep-search"
+)
 
 # Define find safe places to sleep function
 find_safe_sleep_func = FunctionDeclaration(
@@ -45,71 +59,23 @@ find_safe_sleep_func = FunctionDeclaration(
 )
 
 
-def get_location_name(latitude: float, longitude: float) -> Optional[str]:
+def build_safe_sleep_queries(location_name: str, include_type: str = "all", skip_types: Optional[Set[str]] = None) -> List[Dict]:
     """
-    Get city/location name from coordinates using Nominatim reverse geocoding
+    Build the web searches for each requested safe sleep source
 
     Args:
-        latitude: Latitude coordinate
-        longitude: Longitude coordinate
-
-    Returns:
-        Location string (e.g., "San Diego, CA") or None if failed
-    """
-    try:
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
-            'lat': latitude,
-            'lon': longitude,
-            'format': 'json',
-            'zoom': 10
-        }
-        headers = {
-            'User-Agent': 'SafeSleepAssistant/1.0'
-        }
-
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-
-        if response.status_code == 200:
-            data = response.json()
-            address = data.get('address', {})
-
-            city = address.get('city') or address.get('town') or address.get('village')
-            state = address.get('state')
-            country = address.get('country')
-
-            if city and state:
-                return f"{city}, {state}"
-            elif city and country:
-                return f"{city}, {country}"
-            elif city:
-                return city
-
-        return None
-    except Exception as e:
-        print(f"Reverse geocoding error: {str(e)}")
-        return None
-
-
-def search_safe_sleep_options(latitude: float, longitude: float, location_name: str, include_type: str = "all", max_distance_miles: int = 3) -> List[Dict]:
-    """
-    Search for safe sleep options using DuckDuckGo API
-
-    Args:
-        latitude: User latitude
-        longitude: User longitude
         location_name: City/location name
         include_type: Type of options to search for
-        max_distance_miles: Max distance to search
+        skip_types: Option types already answered from local data
 
     Returns:
-        List of safe sleep options
+        List of search items with source, type, query and description
     """
-    options = []
     search_queries = []
 
     if include_type in ["all", "safe_parking"]:
         search_queries.append({
+            "source": "safe_parking",
             "type": "safe_parking",
             "query": f"safe parking program overnight {location_name}",
             "description": "Safe parking lot for overnight vehicle sleeping"
@@ -118,11 +84,13 @@ def search_safe_sleep_options(latitude: float, longitude: float, location_name:
     if include_type in ["all", "facilities_24h"]:
         search_queries.extend([
             {
+                "source": "ymca",
                 "type": "facilities_24h",
                 "query": f"24 hour YMCA gym open overnight {location_name}",
                 "description": "24-hour facility offering safe indoor space"
             },
             {
+                "source": "laundromat",
                 "type": "facilities_24h",
                 "query": f"24 hour laundromat open all night {location_name}",
                 "description": "24-hour laundromat with seating areas"
@@ -131,6 +99,7 @@ def search_safe_sleep_options(latitude: float, longitude: float, location_name:
 
     if include_type in ["all", "parks"]:
         search_queries.append({
+            "source": "parks",
             "type": "parks",
             "query": f"well lit parks safe areas {location_name}",
             "description": "Well-lit public parks with good visibility"
@@ -138,43 +107,126 @@ def search_safe_sleep_options(latitude: float, longitude: float, location_name:
 
     if include_type in ["all", "transit_hubs"]:
         search_queries.append({
+            "source": "transit_hubs",
             "type": "transit_hubs",
             "query": f"24 hour bus station train station {location_name}",
             "description": "Transit hub with 24-hour access and seating"
         })
 
-    # Perform searches
-    for search_item in search_queries:
-        try:
-            url = "https://api.duckduckgo.com/"
-            params = {
-                'q': search_item['query'],
-                'format': 'json',
-                'no_html': 1,
-                'skip_disambig': 1
-            }
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+    if skip_types:
+        search_queries = [item for item in search_queries if item["type"] not in skip_types]
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            data = response.json()
+    return search_queries
 
-            # Extract result
-            if data.get('Abstract'):
-                options.append({
-                    'type': search_item['type'],
-                    'category': search_item['description'],
-                    'info': data.get('Abstract', ''),
-                    'source_url': data.get('AbstractURL', ''),
-                    'heading': data.get('Heading', search_item['type'])
-                })
 
-        except Exception as e:
-            print(f"Search error for {search_item['type']}: {str(e)}")
-            continue
+def _search_safe_sleep_source(search_item: Dict, deadline: float) -> Optional[Dict]:
+    """
+    Run one DuckDuckGo search and turn its abstract into a safe sleep option
 
-    return options
+    The request, including retries, gives up at deadline (a time.monotonic()
+    value), so a worker never outlives the search that started it.
+    """
+    url = "https://api.duckduckgo.com/"
+    params = {
+        'q': search_item['query'],
+        'format': 'json',
+        'no_html': 1,
+        'skip_disambig': 1
+    }
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
+    response = http_client.get(url, params=params, headers=headers, deadline=deadline)
+    data = response.json()
+
+    # Extract result
+    if data.get('Abstract'):
+        return {
+            'type': search_item['type'],
+            'category': search_item['description'],
+            'info': data.get('Abstract', ''),
+            'source_url': data.get('AbstractURL', ''),
+            'heading': data.get('Heading', search_item['type'])
+        }
+    return None
+
+
+def _log_abandoned_search(search_item: Dict):
+    def log(future):
+        print(f"Abandoned search for {search_item['source']} finished after the deadline")
+    return log
+
+
+def search_safe_sleep_options(
+    latitude: float,
+    longitude: float,
+    location_name: str,
+    include_type: str = "all",
+    max_distance_miles: int = 3,
+    deadline_seconds: float = SAFE_SLEEP_DEADLINE_SECONDS,
+    skip_types: Optional[Set[str]] = None,
+    on_option: Optional[Callable[[Dict], None]] = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Search for safe sleep options using DuckDuckGo API
+
+    All sources are searched concurrently under one shared deadline. Options
+    are collected (and passed to on_option) as each search completes, and sources that fail or miss the
+    deadline are reported as skipped. The deadline is passed down to each
+    request, so searches still running when it passes stop on their own
+    instead of holding a worker and a pooled connection.
+
+    Args:
+        latitude: User latitude
+        longitude: User longitude
+        location_name: City/location name
+        include_type: Type of options to search for
+        max_distance_miles: Max distance to search
+        deadline_seconds: Time budget shared by all searches
+        skip_types: Option types already answered from local data
+        on_option: Optional callback invoked with each option as it arrives
+
+    Returns:
+        Tuple of (safe sleep options, skipped sources)
+    """
+    search_queries = build_safe_sleep_queries(location_name, include_type, skip_types)
+    options = []
+    skipped = []
+
+    if not search_queries:
+        return options, skipped
+
+    deadline = time.monotonic() + deadline_seconds
+    futures = {
+        _search_executor.submit(_search_safe_sleep_source, search_item, deadline): search_item
+        for search_item in search_queries
+    }
+
+    try:
+        for future in as_completed(futures, timeout=deadline_seconds):
+            search_item = futures[future]
+            try:
+                option = future.result()
+            except Exception as e:
+                print(f"Search error for {search_item['source']}: {str(e)}")
+                skipped.append({'source': search_item['source'], 'type': search_item['type'], 'reason': 'error'})
+                continue
+
+            if option:
+                options.append(option)
+                if on_option:
+                    on_option(option)
+    except FuturesTimeoutError:
+        for future, search_item in futures.items():
+            if not future.done():
+                # Queued searches never start; running ones hit the deadline inside the request
+                if not future.cancel():
+                    future.add_done_callback(_log_abandoned_search(search_item))
+                print(f"Search timed out for {search_item['source']}")
+                skipped.append({'source': search_item['source'], 'type': search_item['type'], 'reason': 'timeout'})
+
+    return options, skipped
 
 
 def get_weather_recommendations(weather_condition: str) -> str:
@@ -196,16 +248,22 @@ def get_weather_recommendations(weather_condition: str) -> str:
     return recommendations.get(weather_condition, "Stay safe and seek well-lit, populated areas.")
 
 
-def find_safe_sleep(latitude: float, longitude: float, include_type: str = "all", weather_condition: str = "clear", max_distance_miles: int = 3) -> Dict:
+def find_safe_sleep(latitude: float, longitude: float, include_type: str = "all", weather_condition: str = "clear", max_distance_miles: int = 3, on_option: Optional[Callable[[Dict], None]] = None) -> Dict:
     """
     Main function to find safe places to sleep
 
+    Transit hubs and 24-hour facilities are answered from local datasets;
+    the web is only searched for other categories, or when no local option
+    is within max_distance_miles.
+
     Args:
         latitude: User latitude
         longitude: User longitude
         include_type: Type of sleep options to search
         weather_condition: Current weather
         max_distance_miles: Max distance to search
+        on_option: Optional callback invoked with each option as it is found,
+            local ones first, before the full result is returned
 
     Returns:
         Dictionary with safe sleep options and recommendations
@@ -217,7 +275,18 @@ def find_safe_sleep(latitude: float, longitude: float, include_type: str = "all"
 
         current_time = datetime.now().strftime("%I:%M %p")
 
-        options = search_safe_sleep_options(latitude, longitude, location_name, include_type, max_distance_miles)
+        local_results = local_safe_sleep_index.search(latitude, longitude, include_type, max_distance_miles)
+        options = [option for local_options in local_results.values() for option in local_options]
+        local_types = {option_type for option_type, local_options in local_results.items() if local_options}
+        if on_option:
+            for option in options:
+                on_option(option)
+
+        web_options, skipped_sources = search_safe_sleep_options(
+            latitude, longitude, location_name, include_type, max_distance_miles,
+            skip_types=local_types, on_option=on_option
+        )
+        options.extend(web_options)
 
         result = {
             'location': location_name,
@@ -228,6 +297,7 @@ def find_safe_sleep(latitude: float, longitude: float, include_type: str = "all"
             'weather_condition': weather_condition,
             'options_found': len(options),
             'options': options,
+            'skipped_sources': skipped_sources,
             'weather_recommendation': get_weather_recommendations(weather_condition),
             'safety_tips': get_safety_tips()
         }
@@ -290,6 +360,8 @@ def format_sleep_response(sleep_data: Dict) -> str:
             response += f"{i}. **{option['heading']}** ({option['type'].replace('_', ' ').title()})\n"
             response += f"   {option['category']}\n"
             response += f"   ℹ️ {option['info']}\n"
+            if option.get('distance_miles') is not None:
+                response += f"   📍 {option['distance_miles']} miles away\n"
             if option['source_url']:
                 response += f"   🔗 [More Info]({option['source_url']})\n"
             response += "\n"
@@ -297,6 +369,10 @@ def format_sleep_response(sleep_data: Dict) -> str:
         response += "⚠️ **No specific options found in search.**\n"
         response += "💡 **Alternatives**: Call 211 for local shelter/safe parking programs\n"
 
+    if sleep_data.get('skipped_sources'):
+        skipped = ', '.join(source['source'].replace('_', ' ') for source in sleep_data['skipped_sources'])
+        response += f"⏳ **Not checked (search timed out or failed)**: {skipped}\n"
+
     response += "\n**Safety Tips:**\n"
     for tip in sleep_data['safety_tips']:
         response += f"• {tip}\n"
@@ -0,0 +1,203 @@
+"""
+Local safe sleep options from our San Diego County datasets
+
+Transit hubs come from the transit stops dataset and 24-hour facilities from
+the behavioral health services dataset. Both are held in in-memory spatial
+indexes so these categories are answered without any network calls.
+"""
+
+import csv
+import json
+import re
+import threading
+from typing import Dict, List, Optional
+
+from .geocoding import HEALTH_SERVICES_CSV, TRANSIT_STOPS_JSON
+from .spatial_index import GridIndex
+
+# Stop names that end in a station or transit center (optionally followed by a
+# stall, platform or entrance), rather than naming a curbside stop. Matches
+# inside parentheses, like "Las Pulgas Rd & Bldg 43260 (Gas Station)", do not
+# count.
+TRANSIT_HUB_PATTERN = re.compile(
+    r"^(?P<hub>[^()]*?\b(?:station|transit cent(?:er|re)|transit ctr|depot))"
+    r"(?P<part>\s+(?:stall|platform|bay)\s*\d+"
+    r"|\s+\(?bayside\)?"
+    r"|\s+(?:north|south)?(?:east|west)?(?:\s+entrance/exit)?)?\s*$",
+    re.IGNORECASE
+)
+# Stations that are not transit stops
+NOT_TRANSIT_HUB_PATTERN = re.compile(r"\b(?:gas|fire|police|ranger|medical|transfer) station\b|home depot", re.IGNORECASE)
+
+# Spellings folded together so one station is listed once
+HUB_NAME_SUBSTITUTIONS = [
+    (re.compile(r"\b(?:trolley|coaster|sprinter) (?=station)"), ""),
+    (re.compile(r"\b(?:transit cent(?:er|re)|transit ctr|transit station|depot)\b"), "station"),
+    (re.compile(r"\bstreet\b"), "st"),
+    (re.compile(r"\bavenue\b|\bav\b"), "ave"),
+    (re.compile(r"\bfifth\b"), "5th"),
+    (re.compile(r"[^a-z0-9 ]+"), " "),
+]
+
+# Service text that indicates round-the-clock, walk-in capable facilities
+FACILITY_24H_PATTERN = re.compile(
+    r"24[- ]?hours?\b|24 ?hrs?\b|24/7|crisis stabilization|crisis residential|emergency (psych|screening)",
+    re.IGNORECASE
+)
+
+MAX_RESULTS_PER_TYPE = 3
+
+
+class LocalSafeSleepIndex:
+    """Lazily built spatial indexes over transit hubs and 24-hour facilities"""
+
+    def __init__(self):
+        self._transit_hubs: Optional[GridIndex] = None
+        self._facilities_24h: Optional[GridIndex] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hub_name(stop_name: str) -> Optional[str]:
+        """Station name without any stall/platform suffix, or None if the stop is not a hub"""
+        match = TRANSIT_HUB_PATTERN.match(stop_name)
+        if not match or NOT_TRANSIT_HUB_PATTERN.search(stop_name):
+            return None
+        # "Pacific Hwy @ Old Town Transit Center" is a stop at Old Town Transit Center
+        return match.group("hub").split("@")[-1].strip()
+
+    @staticmethod
+    def _hub_key(hub_name: str) -> str:
+        """Normalized station name, so "Fifth Avenue Station" and "5th Avenue Station" match"""
+        key = hub_name.lower().replace("san diego - ", "")
+        for pattern, replacement in HUB_NAME_SUBSTITUTIONS:
+            key = pattern.sub(replacement, key)
+        key = re.sub(r"\bstation( station)+\b", "station", " ".join(key.split()))
+        return key
+
+    def _load(self) -> None:
+        transit_hubs = GridIndex(cell_degrees=0.02)
+        facilities_24h = GridIndex(cell_degrees=0.02)
+
+        try:
+            with open(TRANSIT_STOPS_JSON, "r") as f:
+                for stop in json.load(f):
+                    coordinates = stop.get("coordinates") or {}
+                    if coordinates.get("latitude") is None or coordinates.get("longitude") is None:
+                        continue
+                    hub_name = self._hub_name(stop.get("name") or "")
+                    if hub_name is None:
+                        continue
+                    transit_hubs.add(
+                        coordinates["latitude"], coordinates["longitude"],
+                        dict(stop, hub_name=hub_name, hub_key=self._hub_key(hub_name))
+                    )
+        except Exception as e:
+            print(f"[Safe Sleep] Error loading transit stops: {str(e)}")
+
+        try:
+            with open(HEALTH_SERVICES_CSV, "r", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    if not row.get("LAT") or not row.get("LONG"):
+                        continue
+                    text = " ".join([row.get("Program", ""), row.get("Description", ""), row.get("Services", "")])
+                    if not FACILITY_24H_PATTERN.search(text):
+                        continue
+                    facilities_24h.add(float(row["LAT"]), float(row["LONG"]), row)
+        except Exception as e:
+            print(f"[Safe Sleep] Error loading health services: {str(e)}")
+
+        print(f"[Safe Sleep] Indexed {transit_hubs.size} transit hub stops and {facilities_24h.size} 24-hour facilities")
+        self._transit_hubs = transit_hubs
+        self._facilities_24h = facilities_24h
+
+    def _ensure_loaded(self) -> None:
+        if self._transit_hubs is None:
+            with self._lock:
+                if self._transit_hubs is None:
+                    self._load()
+
+    def transit_hubs(self, latitude: float, longitude: float, max_distance_miles: float, limit: int = MAX_RESULTS_PER_TYPE) -> List[Dict]:
+        """Find the nearest transit hubs, one entry per station"""
+        self._ensure_loaded()
+
+        options = []
+        seen_hubs = set()
+        for distance, stop in self._transit_hubs.within(latitude, longitude, max_distance_miles):
+            if stop["hub_key"] in seen_hubs:
+                continue
+            seen_hubs.add(stop["hub_key"])
+
+            wheelchair_accessible = stop.get("wheelchair_accessible")
+            if wheelchair_accessible is None:
+                accessibility = "accessibility unknown"
+            elif wheelchair_accessible:
+                accessibility = "wheelchair accessible"
+            else:
+                accessibility = "not wheelchair accessible"
+            stop_code = stop.get("stop_code") or stop.get("id")
+            agency = stop.get("agency") or "Transit"
+            # Station entries (as opposed to their platforms) carry no stop code
+            stop_label = f"{agency} stop #{stop_code}" if stop_code else f"{agency} station"
+            options.append({
+                'type': 'transit_hubs',
+                'category': "Transit hub with seating and regular foot traffic",
+                'info': f"{stop_label}, {accessibility}",
+                'source_url': '',
+                'heading': stop["hub_name"],
+                'latitude': stop["coordinates"]["latitude"],
+                'longitude': stop["coordinates"]["longitude"],
+                'distance_miles': round(distance, 2),
+                'source': 'local'
+            })
+            if len(options) >= limit:
+                break
+
+        return options
+
+    def facilities_24h(self, latitude: float, longitude: float, max_distance_miles: float, limit: int = MAX_RESULTS_PER_TYPE) -> List[Dict]:
+        """Find the nearest 24-hour crisis and behavioral health facilities"""
+        self._ensure_loaded()
+
+        options = []
+        seen_addresses = set()
+        for distance, row in self._facilities_24h.within(latitude, longitude, max_distance_miles):
+            address_key = (row.get("Address") or "").lower()
+            if address_key in seen_addresses:
+                continue
+            seen_addresses.add(address_key)
+
+            info = row.get("Address") or ""
+            if row.get("Phone"):
+                info += f" - Phone: {row['Phone']}"
+            options.append({
+                'type': 'facilities_24h',
+                'category': "24-hour crisis or behavioral health facility",
+                'info': info,
+                'source_url': row.get("Website") or '',
+                'heading': row.get("Program") or "Behavioral Health Services",
+                'latitude': float(row["LAT"]),
+                'longitude': float(row["LONG"]),
+                'distance_miles': round(distance, 2),
+                'source': 'local'
+            })
+            if len(options) >= limit:
+                break
+
+        return options
+
+    def search(self, latitude: float, longitude: float, include_type: str, max_distance_miles: float) -> Dict[str, List[Dict]]:
+        """
+        Answer the locally supported categories requested by include_type
+
+        Returns:
+            Dict mapping each local category to its options (possibly empty)
+        """
+        results = {}
+        if include_type in ["all", "transit_hubs"]:
+            results["transit_hubs"] = self.transit_hubs(latitude, longitude, max_distance_miles)
+        if include_type in ["all", "facilities_24h"]:
+            results["facilities_24h"] = self.facilities_24h(latitude, longitude, max_distance_miles)
+        return results
+
+
+local_safe_sleep_index = LocalSafeSleepIndex()
@@ -3,9 +3,24 @@ Search tool for finding resources online and in local datasets
 """
 
 from vertexai.generative_models import FunctionDeclaration
-import requests
-from typing import List, Dict, Optional
+import os
+from urllib.parse import quote
+from typing import List, Dict, Optional, Tuple
 from .dataset_search import search_local_datasets, format_results_for_llm
+from .cache import get_cache, normalize_query, snap_to_cell
+from .http_client import http_client
+from .geocoding import get_location_name
+from opening_hours import minute_of_week
+
+# Local dataset results only change when the datasets are regenerated, so
+# they can live much longer than web results
+LOCAL_RESULTS_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_LOCAL_TTL_SECONDS", "3600"))
+WEB_RESULTS_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_WEB_TTL_SECONDS", "600"))
+
+# Results carry open/closed statuses, so cache entries are also keyed by time slot
+OPEN_STATUS_SLOT_MINUTES = int(os.getenv("SEARCH_CACHE_OPEN_STATUS_SLOT_MINUTES", "15"))
+
+search_cache = get_cache("search_web", max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048")))
 
 # Define search function (searches local datasets first, then web)
 search_web_func = FunctionDeclaration(
@@ -22,6 +37,11 @@ search_web_func = FunctionDeclaration(
                 "type": "integer",
                 "description": "Maximum number of search results to return (default: 5)",
                 "default": 5
+            },
+            "open_now": {
+                "type": "boolean",
+                "description": "Only return resources that are known to be open right now (default: false)",
+                "default": False
             }
         },
         "required": ["query"]
@@ -29,89 +49,72 @@ search_web_func = FunctionDeclaration(
 )
 
 
-def get_location_name(latitude: float, longitude: float) -> Optional[str]:
+def perform_web_search(query: str, max_results: int = 5, latitude: Optional[float] = None, longitude: Optional[float] = None, open_now: bool = False) -> List[Dict[str, str]]:
     """
-    Get city/location name from coordinates using Nominatim reverse geocoding
+    Search for resources - first checks local datasets, then falls back to web search
+
+    Results are cached by normalized query, max_results and the location cell
+    the coordinates fall in, so repeated searches near the same spot are
+    answered without re-reading datasets or calling the web.
 
     Args:
-        latitude: Latitude coordinate
-        longitude: Longitude coordinate
+        query: Search query string
+        max_results: Maximum number of results to return
+        latitude: Optional user latitude for location-based search
+        longitude: Optional user longitude for location-based search
+        open_now: Only return local resources that are open right now
 
     Returns:
-        Location string (e.g., "Los Angeles, CA") or None if failed
+        List of search results with title, snippet, and URL. Local results
+        also carry the structured resource records under 'resources'.
     """
-    try:
-        # Use Nominatim (OpenStreetMap) reverse geocoding API
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
-            'lat': latitude,
-            'lon': longitude,
-            'format': 'json',
-            'zoom': 10  # City level
-        }
-        headers = {
-            'User-Agent': 'HomelessAssistantApp/1.0'
-        }
-
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+    cache_key = (
+        normalize_query(query),
+        max_results,
+        snap_to_cell(latitude, longitude),
+        open_now,
+        minute_of_week() // OPEN_STATUS_SLOT_MINUTES
+    )
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        print(f"[Search] Cache hit for: {query}")
+        return [dict(result) for result in cached]
 
-        if response.status_code == 200:
-            data = response.json()
-            address = data.get('address', {})
+    results, source = _search_uncached(query, max_results, latitude, longitude, open_now)
 
-            # Try to get city, state, country
-            city = address.get('city') or address.get('town') or address.get('village')
-            state = address.get('state')
-            country = address.get('country')
+    if source == "local":
+        search_cache.set(cache_key, results, LOCAL_RESULTS_TTL_SECONDS)
+    elif source == "web":
+        search_cache.set(cache_key, results, WEB_RESULTS_TTL_SECONDS)
 
-            if city and state:
-                return f"{city}, {state}"
-            elif city and country:
-                return f"{city}, {country}"
-            elif city:
-                return city
-
-        return None
-    except Exception as e:
-        print(f"Reverse geocoding error: {str(e)}")
-        return None
+    return [dict(result) for result in results]
 
 
-def perform_web_search(query: str, max_results: int = 5, latitude: Optional[float] = None, longitude: Optional[float] = None) -> List[Dict[str, str]]:
+def _search_uncached(query: str, max_results: int, latitude: Optional[float], longitude: Optional[float], open_now: bool = False) -> Tuple[List[Dict[str, str]], Optional[str]]:
     """
-    Search for resources - first checks local datasets, then falls back to web search
-
-    Args:
-        query: Search query string
-        max_results: Maximum number of results to return
-        latitude: Optional user latitude for location-based search
-        longitude: Optional user longitude for location-based search
+    Run the search without consulting the cache
 
     Returns:
-        List of search results with title, snippet, and URL
+        Tuple of (results, source) where source is "local", "web", or None
+        when the search failed and the results should not be cached
     """
     try:
         # FIRST: Try to find results in local datasets
         print(f"[Search] Searching local datasets for: {query}")
-        local_results = search_local_datasets(query, latitude, longitude, max_results)
+        local_results = search_local_datasets(query, latitude, longitude, max_results, open_now)
 
         if local_results:
             # Format local results for the LLM
             formatted_text = format_results_for_llm(local_results)
             print(f"[Search] Found {len(local_results)} results in local datasets")
 
-            # Also include structured data for the frontend map
-            import json
-            structured_data = json.dumps({
-                'type': 'resource_list',
-                'resources': local_results
-            })
-
+            # Structured records travel alongside the text for maps and reports
             return [{
                 'title': 'Local Resources Database',
-                'snippet': formatted_text + f"\n\n<!-- RESOURCE_DATA:{structured_data} -->",
-                'url': 'local://database'
-            }]
+                'snippet': formatted_text,
+                'url': 'local://database',
+                'resources': local_results
+            }], "local"
 
         # If no local results, fall back to web search
         print("[Search] No local results found, falling back to web search")
@@ -127,23 +130,7 @@ def perform_web_search(query: str, max_results: int = 5, latitude: Optional[floa
                 enhanced_query = f"{query} near {latitude},{longitude}"
                 print(f"[Search] Using coordinates in query: {enhanced_query}")
 
-        # Use DuckDuckGo's HTML API for better results
-        url = "https://html.duckduckgo.com/html/"
-        params = {
-            'q': enhanced_query
-        }
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-
-        if response.status_code == 200:
-            # Parse the HTML response to extract results
-            # For simplicity, we'll use the Instant Answer API instead
-            pass
-
-        # Fallback: Use DuckDuckGo Instant Answer API
+        # Use DuckDuckGo Instant Answer API
         instant_url = "https://api.duckduckgo.com/"
         params = {
             'q': enhanced_query,
@@ -152,7 +139,7 @@ def perform_web_search(query: str, max_results: int = 5, latitude: Optional[floa
             'skip_disambig': 1
         }
 
-        response = requests.get(instant_url, params=params, timeout=10)
+        response = http_client.get(instant_url, params=params, timeout=10)
         data = response.json()
 
         results = []
@@ -174,13 +161,13 @@ def perform_web_search(query: str, max_results: int = 5, latitude: Optional[floa
                     'url': topic.get('FirstURL', '')
                 })
 
-        return results[:max_results] if results else [
+        return (results[:max_results] if results else [
             {
                 'title': 'Search Info',
                 'snippet': f'Search query: {enhanced_query}. For better results, try searching online directly or contact local 211 services.',
-                'url': f'https://duckduckgo.com/?q={requests.utils.quote(enhanced_query)}'
+                'url': f'https://duckduckgo.com/?q={quote(enhanced_query)}'
             }
-        ]
+        ]), "web"
 
     except Exception as e:
         print(f"Search error: {str(e)}")
@@ -190,4 +177,4 @@ def perform_web_search(query: str, max_results: int = 5, latitude: Optional[floa
                 'snippet': f'Unable to search at this time. Try: Call 211 for local resources, or visit https://www.211.org',
                 'url': 'https://www.211.org'
             }
-        ]
+        ], None
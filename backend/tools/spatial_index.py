@@ -0,0 +1,68 @@
+"""
+In-memory grid index for nearest-point and radius queries
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dataset_search import calculate_distance
+
+MILES_PER_DEGREE_LAT = 69.0
+
+
+class GridIndex:
+    """
+    Bucket points into fixed-size lat/lon cells
+
+    Radius queries only scan the cells overlapping the search area, so lookups
+    stay fast regardless of how many points are indexed.
+    """
+
+    def __init__(self, cell_degrees: float = 0.02):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Any]]] = {}
+        self.size = 0
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (int(math.floor(latitude / self.cell_degrees)), int(math.floor(longitude / self.cell_degrees)))
+
+    def add(self, latitude: float, longitude: float, item: Any) -> None:
+        """Add an item at the given coordinates"""
+        self._cells.setdefault(self._cell(latitude, longitude), []).append((latitude, longitude, item))
+        self.size += 1
+
+    def within(self, latitude: float, longitude: float, radius_miles: float) -> List[Tuple[float, Any]]:
+        """
+        Find all items within radius_miles of a point
+
+        Returns:
+            List of (distance_miles, item) tuples sorted by distance
+        """
+        lat_span = radius_miles / MILES_PER_DEGREE_LAT
+        lon_span = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+
+        min_row, min_col = self._cell(latitude - lat_span, longitude - lon_span)
+        max_row, max_col = self._cell(latitude + lat_span, longitude + lon_span)
+
+        matches = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for item_lat, item_lon, item in self._cells.get((row, col), ()):
+                    distance = calculate_distance(latitude, longitude, item_lat, item_lon)
+                    if distance <= radius_miles:
+                        matches.append((distance, item))
+
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def nearest(self, latitude: float, longitude: float, max_distance_miles: float) -> Optional[Tuple[float, Any]]:
+        """Find the closest item within max_distance_miles, or None"""
+        # Start with roughly one cell and widen, so dense areas stay cheap
+        radius = min(self.cell_degrees * MILES_PER_DEGREE_LAT, max_distance_miles)
+        while True:
+            matches = self.within(latitude, longitude, radius)
+            if matches:
+                return matches[0]
+            if radius >= max_distance_miles:
+                return None
+            radius = min(radius * 2, max_distance_miles)
@@ -109,6 +109,11 @@ export const api = {
     const response = await apiClient.get(`/conversation/${conversation_id}/report`)
     return response.data
   },
+
+  getReportJob: async (conversation_id: number, job_id: string) => {
+    const response = await apiClient.get(`/conversation/${conversation_id}/report/jobs/${job_id}`)
+    return response.data
+  },
 }
 
 export { API_BASE_URL }
@@ -17,6 +17,15 @@ interface Message {
   timestamp: string
 }
 
+// Report jobs are polled at this interval, and given up on after the timeout
+const REPORT_POLL_INTERVAL_MS = 1500
+const REPORT_POLL_TIMEOUT_MS = 3 * 60 * 1000
+// Consecutive failed status checks (e.g. network errors) before giving up
+const REPORT_POLL_MAX_ERRORS = 3
+
+// Raised while waiting on a report job, with a message fit to show the user
+class ReportWaitError extends Error {}
+
 // Character configuration - switch between different character types here
 const CHARACTER_CONFIG = {
   // Select character type: 'improved' | 'readyplayerme' | 'glb'
@@ -71,6 +80,8 @@ function Chat() {
   const [report, setReport] = useState<string | null>(null)
   const [reportResources, setReportResources] = useState<any[]>([])
   const [showReport, setShowReport] = useState(false)
+  const [isGeneratingReport, setIsGeneratingReport] = useState(false)
+  const [reportError, setReportError] = useState<string | null>(null)
   const [isVoiceMode, setIsVoiceMode] = useState(false)
   const [isRecording, setIsRecording] = useState(false)
   const [isSpeaking, setIsSpeaking] = useState(false)
@@ -84,6 +95,8 @@ function Chat() {
   const audioContextRef = useRef<AudioContext | null>(null)
   const analyserRef = useRef<AnalyserNode | null>(null)
   const animationFrameRef = useRef<number | null>(null)
+  // Report job ID -> handler for its WebSocket "report_job" notification
+  const reportJobListenersRef = useRef(new Map<string, (job: any) => void>())
   const { user } = useAuthStore()
 
   const characterColor = user?.character_id
@@ -284,6 +297,27 @@ function Chat() {
             return
           }
 
+          // A finished report job ends the matching report wait without another poll
+          if (data.type === 'report_job') {
+            console.log('[WS] Report job', data.job_id, data.status)
+            reportJobListenersRef.current.get(data.job_id)?.(data)
+            return
+          }
+
+          // A due medication dose is shown as a reminder from the assistant
+          if (data.type === 'medication_reminder') {
+            console.log('[WS] Medication reminder', data.medication_id, data.scheduled_time)
+            const dosage = data.dosage ? ` (${data.dosage})` : ''
+            const instructions = data.instructions ? ` ${data.instructions}` : ''
+            const reminderMessage: Message = {
+              role: 'assistant',
+              content: `Reminder: it's time to take your ${data.medication_name}${dosage}.${instructions}`,
+              timestamp: new Date().toISOString()
+            }
+            setMessages(prev => [...prev, reminderMessage])
+            return
+          }
+
           // Check if the response is a JSON string with location request
           let content = data.content
           console.log('[WS] Received content:', content)
@@ -333,27 +367,11 @@ function Chat() {
             console.log('[WS] Not JSON or parse failed:', e)
           }
 
-          // Parse resource data if present
-          let displayContent = content
-          console.log('[Resources] Checking message for resource data...')
-          const resourceMatch = content.match(/<!-- RESOURCE_DATA:(.+?) -->/s)
-          if (resourceMatch) {
-            console.log('[Resources] Found resource data marker')
-            try {
-              const resourceData = JSON.parse(resourceMatch[1])
-              console.log('[Resources] Parsed resource data:', resourceData)
-              if (resourceData.type === 'resource_list' && resourceData.resources) {
-                setResources(resourceData.resources)
-                console.log('[Resources] Set', resourceData.resources.length, 'resources to state')
-              }
-              // Remove the resource data comment from display
-              displayContent = content.replace(/<!-- RESOURCE_DATA:.+? -->/s, '')
-            } catch (e) {
-              console.error('[Resources] Failed to parse resource data:', e)
-              console.error('[Resources] Raw match:', resourceMatch[1])
-            }
-          } else {
-            console.log('[Resources] No resource data found in message')
+          // Resources found by the assistant's tools arrive alongside the text
+          const displayContent = content
+          if (data.resources && data.resources.length > 0) {
+            setResources(data.resources)
+            console.log('[Resources] Set', data.resources.length, 'resources to state')
           }
 
           const newMessage: Message = {
@@ -417,11 +435,66 @@ function Chat() {
     }
   }
 
+  // Wait for a report job to finish, woken early by its WebSocket notification
+  const waitForReportJob = async (conversationId: number, job: any) => {
+    const jobId = job.job_id
+    const deadline = Date.now() + REPORT_POLL_TIMEOUT_MS
+    let pushed: any = null
+    let wake: (() => void) | null = null
+    reportJobListenersRef.current.set(jobId, (update) => {
+      pushed = update
+      wake?.()
+    })
+
+    try {
+      let failedChecks = 0
+      while (job.status === 'pending' || job.status === 'running') {
+        if (Date.now() >= deadline) {
+          throw new ReportWaitError('The report is taking too long. Please try again in a moment.')
+        }
+        await new Promise<void>((resolve) => {
+          wake = resolve
+          setTimeout(resolve, REPORT_POLL_INTERVAL_MS)
+        })
+        if (pushed) {
+          job = pushed
+          continue
+        }
+
+        try {
+          job = await api.getReportJob(conversationId, jobId)
+          failedChecks = 0
+        } catch (err: any) {
+          if (err?.response?.status === 404) {
+            // Jobs live in server memory, so a restart loses them
+            throw new ReportWaitError('The report request was lost, possibly because the server restarted. Please try again.')
+          }
+          failedChecks += 1
+          console.error('[Report] Failed to check report status:', err)
+          if (failedChecks >= REPORT_POLL_MAX_ERRORS) {
+            throw new ReportWaitError('Could not reach the server to check on the report. Please try again.')
+          }
+        }
+      }
+      return job
+    } finally {
+      reportJobListenersRef.current.delete(jobId)
+    }
+  }
+
   const generateReport = async () => {
-    if (!conversationId) return
+    if (!conversationId || isGeneratingReport) return
 
+    setReportError(null)
+    setIsGeneratingReport(true)
     try {
-      const data = await api.endConversation(conversationId)
+      // Ending returns a report job; wait until the report is ready
+      const data = await waitForReportJob(conversationId, await api.endConversation(conversationId))
+      if (data.status === 'failed') {
+        console.error('[Report] Report generation failed:', data.error)
+        setReportError('The report could not be generated. Please try again.')
+        return
+      }
 
       // Parse resource data from report if present
       console.log('[Report] Checking for resource data...')
@@ -449,6 +522,9 @@ function Chat() {
       setShowReport(true)
     } catch (err) {
       console.error('Error generating report:', err)
+      setReportError(err instanceof ReportWaitError ? err.message : 'Could not generate the report. Please try again.')
+    } finally {
+      setIsGeneratingReport(false)
     }
   }
 
@@ -640,12 +716,21 @@ function Chat() {
               >
                 {isVoiceMode ? 'Voice Mode' : 'Text Mode'}
               </button>
-              <button onClick={generateReport} className="control-btn report-btn">
-                Generate Report
+              <button onClick={generateReport} className="control-btn report-btn" disabled={isGeneratingReport}>
+                {isGeneratingReport ? 'Generating Report...' : 'Generate Report'}
               </button>
             </div>
           </div>
 
+          {reportError && (
+            <div className="report-error" role="alert">
+              {reportError}
+              <button onClick={() => setReportError(null)} className="report-error-dismiss" aria-label="Dismiss">
+                ×
+              </button>
+            </div>
+          )}
+
           <div className="messages-container">
             {messages.map((msg, index) => (
               <div key={index} className={`message ${msg.role}`}>